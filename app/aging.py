@@ -0,0 +1,170 @@
+"""在制品老化（WIP aging）：进行中 / 审核中的卡片已在途多久，与同优先级、同类型的历史周期比较。
+
+在途起点为进入开发（``in_progress_at``）与最近一次重开中较晚者（都没有时依次退回 ``review_at`` / ``created_at``）；
+历史样本为已解决卡片从同一起点到 ``resolved_at`` 的时长。分位阈值先按（优先级, 类型）分组，样本不足
+``AGING_MIN_SAMPLES`` 时退回按优先级，再退回看板整体。
+
+阈值（``AgingBaseline``）只依赖整份缓存，由调用方按缓存版本复用；每次请求只对在制品做一次列式 numpy 计算，
+看板构建几乎不增加耗时。给出 ``calendar`` 时全部时长按工作时间计。
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+import numpy as np
+
+from .period import to_epochs
+from .teams import card_owner
+from .working_calendar import WorkingCalendar
+
+
+AGING_COLUMNS = ("In Progress", "审核中")
+AGING_PERCENTILES = (50, 85, 95)
+AGING_MIN_SAMPLES = 5
+# 超过 p85 记为老化（aged）
+AGING_LEVELS = ("normal", "p50", "p85", "p95")
+
+_START_FALLBACKS = ("review_at", "created_at")
+
+
+def _age_starts(cards: list[dict[str, Any]]) -> tuple[np.ndarray, list[str]]:
+    """每张卡片的在途起点（epoch 秒）及其来源字段。"""
+    timelines = [card.get("timeline") or {} for card in cards]
+    started = to_epochs(timeline.get("in_progress_at") for timeline in timelines)
+    reopened = to_epochs(((timeline.get("reopened_events") or [None])[-1] for timeline in timelines))
+    starts = np.fmax(started, reopened)
+    sources = np.where(reopened > started, "reopened", "in_progress_at").astype(object)
+    sources[np.isnan(started) & ~np.isnan(reopened)] = "reopened"
+    sources[np.isnan(starts)] = None
+    for name in _START_FALLBACKS:
+        missing = np.isnan(starts)
+        if not missing.any():
+            break
+        fallback = to_epochs(timeline.get(name) for timeline in timelines)
+        usable = missing & ~np.isnan(fallback)
+        starts[usable] = fallback[usable]
+        sources[usable] = name
+    return starts, sources.tolist()
+
+
+def _positions(epochs: np.ndarray, calendar: WorkingCalendar | None) -> np.ndarray:
+    return calendar.positions(epochs) if calendar is not None else epochs
+
+
+def _thresholds(samples: np.ndarray) -> dict[str, float]:
+    values = np.percentile(samples, AGING_PERCENTILES)
+    return {f"p{p}_hours": round(float(value), 2) for p, value in zip(AGING_PERCENTILES, values)}
+
+
+class AgingBaseline:
+    """历史周期分位阈值：（优先级, 类型）→ 优先级 → 看板整体，依次退回。"""
+
+    def __init__(
+        self,
+        by_type: dict[tuple[str, str], dict[str, float]],
+        by_priority: dict[str, dict[str, float]],
+        board: dict[str, float] | None,
+        sample_count: int,
+    ) -> None:
+        self.by_type = by_type
+        self.by_priority = by_priority
+        self.board = board
+        self.sample_count = sample_count
+
+    def lookup(self, priority: str, issue_type: str) -> tuple[str | None, dict[str, float] | None]:
+        thresholds = self.by_type.get((priority, issue_type))
+        if thresholds is not None:
+            return "priority_type", thresholds
+        thresholds = self.by_priority.get(priority)
+        if thresholds is not None:
+            return "priority", thresholds
+        return ("board", self.board) if self.board is not None else (None, None)
+
+
+def _grouped_thresholds(keys: list[Any], durations: np.ndarray) -> dict[Any, dict[str, float]]:
+    """按 key 分组后各组的分位阈值（样本不足的组省略）；排序后切分，不逐组扫描全部样本。"""
+    if not keys:
+        return {}
+    labels, inverse = np.unique(np.array([repr(key) for key in keys]), return_inverse=True)
+    order = np.argsort(inverse, kind="stable")
+    bounds = np.flatnonzero(np.diff(inverse[order])) + 1
+    result: dict[Any, dict[str, float]] = {}
+    for positions in np.split(order, bounds):
+        if len(positions) >= AGING_MIN_SAMPLES:
+            result[keys[positions[0]]] = _thresholds(durations[positions])
+    return result
+
+
+def build_aging_baseline(cards: list[dict[str, Any]], calendar: WorkingCalendar | None = None) -> AgingBaseline:
+    done = [card for card in cards if card["column"] == "Done"]
+    starts, _ = _age_starts(done)
+    resolved = to_epochs((card.get("timeline") or {}).get("resolved_at") for card in done)
+    durations = (_positions(resolved, calendar) - _positions(starts, calendar)) / 3600
+    with np.errstate(invalid="ignore"):
+        valid = np.flatnonzero(durations >= 0)
+    samples = durations[valid]
+    selected = [done[index] for index in valid.tolist()]
+    return AgingBaseline(
+        by_type=_grouped_thresholds([(card["priority"], card.get("issue_type") or "Unknown") for card in selected], samples),
+        by_priority=_grouped_thresholds([card["priority"] for card in selected], samples),
+        board=_thresholds(samples) if len(samples) >= AGING_MIN_SAMPLES else None,
+        sample_count=int(len(samples)),
+    )
+
+
+def _level(age: float, thresholds: dict[str, float] | None) -> str:
+    level = "normal"
+    for percentile in AGING_PERCENTILES:
+        if thresholds is not None and age > thresholds[f"p{percentile}_hours"]:
+            level = f"p{percentile}"
+    return level
+
+
+def compute_aging(
+    cards: list[dict[str, Any]],
+    baseline: AgingBaseline,
+    now: datetime,
+    calendar: WorkingCalendar | None = None,
+) -> dict[str, Any]:
+    """在制品按在途时长降序排列；``level`` 为超过的最高分位（``normal`` 为未超过 p50），超过 p85 即 ``aged``。"""
+    wip = [card for card in cards if card["column"] in AGING_COLUMNS]
+    starts, sources = _age_starts(wip)
+    ages = (_positions(np.array([now.timestamp()]), calendar)[0] - _positions(starts, calendar)) / 3600
+
+    rows: list[dict[str, Any]] = []
+    levels = dict.fromkeys(AGING_LEVELS, 0)
+    for card, start, source, age in zip(wip, starts.tolist(), sources, ages.tolist()):
+        issue_type = card.get("issue_type") or "Unknown"
+        scope, thresholds = baseline.lookup(card["priority"], issue_type)
+        known = age == age
+        level = _level(age, thresholds) if known else "normal"
+        levels[level] += 1
+        rows.append(
+            {
+                "key": card["key"],
+                "summary": card.get("summary"),
+                "owner": card_owner(card),
+                "column": card["column"],
+                "priority": card["priority"],
+                "issue_type": issue_type,
+                "age_from": source,
+                "started_at": datetime.fromtimestamp(start, now.tzinfo).isoformat() if start == start else None,
+                "age_hours": round(max(age, 0.0), 2) if known else None,
+                "baseline": scope,
+                "thresholds": thresholds,
+                "level": level,
+                "aged": level in ("p85", "p95"),
+            }
+        )
+    rows.sort(key=lambda row: (row["age_hours"] is None, -(row["age_hours"] or 0), row["key"]))
+    return {
+        "summary": {
+            "wip": len(rows),
+            "aged": levels["p85"] + levels["p95"],
+            "levels": levels,
+            "baseline_samples": baseline.sample_count,
+        },
+        "cards": rows,
+    }
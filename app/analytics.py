@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+import logging
+import string
+import threading
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 import yaml
 
 from .normalize import parse_datetime
+from .period import BucketEdges, to_epochs
+from .teams import TeamDirectory
+
+logger = logging.getLogger(__name__)
 
 _SUMMARY_TEMPLATE_PATH = Path(__file__).resolve().parent.parent / "config" / "manager_summary_template.yaml"
 
@@ -28,41 +36,156 @@ _BUILTIN_SUMMARY_STRINGS: dict[str, str] = {
     "item_unresolved": "    - {key}  {summary}  [{status}]",
     "item_reopened": "  - {key}  {summary}  重开{reopen_count}次  [{owner}]",
     "item_new_issue": "  - {key}  {summary}  [{status}]  [{owner}]",
+    # 同步变化（缓存差异）：{change} 由变更类型生成，如「In Progress → Done」
+    "section_changes": "【同步变化 ({change_total})】",
+    "item_change": "  - {key}  {summary}  {change}  [{owner}]",
+    # 团队汇总（配置了 teams 时）：按负责人所属团队合并计数
+    "section_teams": "【团队汇总 ({team_count})】",
+    "item_team": (
+        "  {team}：分配 {assigned_total}，已解决 {resolved_total}，未解决 {unresolved_total}，"
+        "重开事件 {reopened_events} 次，新引入 {new_issue_total}"
+    ),
 }
 
-
-def _brace_escape(text: str) -> str:
-    """避免 Jira 摘要等含 {{ / }} 破坏 str.format。"""
-    return text.replace("{", "{{").replace("}", "}}")
-
-
-def _fmt(template: str, **kwargs: Any) -> str:
-    safe: dict[str, Any] = {}
-    for key, value in kwargs.items():
-        if isinstance(value, bool):
-            safe[key] = value
-        elif isinstance(value, (int, float)):
-            safe[key] = value
-        elif value is None:
-            safe[key] = ""
-        else:
-            safe[key] = _brace_escape(str(value))
-    return template.format(**safe)
+# 周期汇总按负责人累计的计数字段；团队汇总把成员的计数相加
+_SUMMARY_COUNT_FIELDS = ("assigned_total", "resolved_total", "unresolved_total", "reopened_event_total", "new_issue_total")
+
+# 变更类型 → 描述（{old} / {new} 为变化前后的值）
+_CHANGE_DESCRIPTIONS: dict[str, str] = {
+    "new": "新增 [{new}]",
+    "resolved": "已解决（{old} → {new}）",
+    "column": "换列 {old} → {new}",
+    "owner": "负责人 {old} → {new}",
+    "priority_escalated": "优先级上调 {old} → {new}",
+    "removed": "移出查询范围",
+}
 
 
-def load_manager_summary_strings() -> dict[str, str]:
-    """加载周期总结文本模板；优先 config/manager_summary_template.yaml，缺键回退内置。"""
-    merged = dict(_BUILTIN_SUMMARY_STRINGS)
-    path = _SUMMARY_TEMPLATE_PATH
-    if path.exists():
-        with path.open("r", encoding="utf-8") as file:
+_FORMATTER = string.Formatter()
+
+
+class CompiledTemplate:
+    """预解析的 ``str.format`` 模板：加载时拆成「字面量 / 字段」片段并确定字段列表，渲染时直接拼接。
+
+    只支持具名占位符（可带格式说明，如 ``{count:>3}``）；值原样插入，不会再被当作模板解析，因此摘要等
+    含花括号也无需转义。``None`` 渲染为空串，缺少字段时抛 KeyError（与 ``str.format`` 一致）。
+    """
+
+    __slots__ = ("source", "fields", "_parts")
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        parts: list[tuple[str, str | None, str, str | None]] = []
+        for literal, field_name, format_spec, conversion in _FORMATTER.parse(source):
+            if literal:
+                parts.append((literal, None, "", None))
+            if field_name is None:
+                continue
+            if not field_name.isidentifier() or "{" in (format_spec or ""):
+                raise ValueError(f"Unsupported placeholder {{{field_name}}} in summary template: {source!r}")
+            parts.append(("", field_name, format_spec or "", conversion))
+        self._parts = tuple(parts)
+        self.fields = tuple(dict.fromkeys(name for _, name, _, _ in parts if name))
+
+    def render(self, **values: Any) -> str:
+        out: list[str] = []
+        for literal, name, format_spec, conversion in self._parts:
+            if name is None:
+                out.append(literal)
+                continue
+            value = values[name]
+            if value is None:
+                value = ""
+            elif conversion == "r":
+                value = repr(value)
+            elif conversion == "a":
+                value = ascii(value)
+            elif conversion == "s":
+                value = str(value)
+            out.append(format(value, format_spec) if format_spec or not isinstance(value, str) else value)
+        return "".join(out)
+
+
+def _compile_strings(
+    strings: dict[str, str], version: str
+) -> tuple[dict[str, str], dict[str, CompiledTemplate], str]:
+    return strings, {name: CompiledTemplate(text) for name, text in strings.items()}, version
+
+
+class SummaryTemplates:
+    """周期总结模板：按文件 ``(st_mtime_ns, st_size)`` 缓存解析 + 编译结果，修改文件后下一次请求自动生效。
+
+    文件缺失时使用内置模板；新内容有误（YAML 或占位符）时记录错误日志，继续使用上一次成功编译的模板
+    （首次加载即出错时为内置模板），文件再次修改后重新加载。``version`` 标记实际使用的模板。
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        # (文件 stat 键, 模板原文, 编译结果, 实际使用的模板版本)
+        self._state: tuple[tuple[int, int] | None, dict[str, str], dict[str, CompiledTemplate], str] | None = None
+
+    def _stat_key(self) -> tuple[int, int] | None:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load_strings(self) -> dict[str, str]:
+        merged = dict(_BUILTIN_SUMMARY_STRINGS)
+        if not self.path.exists():
+            return merged
+        with self.path.open("r", encoding="utf-8") as file:
             raw = yaml.safe_load(file) or {}
+        if not isinstance(raw, dict):
+            raise ValueError(f"Summary template file must be a mapping: {self.path}")
         user_strings = raw.get("strings") or {}
         if isinstance(user_strings, dict):
             for key, value in user_strings.items():
                 if isinstance(value, str) and value.strip():
                     merged[str(key)] = value
-    return merged
+        return merged
+
+    def _current(self) -> tuple[tuple[int, int] | None, dict[str, str], dict[str, CompiledTemplate], str]:
+        key = self._stat_key()
+        state = self._state
+        if state is not None and state[0] == key:
+            return state
+        with self._lock:
+            state = self._state
+            if state is None or state[0] != key:
+                try:
+                    loaded = _compile_strings(self._load_strings(), "builtin" if key is None else f"{key[0]}:{key[1]}")
+                except (OSError, yaml.YAMLError, ValueError) as error:
+                    loaded = state[1:] if state is not None else _compile_strings(dict(_BUILTIN_SUMMARY_STRINGS), "builtin")
+                    logger.error("Invalid summary template %s, keeping version %s: %s", self.path, loaded[2], error)
+                state = (key, *loaded)
+                self._state = state
+        return state
+
+    def strings(self) -> dict[str, str]:
+        return dict(self._current()[1])
+
+    def compiled(self) -> dict[str, CompiledTemplate]:
+        return self._current()[2]
+
+    @property
+    def version(self) -> str:
+        return self._current()[3]
+
+
+_SUMMARY_TEMPLATES = SummaryTemplates(_SUMMARY_TEMPLATE_PATH)
+
+
+def load_manager_summary_strings() -> dict[str, str]:
+    """加载周期总结文本模板；优先 config/manager_summary_template.yaml，缺键回退内置。"""
+    return _SUMMARY_TEMPLATES.strings()
+
+
+def summary_templates_version() -> str:
+    """当前模板文件的版本标记，供渲染结果缓存作失效键。"""
+    return _SUMMARY_TEMPLATES.version
 
 
 def _in_window(value: str | None, window: dict[str, Any]) -> bool:
@@ -74,12 +197,6 @@ def _in_window(value: str | None, window: dict[str, Any]) -> bool:
     return start <= point < end
 
 
-def _count_reopened_events(card: dict[str, Any], window: dict[str, Any]) -> int:
-    timeline = card.get("timeline", {}) or {}
-    events = timeline.get("reopened_events", []) or []
-    return sum(1 for event_at in events if _in_window(event_at, window))
-
-
 def _windowed_reopen_events(card: dict[str, Any], window: dict[str, Any]) -> list[str]:
     timeline = card.get("timeline", {}) or {}
     events = timeline.get("reopened_events", []) or []
@@ -119,15 +236,104 @@ def _has_terminal_resolution(timeline: dict[str, Any]) -> bool:
     return bool((timeline or {}).get("resolved_at") or (timeline or {}).get("closed_at"))
 
 
-def build_manager_summary(cards: list[dict[str, Any]], window: dict[str, Any]) -> dict[str, Any]:
+def build_change_section(
+    changes: list[dict[str, Any]],
+    tmpl: dict[str, CompiledTemplate] | None = None,
+) -> list[str]:
+    """缓存差异（见 ``app.cache_diff``）的文本区块；无变化时为空列表。"""
+    if not changes:
+        return []
+    strings = tmpl or _SUMMARY_TEMPLATES.compiled()
+    lines = [strings["section_changes"].render(change_total=len(changes))]
+    for change in changes:
+        description = _CHANGE_DESCRIPTIONS.get(change["type"], change["type"])
+        lines.append(
+            strings["item_change"].render(
+                key=change.get("key", "?"),
+                summary=change.get("summary", ""),
+                change=description.format(old=change.get("from") or "-", new=change.get("to") or "-"),
+                owner=change.get("owner") or "",
+            )
+        )
+    return lines
+
+
+def build_summary_series(cards: list[dict[str, Any]], windows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """一次遍历卡片，得到多个窗口的周期总结计数（口径同 ``build_manager_summary`` 的 ``manager_summary_cards``）。
+
+    先把各类时间戳收集成 epoch 数组，再用 ``BucketEdges``（numpy ``searchsorted``）批量定位所属窗口并计数；
+    窗口须按时间升序且互不重叠。
+    """
+    edges = BucketEdges(windows)
+    assigned_at: list[str | None] = []
+    unresolved_flags: list[bool] = []
+    resolved_at: list[str | None] = []
+    closed_at: list[str | None] = []
+    created_at: list[str | None] = []
+    reopened_at: list[str | None] = []
+    for card in cards:
+        timeline = card.get("timeline", {}) or {}
+        assigned_at.append(timeline.get("dev_manager_assigned_at"))
+        unresolved_flags.append(not _has_terminal_resolution(timeline))
+        resolved_at.append(timeline.get("resolved_at"))
+        closed_at.append(timeline.get("closed_at"))
+        created_at.append(timeline.get("created_at"))
+        reopened_at.extend(timeline.get("reopened_events", []) or [])
+
+    size = len(edges)
+
+    def tally(buckets: np.ndarray) -> np.ndarray:
+        return np.bincount(buckets[buckets >= 0], minlength=size)
+
+    assigned = edges.assign(to_epochs(assigned_at))
+    resolved = edges.assign(to_epochs(resolved_at))
+    closed = edges.assign(to_epochs(closed_at))
+    columns = {
+        "assigned_total": tally(assigned),
+        "unresolved_total": tally(assigned[np.array(unresolved_flags, dtype=bool)]),
+        # 解决时间与关闭时间落在同一窗口时只计一次
+        "resolved_total": tally(resolved) + tally(closed[closed != resolved]),
+        "reopened_event_total": tally(edges.assign(to_epochs(reopened_at))),
+        "new_issue_total": tally(edges.assign(to_epochs(created_at))),
+    }
+    counts = [{name: int(values[index]) for name, values in columns.items()} for index in range(size)]
+
+    series: list[dict[str, Any]] = []
+    for window, row in zip(windows, counts):
+        assigned_total = row["assigned_total"]
+        resolved_total = row["resolved_total"]
+        series.append(
+            {
+                "label": window["label"],
+                "start": window["start"].isoformat(),
+                "end": window["end"].isoformat(),
+                **row,
+                "resolution_rate": round((resolved_total / assigned_total) * 100, 2) if assigned_total else 0.0,
+                "net_change": row["new_issue_total"] - resolved_total,
+            }
+        )
+    return series
+
+
+def build_manager_summary(
+    cards: list[dict[str, Any]],
+    window: dict[str, Any],
+    changes: list[dict[str, Any]] | None = None,
+    templates: dict[str, CompiledTemplate] | None = None,
+    teams: TeamDirectory | None = None,
+) -> dict[str, Any]:
     # -- classify cards into resolved / unresolved / reopened / new_issue --
     resolved_cards: list[dict[str, Any]] = []
     unresolved_cards: list[dict[str, Any]] = []
     reopened_items: list[dict[str, Any]] = []
     new_issue_items: list[dict[str, Any]] = []
+    owner_counts: dict[str, dict[str, int]] = {}
 
     for card in cards:
         timeline = card.get("timeline", {}) or {}
+        counts = owner_counts.get(_owner_of(card))
+        if counts is None:
+            counts = owner_counts[_owner_of(card)] = dict.fromkeys(_SUMMARY_COUNT_FIELDS, 0)
 
         is_assigned = _in_window(timeline.get("dev_manager_assigned_at"), window)
         # 本周期「已解决」：解决时间或关闭时间在窗口内（含仅走到「已关闭」分步工作流）
@@ -135,12 +341,16 @@ def build_manager_summary(cards: list[dict[str, Any]], window: dict[str, Any]) -
             timeline.get("closed_at"), window
         )
 
+        counts["assigned_total"] += is_assigned
         if is_resolved:
             resolved_cards.append(card)
+            counts["resolved_total"] += 1
         if is_assigned and not _has_terminal_resolution(timeline):
             unresolved_cards.append(card)
+            counts["unresolved_total"] += 1
 
         reopen_events = _windowed_reopen_events(card, window)
+        counts["reopened_event_total"] += len(reopen_events)
         if reopen_events:
             reopened_items.append(
                 {
@@ -156,6 +366,7 @@ def build_manager_summary(cards: list[dict[str, Any]], window: dict[str, Any]) -
             )
 
         if _in_window(timeline.get("created_at"), window):
+            counts["new_issue_total"] += 1
             new_issue_items.append(
                 {
                     "key": card.get("key"),
@@ -168,10 +379,10 @@ def build_manager_summary(cards: list[dict[str, Any]], window: dict[str, Any]) -
                 }
             )
 
-    assigned_total = sum(1 for card in cards if _in_window(card.get("timeline", {}).get("dev_manager_assigned_at"), window))
+    assigned_total = sum(counts["assigned_total"] for counts in owner_counts.values())
     resolved_total = len(resolved_cards)
     unresolved_total = len(unresolved_cards)
-    reopened_events = sum(_count_reopened_events(card, window) for card in cards)
+    reopened_events = sum(counts["reopened_event_total"] for counts in owner_counts.values())
     new_issue_count = len(new_issue_items)
     resolution_rate = round((resolved_total / assigned_total) * 100, 2) if assigned_total else 0.0
     net_change = new_issue_count - resolved_total
@@ -186,15 +397,14 @@ def build_manager_summary(cards: list[dict[str, Any]], window: dict[str, Any]) -
         "net_change": net_change,
     }
 
-    tmpl = load_manager_summary_strings()
+    tmpl = templates or _SUMMARY_TEMPLATES.compiled()
 
     # -- build detailed multi-line summary text --
     lines: list[str] = []
 
     # 1. overview line
     lines.append(
-        _fmt(
-            tmpl["overview"],
+        tmpl["overview"].render(
             label=window["label"],
             assigned_total=assigned_total,
             resolved_total=resolved_total,
@@ -205,23 +415,39 @@ def build_manager_summary(cards: list[dict[str, Any]], window: dict[str, Any]) -
         )
     )
 
+    # 1b. team rollups (merged from per-owner counts)
+    team_summary = rollup_team_counts(owner_counts, teams) if teams else []
+    if team_summary:
+        lines.append("")
+        lines.append(tmpl["section_teams"].render(team_count=len(team_summary)))
+        for row in team_summary:
+            lines.append(
+                tmpl["item_team"].render(
+                    team=row["name"],
+                    assigned_total=row["assigned_total"],
+                    resolved_total=row["resolved_total"],
+                    unresolved_total=row["unresolved_total"],
+                    reopened_events=row["reopened_event_total"],
+                    new_issue_total=row["new_issue_total"],
+                )
+            )
+
     # 2. resolved issues: by status, then by owner
     if resolved_cards:
         lines.append("")
-        lines.append(_fmt(tmpl["section_resolved"], resolved_total=resolved_total))
+        lines.append(tmpl["section_resolved"].render(resolved_total=resolved_total))
         resolved_by_status = _group_by_status(resolved_cards)
-        status_tmpl = tmpl.get("resolved_status_group", _BUILTIN_SUMMARY_STRINGS["resolved_status_group"])
-        owner_tmpl = tmpl.get("resolved_owner_group", _BUILTIN_SUMMARY_STRINGS["resolved_owner_group"])
-        item_tmpl = tmpl.get("item_resolved", _BUILTIN_SUMMARY_STRINGS["item_resolved"])
+        status_tmpl = tmpl["resolved_status_group"]
+        owner_tmpl = tmpl["resolved_owner_group"]
+        item_tmpl = tmpl["item_resolved"]
         for status in _sort_status_keys(list(resolved_by_status.keys())):
             in_status = resolved_by_status[status]
-            lines.append(_fmt(status_tmpl, status=status, count=len(in_status)))
+            lines.append(status_tmpl.render(status=status, count=len(in_status)))
             for owner, items in _group_by_owner(in_status).items():
-                lines.append(_fmt(owner_tmpl, owner=owner, count=len(items)))
+                lines.append(owner_tmpl.render(owner=owner, count=len(items)))
                 for c in items:
                     lines.append(
-                        _fmt(
-                            item_tmpl,
+                        item_tmpl.render(
                             key=c.get("key", "?"),
                             summary=c.get("summary", ""),
                         )
@@ -230,14 +456,13 @@ def build_manager_summary(cards: list[dict[str, Any]], window: dict[str, Any]) -
     # 3. unresolved issues grouped by owner
     if unresolved_cards:
         lines.append("")
-        lines.append(_fmt(tmpl["section_unresolved"], unresolved_total=unresolved_total))
+        lines.append(tmpl["section_unresolved"].render(unresolved_total=unresolved_total))
         unresolved_by_owner = _group_by_owner(unresolved_cards)
         for owner, items in unresolved_by_owner.items():
-            lines.append(_fmt(tmpl["owner_group"], owner=owner, count=len(items)))
+            lines.append(tmpl["owner_group"].render(owner=owner, count=len(items)))
             for c in items:
                 lines.append(
-                    _fmt(
-                        tmpl["item_unresolved"],
+                    tmpl["item_unresolved"].render(
                         key=c.get("key", "?"),
                         summary=c.get("summary", ""),
                         status=c.get("status", ""),
@@ -248,8 +473,7 @@ def build_manager_summary(cards: list[dict[str, Any]], window: dict[str, Any]) -
     if reopened_items:
         lines.append("")
         lines.append(
-            _fmt(
-                tmpl["section_reopened"],
+            tmpl["section_reopened"].render(
                 reopened_events=reopened_events,
                 reopened_issue_count=len(reopened_items),
             )
@@ -257,8 +481,7 @@ def build_manager_summary(cards: list[dict[str, Any]], window: dict[str, Any]) -
         for item in reopened_items:
             owner = _owner_of(item)
             lines.append(
-                _fmt(
-                    tmpl["item_reopened"],
+                tmpl["item_reopened"].render(
                     key=item.get("key", "?"),
                     summary=item.get("summary", ""),
                     reopen_count=item.get("reopen_count", 0),
@@ -269,12 +492,11 @@ def build_manager_summary(cards: list[dict[str, Any]], window: dict[str, Any]) -
     # 5. new issues
     if new_issue_items:
         lines.append("")
-        lines.append(_fmt(tmpl["section_new_issue"], new_issue_total=new_issue_count))
+        lines.append(tmpl["section_new_issue"].render(new_issue_total=new_issue_count))
         for item in new_issue_items:
             owner = _owner_of(item)
             lines.append(
-                _fmt(
-                    tmpl["item_new_issue"],
+                tmpl["item_new_issue"].render(
                     key=item.get("key", "?"),
                     summary=item.get("summary", ""),
                     status=item.get("status", ""),
@@ -282,6 +504,12 @@ def build_manager_summary(cards: list[dict[str, Any]], window: dict[str, Any]) -
                 )
             )
 
+    # 6. changes since the previous sync (optional)
+    change_lines = build_change_section(changes or [], tmpl)
+    if change_lines:
+        lines.append("")
+        lines.extend(change_lines)
+
     summary_text = "\n".join(lines)
 
     reopened_items.sort(key=lambda row: row.get("last_reopened_at") or "", reverse=True)
@@ -308,8 +536,30 @@ def build_manager_summary(cards: list[dict[str, Any]], window: dict[str, Any]) -
             "start": window["start"].isoformat(),
             "end": window["end"].isoformat(),
             "timezone": window["timezone"],
+            "sprint_id": window.get("sprint_id"),
         },
         "manager_summary_cards": summary_cards,
         "manager_summary_text": summary_text,
         "period_focus": period_focus,
+        "team_summary": team_summary,
     }
+
+
+def rollup_team_counts(owner_counts: dict[str, dict[str, int]], teams: TeamDirectory) -> list[dict[str, Any]]:
+    """把按负责人累计的周期计数相加成团队汇总（按配置中的团队顺序）。"""
+    rows: list[dict[str, Any]] = []
+    for team_id, owners in teams.group_owners(owner_counts).items():
+        totals = dict.fromkeys(_SUMMARY_COUNT_FIELDS, 0)
+        for owner in owners:
+            for field, value in owner_counts[owner].items():
+                totals[field] += value
+        assigned = totals["assigned_total"]
+        rows.append(
+            {
+                "team": team_id,
+                "name": teams.name_of(team_id),
+                **totals,
+                "resolution_rate": round((totals["resolved_total"] / assigned) * 100, 2) if assigned else 0.0,
+            }
+        )
+    return rows
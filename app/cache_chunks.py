@@ -0,0 +1,107 @@
+"""分页（chunked）缓存布局：``<cache_id>.chunks/`` 目录下若干页文件 + ``manifest.json``。
+
+- 每页是 ``{"issues": [...]}``，按 ``cache_settings.codec`` 编码；页文件名带本次写入的代号（generation）。
+- 先写全部页，最后原子替换 manifest（临时文件 + ``os.replace``）；manifest 只引用已写完的页，
+  因此写到一半中断的缓存要么不可见（首次写入），要么仍是上一个完整版本。新 manifest 生效后才删除旧页。
+- 读取时线程池只并发读文件并解压（I/O 与 zlib / zstd 解压会释放 GIL）；JSON 解析与 ``transform`` 受 GIL
+  限制，放在线程里并不会更快，因此在调用方线程按页序逐页执行，同时最多预读 ``max_workers`` 页。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+from .cache_codec import CODEC_SUFFIXES, decompress_payload, encode_payload, loads_json
+
+
+CHUNK_DIR_SUFFIX = ".chunks"
+MANIFEST_NAME = "manifest.json"
+CHUNK_LAYOUT_VERSION = 1
+
+T = TypeVar("T")
+
+
+def read_manifest(chunk_dir: Path) -> dict[str, Any]:
+    """读取 manifest；缺失（含写入未完成）时抛 FileNotFoundError，内容损坏抛 ValueError。"""
+    manifest = json.loads((chunk_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    if not isinstance(manifest, dict) or int(manifest.get("layout_version") or 0) != CHUNK_LAYOUT_VERSION:
+        raise ValueError(f"Unsupported chunk manifest in {chunk_dir}")
+    return manifest
+
+
+def write_chunked(chunk_dir: Path, payload: dict[str, Any], codec: str, page_size: int) -> None:
+    chunk_dir.mkdir(parents=True, exist_ok=True)
+    generation = f"{time.time_ns():x}"
+    issues = payload.get("issues") or []
+    pages: list[dict[str, Any]] = []
+    for number, start in enumerate(range(0, len(issues), page_size)):
+        page = issues[start:start + page_size]
+        name = f"{generation}-{number:05d}{CODEC_SUFFIXES[codec]}"
+        (chunk_dir / name).write_bytes(encode_payload({"issues": page}, codec))
+        pages.append({"file": name, "issue_count": len(page)})
+
+    manifest = {
+        "layout_version": CHUNK_LAYOUT_VERSION,
+        "generation": generation,
+        "header": {key: value for key, value in payload.items() if key != "issues"},
+        "pages": pages,
+    }
+    temp_path = chunk_dir / f"{MANIFEST_NAME}.tmp"
+    temp_path.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    os.replace(temp_path, chunk_dir / MANIFEST_NAME)
+
+    current = {page["file"] for page in pages} | {MANIFEST_NAME}
+    for path in chunk_dir.iterdir():
+        if path.name not in current:
+            path.unlink(missing_ok=True)
+
+
+def chunk_files(chunk_dir: Path) -> list[Path]:
+    manifest = read_manifest(chunk_dir)
+    return [chunk_dir / MANIFEST_NAME, *(chunk_dir / page["file"] for page in manifest.get("pages") or [])]
+
+
+def _read_raw_page(path: Path) -> bytes:
+    return decompress_payload(path.read_bytes())
+
+
+def _page_issues(raw: bytes) -> list[dict[str, Any]]:
+    return list(loads_json(raw).get("issues") or [])
+
+
+def _read_page(path: Path) -> list[dict[str, Any]]:
+    return _page_issues(_read_raw_page(path))
+
+
+def iter_chunk_issues(chunk_dir: Path) -> Iterator[dict[str, Any]]:
+    manifest = read_manifest(chunk_dir)
+    for page in manifest.get("pages") or []:
+        yield from _read_page(chunk_dir / page["file"])
+
+
+def map_chunk_pages(
+    chunk_dir: Path,
+    transform: Callable[[list[dict[str, Any]]], T],
+    max_workers: int,
+) -> Iterator[T]:
+    """线程池预读并解压后续页，当前线程按页序解析 + ``transform``，逐页产出结果。"""
+    paths = [chunk_dir / page["file"] for page in read_manifest(chunk_dir).get("pages") or []]
+    if len(paths) <= 1 or max_workers <= 1:
+        for path in paths:
+            yield transform(_read_page(path))
+        return
+    workers = min(max_workers, len(paths))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cache-page") as pool:
+        pending: deque[Future[bytes]] = deque()
+        for path in paths:
+            pending.append(pool.submit(_read_raw_page, path))
+            if len(pending) > workers:
+                yield transform(_page_issues(pending.popleft().result()))
+        while pending:
+            yield transform(_page_issues(pending.popleft().result()))
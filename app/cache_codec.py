@@ -0,0 +1,113 @@
+"""缓存文件编解码：可选 gzip / zstd 压缩，安装了 orjson 时用其加速 JSON 解析。
+
+编码方式由文件头（压缩格式的 magic bytes）识别，不依赖扩展名；未压缩的旧 ``.json`` 缓存照常读取。
+"""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import zlib
+from pathlib import Path
+from typing import IO, Any
+
+try:
+    import orjson
+except ImportError:  # 可选依赖：未安装时回退标准库 json
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # 可选依赖：未安装时 zstd 回退为 gzip
+    zstandard = None
+
+
+CACHE_CODECS = ("json", "gzip", "zstd")
+CODEC_SUFFIXES = {"json": ".json", "gzip": ".json.gz", "zstd": ".json.zst"}
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_DECOMPRESS_ERRORS: tuple[type[BaseException], ...] = (OSError, EOFError, zlib.error)
+if zstandard is not None:
+    _DECOMPRESS_ERRORS += (zstandard.ZstdError,)
+# 读取缓存时视为「缓存损坏」的全部异常（含流式读取中途出错）
+CORRUPT_CACHE_ERRORS: tuple[type[BaseException], ...] = (ValueError,) + _DECOMPRESS_ERRORS
+
+
+def resolve_codec(name: str | None) -> str:
+    """规范化编码名；zstd 未安装时回退 gzip。"""
+    codec = str(name or "json").strip().lower()
+    if codec not in CACHE_CODECS:
+        raise ValueError(f"Unsupported cache codec: {codec}")
+    if codec == "zstd" and zstandard is None:
+        return "gzip"
+    return codec
+
+
+def detect_codec(data: bytes) -> str:
+    if data.startswith(_GZIP_MAGIC):
+        return "gzip"
+    if data.startswith(_ZSTD_MAGIC):
+        return "zstd"
+    return "json"
+
+
+def dumps_json(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def loads_json(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+
+def encode_payload(payload: dict[str, Any], codec: str = "json") -> bytes:
+    raw = dumps_json(payload)
+    if codec == "gzip":
+        return gzip.compress(raw, compresslevel=6)
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd codec requires the zstandard package")
+        return zstandard.ZstdCompressor(level=3).compress(raw)
+    return raw
+
+
+def decompress(data: bytes) -> bytes:
+    codec = detect_codec(data)
+    if codec == "gzip":
+        return gzip.decompress(data)
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd-compressed cache requires the zstandard package")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return data
+
+
+def decompress_payload(data: bytes) -> bytes:
+    """按文件头识别编码并解压（未压缩原样返回）；损坏的压缩流抛 ``ValueError``。"""
+    try:
+        return decompress(data)
+    except _DECOMPRESS_ERRORS as exc:
+        raise ValueError(f"Corrupt cache data: {exc}") from exc
+
+
+def decode_payload(data: bytes) -> dict[str, Any]:
+    """按文件头识别编码并解析；损坏的压缩流或 JSON 统一抛 ``ValueError``。"""
+    return loads_json(decompress_payload(data))
+
+
+def open_text_stream(path: Path) -> IO[str]:
+    """按文件头打开解压后的 UTF-8 文本流，供流式解析使用。"""
+    with path.open("rb") as probe:
+        codec = detect_codec(probe.read(4))
+    if codec == "gzip":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd-compressed cache requires the zstandard package")
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(path.open("rb")), encoding="utf-8")
+    return path.open("r", encoding="utf-8")
@@ -0,0 +1,208 @@
+"""缓存间差异：两份缓存（或同一 JQL 缓存的两个同步版本）之间新增、解决、换列、换负责人、优先级上调。
+
+- 比较对象是每个 issue 的紧凑投影（摘要 / 列 / 状态 / 责任人 / 优先级），按 key 建索引，一次遍历 O(n)。
+- 每次同步写缓存时把投影追加到 ``storage/cache_revisions/<cache_id>.json``，保留最近 ``MAX_REVISIONS`` 个版本，
+  这样同一 JQL 的前后两次同步也能比较，而缓存文件本身仍只保留最新内容。
+- 同一对版本的比较结果由 ``DiffCache`` 记忆。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable
+
+from .cache_store import is_cache_id
+
+
+REVISIONS_DIR_NAME = "cache_revisions"
+MAX_REVISIONS = 10
+
+CHANGE_NEW = "new"
+CHANGE_REMOVED = "removed"
+CHANGE_RESOLVED = "resolved"
+CHANGE_COLUMN = "column"
+CHANGE_OWNER = "owner"
+CHANGE_PRIORITY = "priority_escalated"
+CHANGE_TYPES = (CHANGE_NEW, CHANGE_RESOLVED, CHANGE_COLUMN, CHANGE_OWNER, CHANGE_PRIORITY, CHANGE_REMOVED)
+
+# 数字越大越紧急；未列出的优先级不参与「上调」判断
+PRIORITY_RANKS = {
+    "lowest": 1,
+    "low": 2,
+    "minor": 2,
+    "trivial": 1,
+    "medium": 3,
+    "major": 4,
+    "high": 4,
+    "highest": 5,
+    "critical": 5,
+    "blocker": 6,
+}
+
+
+def project_card(card: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "summary": card.get("summary") or "",
+        "column": card.get("column"),
+        "status": card.get("status"),
+        "owner": card.get("metric_owner") or card.get("assignee") or "Unassigned",
+        "priority": card.get("priority"),
+    }
+
+
+def build_projection(cards: Iterable[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    return {card["key"]: project_card(card) for card in cards if card.get("key")}
+
+
+def _priority_rank(name: str | None) -> int | None:
+    return PRIORITY_RANKS.get((name or "").strip().lower())
+
+
+def diff_projections(
+    before: dict[str, dict[str, Any]],
+    after: dict[str, dict[str, Any]],
+) -> list[dict[str, Any]]:
+    """结构化变更记录，按 ``CHANGE_TYPES`` 顺序、再按 key 排序。"""
+    changes: list[dict[str, Any]] = []
+
+    def record(change_type: str, key: str, row: dict[str, Any], old: Any = None, new: Any = None) -> None:
+        changes.append(
+            {
+                "type": change_type,
+                "key": key,
+                "summary": row.get("summary", ""),
+                "owner": row.get("owner"),
+                "from": old,
+                "to": new,
+            }
+        )
+
+    for key, row in after.items():
+        previous = before.get(key)
+        if previous is None:
+            record(CHANGE_NEW, key, row, new=row.get("column"))
+            continue
+        if row.get("column") != previous.get("column"):
+            if row.get("column") == "Done":
+                record(CHANGE_RESOLVED, key, row, previous.get("column"), row.get("column"))
+            else:
+                record(CHANGE_COLUMN, key, row, previous.get("column"), row.get("column"))
+        if row.get("owner") != previous.get("owner"):
+            record(CHANGE_OWNER, key, row, previous.get("owner"), row.get("owner"))
+        old_rank = _priority_rank(previous.get("priority"))
+        new_rank = _priority_rank(row.get("priority"))
+        if old_rank is not None and new_rank is not None and new_rank > old_rank:
+            record(CHANGE_PRIORITY, key, row, previous.get("priority"), row.get("priority"))
+
+    for key, row in before.items():
+        if key not in after:
+            record(CHANGE_REMOVED, key, row, old=row.get("column"))
+
+    order = {change_type: position for position, change_type in enumerate(CHANGE_TYPES)}
+    changes.sort(key=lambda change: (order[change["type"]], change["key"]))
+    return changes
+
+
+def count_changes(changes: list[dict[str, Any]]) -> dict[str, int]:
+    counts = {change_type: 0 for change_type in CHANGE_TYPES}
+    for change in changes:
+        counts[change["type"]] += 1
+    return counts
+
+
+def parse_revision_ref(value: str | None) -> tuple[str, int | None] | None:
+    """``<cache_id>`` 或 ``<cache_id>@<revision>``；格式不对返回 None。"""
+    text = (value or "").strip().lower()
+    cache_id, _, revision = text.partition("@")
+    if not is_cache_id(cache_id):
+        return None
+    if not revision:
+        return cache_id, None
+    if not revision.isdigit():
+        return None
+    return cache_id, int(revision)
+
+
+class RevisionStore:
+    def __init__(self, revisions_dir: Path, max_revisions: int = MAX_REVISIONS) -> None:
+        self.revisions_dir = Path(revisions_dir)
+        self.max_revisions = max_revisions
+        self._lock = threading.Lock()
+
+    def _path(self, cache_id: str) -> Path:
+        return self.revisions_dir / f"{cache_id}.json"
+
+    def revisions(self, cache_id: str) -> list[dict[str, Any]]:
+        path = self._path(cache_id)
+        if not path.is_file():
+            return []
+        try:
+            document = json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return []
+        return list(document.get("revisions") or [])
+
+    def get(self, cache_id: str, revision: int | None = None, before_latest: bool = False) -> dict[str, Any] | None:
+        """指定版本；``revision`` 为空取最新，``before_latest`` 取最新的上一个版本。"""
+        rows = self.revisions(cache_id)
+        if revision is not None:
+            return next((row for row in rows if row["revision"] == revision), None)
+        if before_latest:
+            return rows[-2] if len(rows) >= 2 else None
+        return rows[-1] if rows else None
+
+    def record(self, cache_id: str, version: str, projection: dict[str, dict[str, Any]]) -> dict[str, Any]:
+        with self._lock:
+            rows = self.revisions(cache_id)
+            latest = rows[-1] if rows else None
+            if latest and latest.get("version") == version:
+                return latest
+            row = {
+                "revision": (latest["revision"] + 1) if latest else 1,
+                "version": version,
+                "synced_at": datetime.now().astimezone().isoformat(timespec="seconds"),
+                "issue_count": len(projection),
+                "projection": projection,
+            }
+            rows = [*rows, row][-self.max_revisions:]
+            self.revisions_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(cache_id)
+            temp_path = path.with_name(f"{path.name}.tmp")
+            temp_path.write_text(json.dumps({"revisions": rows}, ensure_ascii=False), encoding="utf-8")
+            os.replace(temp_path, path)
+            return row
+
+    def delete(self, cache_id: str) -> None:
+        path = self._path(cache_id)
+        if path.is_file():
+            path.unlink()
+
+
+class DiffCache:
+    """按 (from 版本, to 版本) 记忆比较结果；版本号在内容变化时一定变化，因此无需主动失效。"""
+
+    def __init__(self, max_entries: int = 32) -> None:
+        self.max_entries = max_entries
+        self._entries: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(
+        self,
+        key: tuple[str, ...],
+        before: dict[str, dict[str, Any]],
+        after: dict[str, dict[str, Any]],
+    ) -> list[dict[str, Any]]:
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached is not None:
+            return cached
+        changes = diff_projections(before, after)
+        with self._lock:
+            self._entries[key] = changes
+            while len(self._entries) > self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+        return changes
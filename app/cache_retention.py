@@ -0,0 +1,92 @@
+"""查询缓存的保留与淘汰策略：总大小上限、最大存活天数、同一 JQL 输入保留份数。
+
+- 淘汰顺序按「最近访问」LRU（看板读取缓存时由 ``store.record_access`` 记录）。
+- 与配置 ``jql_filters`` 对应的默认查询缓存（无自定义 JQL 的预览）固定保留，不参与淘汰。
+- 刚由本次同步写入的缓存（``pinned_ids``）同样不参与淘汰，即使它的访问时间较旧。
+- 未配置任何上限时不淘汰，行为与旧版本一致。
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+
+def plan_eviction(
+    entries: list[dict[str, Any]],
+    retention: dict[str, Any] | None,
+    pinned_previews: set[str] | None = None,
+    now: float | None = None,
+    pinned_ids: set[str] | None = None,
+) -> list[dict[str, Any]]:
+    """返回应淘汰的缓存（附 ``reason``），不做任何删除。"""
+    settings = retention or {}
+    max_total_bytes = settings.get("max_total_bytes")
+    max_age_days = settings.get("max_age_days")
+    max_per_jql = settings.get("max_per_jql")
+    current = time.time() if now is None else now
+    pinned = pinned_previews or set()
+    pinned_cache_ids = pinned_ids or set()
+
+    def last_access(entry: dict[str, Any]) -> float:
+        return float(entry.get("last_accessed_at") or entry.get("updated_at") or 0)
+
+    # 最近访问在前
+    ordered = sorted(entries, key=last_access, reverse=True)
+    evicted: dict[str, dict[str, Any]] = {}
+
+    def is_pinned(entry: dict[str, Any]) -> bool:
+        return entry["jql_preview"] in pinned or entry["id"] in pinned_cache_ids
+
+    def evict(entry: dict[str, Any], reason: str) -> None:
+        if is_pinned(entry) or entry["id"] in evicted:
+            return
+        evicted[entry["id"]] = {**entry, "reason": reason}
+
+    if max_age_days:
+        cutoff = current - float(max_age_days) * 86400
+        for entry in ordered:
+            if float(entry.get("updated_at") or 0) < cutoff:
+                evict(entry, "max_age_days")
+
+    if max_per_jql:
+        kept_per_jql: dict[str, int] = {}
+        for entry in ordered:
+            if entry["id"] in evicted:
+                continue
+            group = (entry.get("custom_jql") or "").strip()
+            kept_per_jql[group] = kept_per_jql.get(group, 0) + 1
+            if kept_per_jql[group] > int(max_per_jql):
+                evict(entry, "max_per_jql")
+
+    if max_total_bytes:
+        total = sum(int(entry.get("size_bytes") or 0) for entry in ordered if entry["id"] not in evicted)
+        for entry in reversed(ordered):
+            if total <= int(max_total_bytes):
+                break
+            if entry["id"] in evicted or is_pinned(entry):
+                continue
+            evict(entry, "max_total_bytes")
+            total -= int(entry.get("size_bytes") or 0)
+
+    return list(evicted.values())
+
+
+def enforce_retention(
+    store: Any,
+    retention: dict[str, Any] | None,
+    pinned_previews: set[str] | None = None,
+    dry_run: bool = False,
+    now: float | None = None,
+    pinned_ids: set[str] | None = None,
+) -> list[dict[str, Any]]:
+    """按策略淘汰缓存；``dry_run`` 时只返回计划。"""
+    if not retention or not any(retention.get(key) for key in ("max_total_bytes", "max_age_days", "max_per_jql")):
+        return []
+    plan = plan_eviction(
+        store.entries(), retention, pinned_previews=pinned_previews, now=now, pinned_ids=pinned_ids
+    )
+    if not dry_run:
+        for entry in plan:
+            store.delete(entry["id"])
+    return plan
@@ -0,0 +1,292 @@
+"""本地查询缓存的存储后端：按 JQL 一个 JSON 文件（默认）或规范化的 SQLite issue 库。
+
+两种后端提供相同的鸭子类型接口，由 ``open_cache_store`` 按 ``cache_settings.backend`` 选择：
+
+- ``exists(cache_id)`` / ``load(cache_id)`` / ``save(cache_id, payload)``
+- ``load_header(cache_id)``（不含 issues 的元数据）/ ``iter_issues(cache_id)``（逐个产出原始 issue）
+- ``map_pages(cache_id, transform)``：按页对 issue 批量变换（分页缓存并发预读）/ ``version(cache_id)``
+- ``entries()``：缓存元数据列表（id / custom_jql / jql_preview / issue_count / updated_at / size_bytes / last_accessed_at）
+- ``latest_id()`` / ``location(cache_id)`` / ``source_label(cache_id, root)``
+- ``record_access(cache_id)`` / ``delete(cache_id)``：供保留策略（LRU 淘汰）使用
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, TypeVar
+
+from .cache_chunks import (
+    CHUNK_DIR_SUFFIX,
+    MANIFEST_NAME,
+    chunk_files,
+    iter_chunk_issues,
+    map_chunk_pages,
+    read_manifest,
+    write_chunked,
+)
+from .cache_codec import CODEC_SUFFIXES, CORRUPT_CACHE_ERRORS, decode_payload, encode_payload, resolve_codec
+from .cache_stream import iter_issues, read_header
+
+
+CACHE_BACKENDS = ("json", "sqlite")
+CACHE_LAYOUTS = ("single", "chunked")
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_LOAD_WORKERS = 4
+
+T = TypeVar("T")
+SQLITE_DB_NAME = "jira_issue_store.sqlite3"
+
+
+def is_cache_id(value: str | None) -> bool:
+    normalized = (value or "").strip().lower()
+    return len(normalized) == 64 and all(ch in "0123456789abcdef" for ch in normalized)
+
+
+def _split_cache_name(path: Path) -> tuple[str, str]:
+    """``<id>.json.gz`` → (``<id>``, ``.json.gz``)。"""
+    stem, _, rest = path.name.partition(".")
+    return stem, f".{rest}" if rest else ""
+
+
+def _relative_label(path: Path, root: Path) -> str:
+    try:
+        return str(path.resolve().relative_to(root.resolve())).replace("\\", "/")
+    except ValueError:
+        return str(path.resolve()).replace("\\", "/")
+
+
+class JsonCacheStore:
+    """每个 JQL 预览（sha256）对应 ``<cache_dir>/<id>.json[.gz|.zst]`` 的完整原始响应，
+    或 ``layout="chunked"`` 时的 ``<cache_dir>/<id>.chunks/``（见 ``app.cache_chunks``）。两种布局都可读取。"""
+
+    backend = "json"
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        codec: str | None = None,
+        layout: str | None = None,
+        page_size: int | None = None,
+        load_workers: int | None = None,
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.codec = resolve_codec(codec)
+        self.layout = str(layout or "single").strip().lower()
+        if self.layout not in CACHE_LAYOUTS:
+            raise ValueError(f"Unsupported cache layout: {self.layout}")
+        self.page_size = int(page_size or DEFAULT_PAGE_SIZE)
+        self.load_workers = int(load_workers or DEFAULT_LOAD_WORKERS)
+
+    def _chunk_dir(self, cache_id: str) -> Path:
+        return self.cache_dir / f"{cache_id}{CHUNK_DIR_SUFFIX}"
+
+    def _single_file(self, cache_id: str) -> Path | None:
+        for suffix in CODEC_SUFFIXES.values():
+            path = self.cache_dir / f"{cache_id}{suffix}"
+            if path.is_file():
+                return path
+        return None
+
+    def _is_chunked(self, cache_id: str) -> bool:
+        return (self._chunk_dir(cache_id) / MANIFEST_NAME).is_file()
+
+    def location(self, cache_id: str) -> Path:
+        """已存在的缓存（单文件任一编码，或分页目录）；不存在时为按当前配置写入的路径。"""
+        single = self._single_file(cache_id)
+        if single is not None:
+            return single
+        if self._is_chunked(cache_id) or self.layout == "chunked":
+            return self._chunk_dir(cache_id)
+        return self.cache_dir / f"{cache_id}{CODEC_SUFFIXES[self.codec]}"
+
+    def source_label(self, cache_id: str, root: Path) -> str:
+        return _relative_label(self.location(cache_id), root)
+
+    def exists(self, cache_id: str) -> bool:
+        return self._single_file(cache_id) is not None or self._is_chunked(cache_id)
+
+    def _existing(self, cache_id: str) -> Path:
+        """单文件路径，或分页缓存的 manifest 路径（其 mtime 即同步时间）。"""
+        single = self._single_file(cache_id)
+        if single is not None:
+            return single
+        if self._is_chunked(cache_id):
+            return self._chunk_dir(cache_id) / MANIFEST_NAME
+        raise FileNotFoundError("Query cache not found")
+
+    def load(self, cache_id: str) -> dict[str, Any]:
+        path = self._existing(cache_id)
+        if path.name == MANIFEST_NAME:
+            return {**self.load_header(cache_id), "issues": list(self.iter_issues(cache_id))}
+        try:
+            return decode_payload(path.read_bytes())
+        except ValueError as exc:
+            raise FileNotFoundError("Query cache not found") from exc
+
+    def load_header(self, cache_id: str) -> dict[str, Any]:
+        path = self._existing(cache_id)
+        try:
+            if path.name == MANIFEST_NAME:
+                return dict(read_manifest(path.parent).get("header") or {})
+            return read_header(path)
+        except CORRUPT_CACHE_ERRORS as exc:
+            raise FileNotFoundError("Query cache not found") from exc
+
+    def iter_issues(self, cache_id: str) -> Iterator[dict[str, Any]]:
+        path = self._existing(cache_id)
+        try:
+            if path.name == MANIFEST_NAME:
+                yield from iter_chunk_issues(path.parent)
+            else:
+                yield from iter_issues(path)
+        except CORRUPT_CACHE_ERRORS as exc:
+            raise FileNotFoundError("Query cache not found") from exc
+
+    def map_pages(self, cache_id: str, transform: Callable[[list[dict[str, Any]]], T]) -> Iterator[T]:
+        """按页产出 ``transform(页内 issues)``：分页缓存在线程池中并发预读 + 解压、按页序在当前线程变换，单文件按 ``page_size`` 流式分批。"""
+        path = self._existing(cache_id)
+        if path.name != MANIFEST_NAME:
+            yield from map_batches(self.iter_issues(cache_id), transform, self.page_size)
+            return
+        try:
+            yield from map_chunk_pages(path.parent, transform, self.load_workers)
+        except CORRUPT_CACHE_ERRORS as exc:
+            raise FileNotFoundError("Query cache not found") from exc
+
+    def save(self, cache_id: str, payload: dict[str, Any]) -> None:
+        if self.layout == "chunked":
+            write_chunked(self._chunk_dir(cache_id), payload, self.codec, self.page_size)
+            self._remove_single_files(cache_id)
+            return
+
+        target = self.cache_dir / f"{cache_id}{CODEC_SUFFIXES[self.codec]}"
+        # issues 固定写在最后，流式读取 read_header 才能在它之前停下
+        ordered = {key: value for key, value in payload.items() if key != "issues"}
+        ordered["issues"] = payload.get("issues") or []
+        target.write_bytes(encode_payload(ordered, self.codec))
+        # 切换编码 / 布局后清理同一缓存的旧格式，避免 location() 命中过期版本
+        self._remove_single_files(cache_id, keep=target)
+        shutil.rmtree(self._chunk_dir(cache_id), ignore_errors=True)
+
+    def _remove_single_files(self, cache_id: str, keep: Path | None = None) -> None:
+        for suffix in CODEC_SUFFIXES.values():
+            other = self.cache_dir / f"{cache_id}{suffix}"
+            if other != keep and other.is_file():
+                other.unlink()
+
+    def version(self, cache_id: str) -> str:
+        """缓存内容版本（mtime_ns + 大小）：只随 save 变化，供内存派生数据判断是否过期。"""
+        stat = self._existing(cache_id).stat()
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    def record_access(self, cache_id: str) -> None:
+        """显式写 atime 记录最近访问（不依赖挂载选项）；mtime 仍表示同步时间。"""
+        try:
+            path = self._existing(cache_id)
+            stat = path.stat()
+            os.utime(path, ns=(time.time_ns(), stat.st_mtime_ns))
+        except OSError:
+            pass
+
+    def delete(self, cache_id: str) -> None:
+        self._remove_single_files(cache_id)
+        shutil.rmtree(self._chunk_dir(cache_id), ignore_errors=True)
+
+    def _size_bytes(self, path: Path) -> int:
+        if path.name != MANIFEST_NAME:
+            return path.stat().st_size
+        try:
+            return sum(item.stat().st_size for item in chunk_files(path.parent))
+        except (OSError, ValueError):
+            return 0
+
+    def _files(self) -> list[Path]:
+        """每个缓存一个代表文件：单文件本身，或分页目录的 manifest。"""
+        suffixes = set(CODEC_SUFFIXES.values())
+        files: list[Path] = []
+        for path in self.cache_dir.glob("*.json*"):
+            stem, suffix = _split_cache_name(path)
+            if suffix in suffixes and is_cache_id(stem) and path.is_file():
+                files.append(path)
+        single_ids = {_split_cache_name(path)[0] for path in files}
+        for chunk_dir in self.cache_dir.glob(f"*{CHUNK_DIR_SUFFIX}"):
+            cache_id = chunk_dir.name[: -len(CHUNK_DIR_SUFFIX)]
+            manifest = chunk_dir / MANIFEST_NAME
+            if is_cache_id(cache_id) and cache_id not in single_ids and manifest.is_file():
+                files.append(manifest)
+        return files
+
+    @staticmethod
+    def _cache_id_of(path: Path) -> str:
+        if path.name == MANIFEST_NAME:
+            return path.parent.name[: -len(CHUNK_DIR_SUFFIX)]
+        return _split_cache_name(path)[0]
+
+    def latest_id(self) -> str | None:
+        files = self._files()
+        if not files:
+            return None
+        return self._cache_id_of(max(files, key=lambda path: path.stat().st_mtime))
+
+    def entries(self) -> list[dict[str, Any]]:
+        rows: list[dict[str, Any]] = []
+        for path in self._files():
+            cache_id = self._cache_id_of(path)
+            try:
+                header = self.load_header(cache_id)
+                stat = path.stat()
+            except OSError:
+                continue
+            rows.append(
+                {
+                    "id": cache_id,
+                    "custom_jql": header.get("custom_jql"),
+                    "jql_preview": str(header.get("jql_preview", "")),
+                    "issue_count": int(header.get("issue_count", 0)),
+                    "updated_at": stat.st_mtime,
+                    "size_bytes": self._size_bytes(path),
+                    "last_accessed_at": max(stat.st_atime, stat.st_mtime),
+                }
+            )
+        return rows
+
+
+def map_batches(
+    issues: Iterable[dict[str, Any]],
+    transform: Callable[[list[dict[str, Any]]], T],
+    batch_size: int,
+) -> Iterator[T]:
+    """把逐条产出的 issue 按 ``batch_size`` 分批后依次 ``transform``（无分页文件的后端共用）。"""
+    batch: list[dict[str, Any]] = []
+    for issue in issues:
+        batch.append(issue)
+        if len(batch) >= batch_size:
+            yield transform(batch)
+            batch = []
+    if batch:
+        yield transform(batch)
+
+
+def open_cache_store(cache_settings: dict[str, Any] | None, storage_dir: Path) -> Any:
+    """按配置打开缓存后端；SQLite 首次打开时导入已有的 JSON 缓存，旧缓存继续可用。"""
+    settings = cache_settings or {}
+    backend = str(settings.get("backend") or "json").strip().lower()
+    json_store = JsonCacheStore(
+        Path(storage_dir) / "jira_query_cache",
+        codec=settings.get("codec"),
+        layout=settings.get("layout"),
+        page_size=settings.get("page_size"),
+        load_workers=settings.get("load_workers"),
+    )
+    if backend != "sqlite":
+        return json_store
+
+    from .issue_store import SqliteIssueStore  # issue_store 依赖本模块，延迟导入避免循环
+
+    sqlite_store = SqliteIssueStore(Path(storage_dir) / SQLITE_DB_NAME)
+    sqlite_store.import_from(json_store)
+    return sqlite_store
@@ -0,0 +1,109 @@
+"""缓存文件的流式读取：逐个产出 ``issues`` 数组中的原始 issue，不把整个文件/解析树放进内存。
+
+基于标准库 ``json.JSONDecoder.raw_decode`` 的增量解析：缓冲区只保留「当前正在解析的值 + 一个读块」，
+峰值内存由最大的单个 issue 决定。缓存写入时 ``issues`` 位于最后，``read_header`` 只读到它之前即返回。
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+from .cache_codec import open_text_stream
+
+
+_CHUNK_SIZE = 1 << 16
+_WHITESPACE = " \t\n\r"
+_DECODER = json.JSONDecoder()
+
+
+class _IncrementalReader:
+    def __init__(self, stream: IO[str]) -> None:
+        self.stream = stream
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size: int = _CHUNK_SIZE) -> bool:
+        if self.eof:
+            return False
+        chunk = self.stream.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        # 丢弃已消费部分，缓冲区不随文件增长
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def take(self, expected: str) -> str:
+        char = self.peek()
+        if char not in expected:
+            raise ValueError(f"Malformed cache JSON: expected one of {expected!r}, got {char!r}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # 值跨越缓冲区末尾：按已缓冲长度倍增读取，保证整体线性
+                if not self._fill(max(_CHUNK_SIZE, len(self.buffer) - self.pos)):
+                    raise
+                continue
+            # 裸数字恰好停在缓冲区末尾时可能被截断，补读后重解析
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _walk(stream: IO[str], stop_at_issues: bool) -> Iterator[tuple[str, Any]]:
+    """产出顶层 ``(key, value)``；``issues`` 数组按元素产出 ``("issues", issue)``。"""
+    reader = _IncrementalReader(stream)
+    reader.take("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.value()
+        reader.take(":")
+        if key == "issues":
+            if stop_at_issues:
+                return
+            reader.take("[")
+            if reader.peek() == "]":
+                reader.take("]")
+            else:
+                while True:
+                    yield key, reader.value()
+                    if reader.take(",]") == "]":
+                        break
+        else:
+            yield key, reader.value()
+        if reader.take(",}") == "}":
+            return
+
+
+def read_header(path: Path) -> dict[str, Any]:
+    """读取 ``issues`` 之前的顶层字段（custom_jql / jql_preview / issue_count 等）。"""
+    with open_text_stream(path) as stream:
+        return dict(_walk(stream, stop_at_issues=True))
+
+
+def iter_issues(path: Path) -> Iterator[dict[str, Any]]:
+    with open_text_stream(path) as stream:
+        for key, value in _walk(stream, stop_at_issues=False):
+            if key == "issues":
+                yield value
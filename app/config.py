@@ -1,10 +1,19 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import logging
+import threading
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+from .period import parse_week_start, resolve_timezone
+from .working_calendar import parse_working_calendar
+
+
+logger = logging.getLogger(__name__)
 
 DEFAULT_CONFIG_PATH = Path(__file__).resolve().parent.parent / "config" / "jira_auth.yaml"
 
@@ -24,6 +33,19 @@ def normalize_task_owner_field_id(raw: Any) -> str | None:
     return s
 
 
+def _optional_positive(raw: Any, cast: type, key: str) -> Any:
+    """可选的正数配置：空值 / 0 视为不限制。"""
+    if raw is None or str(raw).strip() == "":
+        return None
+    try:
+        value = cast(raw)
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid {key}: {raw}") from exc
+    if value < 0:
+        raise ValueError(f"Invalid {key}: {raw}")
+    return value or None
+
+
 def load_config(config_path: str | None = None) -> dict[str, Any]:
     path = Path(config_path) if config_path else DEFAULT_CONFIG_PATH
     if not path.exists():
@@ -42,6 +64,24 @@ def load_config(config_path: str | None = None) -> dict[str, Any]:
     default_filter_id = filter_settings.get("default_filter_id")
     status_mapping = content.get("status_mapping") or {}
     role_settings = content.get("role_settings") or {}
+    cache_settings = content.get("cache_settings") or {}
+
+    cache_backend = str(cache_settings.get("backend") or "json").strip().lower()
+    if cache_backend not in ("json", "sqlite"):
+        raise ValueError(f"Unsupported cache_settings.backend: {cache_backend}")
+    cache_codec = str(cache_settings.get("codec") or "json").strip().lower()
+    if cache_codec not in ("json", "gzip", "zstd"):
+        raise ValueError(f"Unsupported cache_settings.codec: {cache_codec}")
+    cache_layout = str(cache_settings.get("layout") or "single").strip().lower()
+    if cache_layout not in ("single", "chunked"):
+        raise ValueError(f"Unsupported cache_settings.layout: {cache_layout}")
+    retention = cache_settings.get("retention") or {}
+    warmup = cache_settings.get("warmup") or {}
+    results = cache_settings.get("results") or {}
+    agile_settings = content.get("agile_settings") or {}
+    period_settings = content.get("period_settings") or {}
+    period_timezone = str(period_settings.get("timezone") or "").strip() or None
+    resolve_timezone(period_timezone)
 
     # Parse teams
     raw_teams = content.get("teams") or []
@@ -106,6 +146,117 @@ def load_config(config_path: str | None = None) -> dict[str, Any]:
             "allowed_filter_ids": [str(item).strip() for item in allowed_filter_ids if str(item).strip()],
             "default_filter_id": str(default_filter_id).strip() if str(default_filter_id).strip() else None,
         },
+        "cache_settings": {
+            "backend": cache_backend,
+            "codec": cache_codec,
+            "layout": cache_layout,
+            # 空值 / 0 时用 cache_store 的默认值（每页 500 条、4 个读取线程）
+            "page_size": _optional_positive(cache_settings.get("page_size"), int, "cache_settings.page_size"),
+            "load_workers": _optional_positive(cache_settings.get("load_workers"), int, "cache_settings.load_workers"),
+            # 启动预热：后台归一化最近 latest 个缓存与 jql_filters 默认查询缓存
+            "warmup": {
+                "enabled": bool(warmup.get("enabled", False)),
+                "latest": _optional_positive(warmup.get("latest"), int, "cache_settings.warmup.latest") or 3,
+            },
+            # 结果缓存（看板指标 / 周期总结等）：条数与字节上限；滚动窗口的缓存键按 window_bucket_seconds 分桶
+            "results": {
+                "max_entries": _optional_positive(results.get("max_entries"), int, "cache_settings.results.max_entries")
+                or 128,
+                "max_bytes": _optional_positive(results.get("max_bytes"), int, "cache_settings.results.max_bytes")
+                or 64 * 1024 * 1024,
+                "window_bucket_seconds": _optional_positive(
+                    results.get("window_bucket_seconds"), int, "cache_settings.results.window_bucket_seconds"
+                )
+                or 300,
+            },
+            "retention": {
+                "max_total_bytes": _optional_positive(
+                    retention.get("max_total_bytes"), int, "cache_settings.retention.max_total_bytes"
+                ),
+                "max_age_days": _optional_positive(
+                    retention.get("max_age_days"), float, "cache_settings.retention.max_age_days"
+                ),
+                "max_per_jql": _optional_positive(
+                    retention.get("max_per_jql"), int, "cache_settings.retention.max_per_jql"
+                ),
+            },
+        },
         # 可选：Task Owner 自定义字段；支持 customfield_* 或纯数字 id
         "task_owner_field": normalize_task_owner_field_id(content.get("task_owner_field")),
+        # 统计窗口：团队时区（IANA 名称，空为服务器本地时区）与周起始日
+        "period_settings": {
+            "timezone": period_timezone,
+            "week_start": parse_week_start(period_settings.get("week_start")),
+        },
+        # 工作日历：工作日、每日工作时段、节假日与调休补班日，用于按工作时间（time_basis=business）计时长
+        "working_calendar": parse_working_calendar(content.get("working_calendar")),
+        # 可选：Sprint 元数据（Jira Agile API），用于按真实起止时间解析 sprint 窗口
+        "agile_settings": {
+            "board_id": _optional_positive(agile_settings.get("board_id"), int, "agile_settings.board_id"),
+            "sprint_field": normalize_task_owner_field_id(agile_settings.get("sprint_field")),
+            "sprint_ttl_seconds": _optional_positive(
+                agile_settings.get("sprint_ttl_seconds"), int, "agile_settings.sprint_ttl_seconds"
+            )
+            or 3600,
+        },
     }
+
+
+def config_fingerprint(cfg: dict[str, Any] | None) -> str:
+    """解析后配置的稳定摘要（键排序后的 JSON 的 sha256 前 16 位），供下游缓存作失效键。"""
+    encoded = json.dumps(cfg or {}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+class CachedConfig:
+    """按配置文件 ``(st_mtime_ns, st_size)`` 缓存 ``load_config`` 的结果。
+
+    未变化时每次 ``get()`` 只有一次 ``stat``；变化时重新解析并校验，成功后整体替换（读方不会看到半新半旧的配置）。
+    新内容有误（文件缺失、YAML 或校验失败）时记录错误日志，继续使用上一次成功加载的配置，文件再次修改后重新加载；
+    从未成功加载过时才抛出异常。返回的 dict 在多个请求间共享，调用方不要修改。
+
+    以下配置只在启动时读取，修改后需重启：``cache_settings`` 的 ``backend`` / ``codec`` / ``layout`` /
+    ``page_size`` / ``load_workers``（缓存存储）、``warmup``（启动预热）与 ``results.max_entries`` / ``max_bytes``
+    （结果缓存容量）。其余配置（含 ``results.window_bucket_seconds``、``retention``、``agile_settings``）下一次请求即生效。
+    """
+
+    def __init__(self, config_path: str | None = None) -> None:
+        self.path = Path(config_path) if config_path else DEFAULT_CONFIG_PATH
+        self._lock = threading.Lock()
+        self._state: tuple[tuple[int, int] | None, dict[str, Any], str] | None = None
+
+    def _stat_key(self) -> tuple[int, int] | None:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _current(self) -> tuple[tuple[int, int] | None, dict[str, Any], str]:
+        key = self._stat_key()
+        state = self._state
+        if state is not None and state[0] == key:
+            return state
+        with self._lock:
+            state = self._state
+            if state is None or state[0] != key:
+                try:
+                    if key is None:
+                        raise FileNotFoundError(f"Config file not found: {self.path}")
+                    cfg = load_config(str(self.path))
+                except (OSError, yaml.YAMLError, ValueError, AttributeError, TypeError) as error:
+                    if state is None:
+                        raise
+                    logger.error("Invalid config %s, keeping the last good config: %s", self.path, error)
+                    state = (key, state[1], state[2])
+                else:
+                    state = (key, cfg, config_fingerprint(cfg))
+                self._state = state
+        return state
+
+    def get(self) -> dict[str, Any]:
+        return self._current()[1]
+
+    @property
+    def fingerprint(self) -> str:
+        return self._current()[2]
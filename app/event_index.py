@@ -0,0 +1,267 @@
+"""缓存级变更事件索引与看板时间回溯（``as_of``）。
+
+把每个 issue 的 changelog 摊平为按时间排序的 ``(issue, 时间, 字段, from, to)`` 事件，只保留看板需要的
+``status`` / ``assignee`` / ``Task Owner``（任务负责人）。每个 issue、每个字段另存一条有序时间数组，
+回溯到某一时刻时按 issue 二分查找，不访问 Jira，也不重新解析缓存。
+
+索引与缓存版本（``store.version``）绑定，由 ``EventIndexCache`` 在内存中复用，拖动时间轴时只做二分。
+看板首次归一化某个缓存版本时，在同一遍按页读取中逐页 ``add_issue``，不再为建索引单独读一遍缓存。
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_right
+from datetime import datetime
+from typing import Any, Iterable
+
+from .normalize import (
+    _is_task_owner_changelog_field,
+    build_role_groups,
+    build_status_groups,
+    determine_column,
+    parse_datetime,
+)
+
+
+FIELD_STATUS = "status"
+FIELD_ASSIGNEE = "assignee"
+FIELD_TASK_OWNER = "task_owner"
+
+# 回溯时晚于 as_of 即清空的时间线字段（及其对应的「指派给谁」）
+_TIMELINE_POINTS = {
+    "product_assigned_at": "product_assigned_to",
+    "dev_manager_assigned_at": "dev_manager_assigned_to",
+    "developer_started_at": None,
+    "in_progress_at": None,
+    "review_at": None,
+    "closed_at": None,
+}
+
+_MISSING = object()
+
+
+def _timestamp(value: str | None) -> float | None:
+    point = parse_datetime(value)
+    return point.timestamp() if point else None
+
+
+def _tracked_field(raw_field: str | None) -> str | None:
+    name = (raw_field or "").strip()
+    lowered = name.lower()
+    if lowered == FIELD_STATUS:
+        return FIELD_STATUS
+    if lowered == FIELD_ASSIGNEE:
+        return FIELD_ASSIGNEE
+    if _is_task_owner_changelog_field(name):
+        return FIELD_TASK_OWNER
+    return None
+
+
+class EventIndex:
+    """事件结构：``(ts, issue_key, field, created, from_display, to_display, to_login)``。"""
+
+    def __init__(self) -> None:
+        self.events: list[tuple[Any, ...]] = []
+        self._series: dict[str, dict[str, tuple[list[float], list[tuple[Any, ...]]]]] = {}
+
+    def add_issue(self, issue: dict[str, Any]) -> None:
+        key = issue.get("key")
+        if not key:
+            return
+        for history in (issue.get("changelog") or {}).get("histories") or []:
+            created = history.get("created")
+            ts = _timestamp(created)
+            if ts is None:
+                continue
+            for item in history.get("items") or []:
+                field = _tracked_field(item.get("field"))
+                if field is None:
+                    continue
+                self.events.append(
+                    (
+                        ts,
+                        key,
+                        field,
+                        created,
+                        (item.get("fromString") or item.get("from") or "").strip() or None,
+                        (item.get("toString") or item.get("to") or "").strip() or None,
+                        (item.get("to") or "").strip() or None,
+                    )
+                )
+
+    def finalize(self) -> "EventIndex":
+        # 稳定排序：同一时刻的多条变更保持 changelog 内顺序
+        self.events.sort(key=lambda event: event[0])
+        self._series = {}
+        for event in self.events:
+            fields = self._series.setdefault(event[1], {})
+            times, values = fields.setdefault(event[2], ([], []))
+            times.append(event[0])
+            values.append(event)
+        return self
+
+    def _lookup(self, key: str, field: str, at: float) -> tuple[list[tuple[Any, ...]], int] | None:
+        series = self._series.get(key, {}).get(field)
+        if not series:
+            return None
+        times, values = series
+        return values, bisect_right(times, at)
+
+    def value_at(self, key: str, field: str, at: float) -> Any:
+        """``at`` 时刻字段取值；该字段无任何变更记录时返回 ``_MISSING``（沿用当前值）。"""
+        found = self._lookup(key, field, at)
+        if found is None:
+            return _MISSING
+        values, position = found
+        if position:
+            return values[position - 1][5]
+        # 第一次变更之前：取该变更的 from
+        return values[0][4]
+
+    def events_until(self, key: str, field: str, at: float) -> list[tuple[Any, ...]]:
+        found = self._lookup(key, field, at)
+        if found is None:
+            return []
+        values, position = found
+        return values[:position]
+
+
+class EventIndexCache:
+    """按 cache_id 复用事件索引；缓存版本变化（重新同步）后重建。"""
+
+    def __init__(self, max_entries: int = 8) -> None:
+        self.max_entries = max_entries
+        self._entries: dict[str, tuple[str, EventIndex]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, cache_id: str, version: str) -> EventIndex | None:
+        with self._lock:
+            entry = self._entries.get(cache_id)
+        if entry and entry[0] == version:
+            return entry[1]
+        return None
+
+    def put(self, cache_id: str, version: str, index: EventIndex) -> None:
+        with self._lock:
+            self._entries.pop(cache_id, None)
+            self._entries[cache_id] = (version, index)
+            while len(self._entries) > self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+
+
+def parse_as_of(value: str | None) -> datetime | None:
+    """解析 ``as_of``（ISO 时间或日期）；无时区按本地时区。非法值抛 ValueError。"""
+    text = (value or "").strip()
+    if not text:
+        return None
+    point = parse_datetime(text)
+    if point is None:
+        raise ValueError(f"Invalid as_of timestamp: {value}")
+    if point.tzinfo is None:
+        point = point.astimezone()
+    return point
+
+
+def _owner_at(
+    card: dict[str, Any],
+    index: EventIndex,
+    at: float,
+    assignee_at: str,
+    role_groups: dict[str, set[str]],
+) -> str:
+    key = card["key"]
+    task_owner = index.value_at(key, FIELD_TASK_OWNER, at)
+    if task_owner is not _MISSING:
+        if task_owner and task_owner != "-":
+            return task_owner
+    elif card.get("task_owner_source") == "jira_field":
+        # 字段值没有历史可查，沿用当前 Task Owner
+        return card.get("metric_owner") or assignee_at
+
+    if card.get("metric_owner") == card.get("assignee"):
+        return assignee_at
+
+    # 当前由角色推导（产品 / 测试回退到开发）：按 as_of 之前的指派历史同样推导
+    pm_roles = role_groups["product_manager_roles"]
+    quality_roles = role_groups["quality_roles"]
+    developer_roles = role_groups["developer_roles"]
+    if assignee_at.lower() not in pm_roles | quality_roles:
+        return assignee_at
+    non_dev_roles = pm_roles | quality_roles | role_groups["dev_manager_roles"]
+    history = list(reversed(index.events_until(key, FIELD_ASSIGNEE, at)))
+    for match in (
+        lambda names: bool(developer_roles and names & developer_roles),
+        lambda names: not names & non_dev_roles,
+    ):
+        for event in history:
+            if not event[5]:
+                continue
+            if match({event[5].lower(), (event[6] or "").lower()}):
+                return event[5]
+    return assignee_at
+
+
+def cards_as_of(
+    cards: Iterable[dict[str, Any]],
+    index: EventIndex,
+    as_of: datetime,
+    status_mapping: dict[str, list[str]] | None = None,
+    role_settings: dict[str, list[str]] | None = None,
+) -> list[dict[str, Any]]:
+    """把当前卡片回溯到 ``as_of``：去掉之后才创建的 issue，重建列、经办人、责任人与时间线。"""
+    at = as_of.timestamp()
+    status_groups = build_status_groups(status_mapping)
+    role_groups = build_role_groups(role_settings)
+    done_states = status_groups["done"]
+    output: list[dict[str, Any]] = []
+
+    for card in cards:
+        timeline = dict(card.get("timeline") or {})
+        created = _timestamp(timeline.get("created_at"))
+        if created is not None and created > at:
+            continue
+        key = card["key"]
+
+        status = index.value_at(key, FIELD_STATUS, at)
+        if status is _MISSING:
+            status = card.get("status")
+
+        done_events = [
+            event for event in index.events_until(key, FIELD_STATUS, at) if (event[5] or "").lower() in done_states
+        ]
+        # 与 extract_timeline 一致：以 as_of 之前最后一次进入 done 为准
+        if done_events:
+            resolved_at = done_events[-1][3]
+        else:
+            # 无「进入 done」的变更记录：当前解决时间（来自 resolutiondate 等回退）不晚于 as_of 才保留
+            resolved = _timestamp(timeline.get("resolved_at"))
+            resolved_at = timeline.get("resolved_at") if resolved is not None and resolved <= at else None
+        timeline["resolved_at"] = resolved_at
+
+        for point_key, target_key in _TIMELINE_POINTS.items():
+            point = _timestamp(timeline.get(point_key))
+            if point is not None and point > at:
+                timeline[point_key] = None
+                if target_key:
+                    timeline[target_key] = None
+        timeline["reopened_events"] = [
+            event_at for event_at in timeline.get("reopened_events") or [] if (_timestamp(event_at) or 0) <= at
+        ]
+
+        assignee = index.value_at(key, FIELD_ASSIGNEE, at)
+        if assignee is _MISSING:
+            assignee = card.get("assignee")
+        assignee = assignee or "Unassigned"
+
+        output.append(
+            {
+                **card,
+                "status": status,
+                "column": determine_column(status, status_groups=status_groups, resolution_date=resolved_at),
+                "assignee": assignee,
+                "metric_owner": _owner_at(card, index, at, assignee, role_groups),
+                "timeline": timeline,
+            }
+        )
+    return output
@@ -0,0 +1,256 @@
+"""按天的团队 / 负责人计数快照，存于 ``storage/team_issue_history.json`` 的 ``snapshots`` 段。
+
+每次同步后记录一行：看板整体、每个团队（``teams`` 配置）和每个负责人在各列的数量、WIP，
+以及自上一条快照以来新建 / 解决 / 重开的数量。趋势查询只读本文件，无需重放原始缓存。
+
+存储格式（每个缓存 id、每个 scope 一条序列）::
+
+    {"snapshots": {"<cache_id>": {"jql_preview": "...", "scopes": {
+        "board": [["2026-03-02", "d", {"todo": 5, "done": 12}], ["2026-03-03", "d", {"todo": -1, "done": 1}]],
+        "team:algo": [...], "owner:谢屹": [...]}}}}
+
+- 行内只记录与上一行的差值（delta 编码），计数为 0 的指标省略。
+- 超过 ``DAILY_RETENTION_DAYS`` 的按天行降采样为按周行（``"w"``）：存量取周内最后一天，流量求和；每天同步时
+  新过期的一天并入已有的同周行，每个 scope 每周至多一行，文件大小与保留天数 + 周数成正比。
+- 每次同步整体重写本文件（临时文件 + ``os.replace``）：行已按差值编码、过期行已压缩，文件很小，
+  不单独维护追加日志。
+- 文件中其它顶层字段原样保留。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from .normalize import parse_datetime
+from .period import PeriodEngine
+from .teams import build_member_team_index, teams_of
+
+
+HISTORY_FILE_NAME = "team_issue_history.json"
+DAILY_RETENTION_DAYS = 90
+STOCK_METRICS = ("todo", "in_progress", "review", "done", "wip", "total")
+FLOW_METRICS = ("created", "resolved", "reopened")
+_COLUMN_METRICS = {"To Do": "todo", "In Progress": "in_progress", "审核中": "review", "Done": "done"}
+
+Row = tuple[str, str, dict[str, int]]
+
+
+def _scope_keys(card: dict[str, Any], team_index: dict[str, list[str]]) -> list[str]:
+    owner = str(card.get("metric_owner") or card.get("assignee") or "Unassigned")
+    return ["board", f"owner:{owner}", *(f"team:{team_id}" for team_id in teams_of(owner, team_index))]
+
+
+def compute_scope_counts(
+    cards: list[dict[str, Any]],
+    teams: list[dict[str, Any]] | None,
+    flow_start: datetime,
+    flow_end: datetime,
+) -> dict[str, dict[str, int]]:
+    """各 scope 的存量（当前列、WIP、总数）与 [flow_start, flow_end) 内的流量计数。"""
+    team_index = build_member_team_index(teams)
+    counts: dict[str, dict[str, int]] = {}
+
+    def in_flow(value: str | None) -> bool:
+        point = parse_datetime(value)
+        return bool(point and flow_start <= point < flow_end)
+
+    for card in cards:
+        timeline = card.get("timeline") or {}
+        increments: dict[str, int] = {"total": 1}
+        column_metric = _COLUMN_METRICS.get(card.get("column") or "")
+        if column_metric:
+            increments[column_metric] = 1
+        if card.get("column") in {"In Progress", "审核中"}:
+            increments["wip"] = 1
+        if in_flow(timeline.get("created_at")):
+            increments["created"] = 1
+        if in_flow(timeline.get("resolved_at")):
+            increments["resolved"] = 1
+        reopened = sum(1 for event_at in timeline.get("reopened_events") or [] if in_flow(event_at))
+        if reopened:
+            increments["reopened"] = reopened
+
+        for scope in _scope_keys(card, team_index):
+            bucket = counts.setdefault(scope, {})
+            for metric, value in increments.items():
+                bucket[metric] = bucket.get(metric, 0) + value
+    return counts
+
+
+def encode_rows(rows: list[Row]) -> list[list[Any]]:
+    encoded: list[list[Any]] = []
+    previous: dict[str, int] = {}
+    for day, period, counts in rows:
+        delta = {
+            metric: counts.get(metric, 0) - previous.get(metric, 0)
+            for metric in {*counts, *previous}
+            if counts.get(metric, 0) != previous.get(metric, 0)
+        }
+        encoded.append([day, period, dict(sorted(delta.items()))])
+        previous = counts
+    return encoded
+
+
+def decode_rows(encoded: list[list[Any]]) -> list[Row]:
+    rows: list[Row] = []
+    current: dict[str, int] = {}
+    for day, period, delta in encoded:
+        current = dict(current)
+        for metric, change in delta.items():
+            current[metric] = current.get(metric, 0) + int(change)
+        current = {metric: value for metric, value in current.items() if value}
+        rows.append((day, period, current))
+    return rows
+
+
+def _week_start(day: date, week_start: int = 0) -> date:
+    return day - timedelta(days=(day.weekday() - week_start) % 7)
+
+
+def _merge_week(previous: dict[str, int] | None, counts: dict[str, int]) -> dict[str, int]:
+    """把较新的一行并入同周行：存量取较新的值，流量求和。"""
+    merged = {metric: counts[metric] for metric in STOCK_METRICS if counts.get(metric)}
+    for metric in FLOW_METRICS:
+        total = counts.get(metric, 0) + ((previous or {}).get(metric, 0))
+        if total:
+            merged[metric] = total
+    return merged
+
+
+def downsample_rows(
+    rows: list[Row],
+    today: date,
+    daily_retention_days: int = DAILY_RETENTION_DAYS,
+    week_start: int = 0,
+) -> list[Row]:
+    """早于保留期的按天行并入所在周的 ``"w"`` 行；已有的 ``"w"`` 行按周键合并，每周最多一行。"""
+    cutoff = today - timedelta(days=daily_retention_days)
+    output: list[Row] = []
+    week_positions: dict[str, int] = {}
+    for day, period, counts in rows:
+        point = date.fromisoformat(day)
+        if period == "d" and point >= cutoff:
+            output.append((day, period, counts))
+            continue
+        week_key = _week_start(point, week_start).isoformat()
+        position = week_positions.get(week_key)
+        if position is None:
+            week_positions[week_key] = len(output)
+            output.append((week_key, "w", _merge_week(None, counts)))
+        else:
+            output[position] = (week_key, "w", _merge_week(output[position][2], counts))
+    return output
+
+
+class TeamHistoryStore:
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def _read(self) -> dict[str, Any]:
+        if not self.path.is_file():
+            return {}
+        try:
+            document = json.loads(self.path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return {}
+        return document if isinstance(document, dict) else {}
+
+    def _write(self, document: dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(f"{self.path.name}.tmp")
+        temp_path.write_text(json.dumps(document, ensure_ascii=False), encoding="utf-8")
+        os.replace(temp_path, self.path)
+
+    def record_snapshot(
+        self,
+        cache_id: str,
+        jql_preview: str,
+        cards: list[dict[str, Any]],
+        teams: list[dict[str, Any]] | None = None,
+        now: datetime | None = None,
+        period: PeriodEngine | None = None,
+    ) -> None:
+        """``period`` 决定「哪一天」与周起始日（``period_settings`` 的时区 / ``week_start``），缺省为服务器本地、周一。"""
+        period = period or PeriodEngine()
+        current = period.localize(now) if now is not None else period.now()
+        today = current.date()
+        today_key = today.isoformat()
+
+        with self._lock:
+            document = self._read()
+            section = document.setdefault("snapshots", {})
+            entry = section.setdefault(cache_id, {"jql_preview": jql_preview, "scopes": {}})
+            entry["jql_preview"] = jql_preview
+            scopes: dict[str, list[list[Any]]] = entry.setdefault("scopes", {})
+
+            # 流量区间：上一个已记录日期的次日 0 点 → 现在；同日重复同步覆盖当日行
+            board_rows = decode_rows(scopes.get("board", []))
+            earlier_days = [date.fromisoformat(day) for day, _, _ in board_rows if day < today_key]
+            flow_day = max(earlier_days) + timedelta(days=1) if earlier_days else today
+            flow_start = period.day_start(min(flow_day, today))
+            counts_by_scope = compute_scope_counts(cards, teams, flow_start, current)
+
+            for scope in {*scopes, *counts_by_scope}:
+                rows = decode_rows(scopes.get(scope, []))
+                counts = counts_by_scope.get(scope, {})
+                if rows and rows[-1][0] == today_key:
+                    rows.pop()
+                if not counts and (not rows or not rows[-1][2]):
+                    # 该 scope 已无数据且上一行也为空：不再追加空行
+                    if rows:
+                        scopes[scope] = encode_rows(rows)
+                    else:
+                        scopes.pop(scope, None)
+                    continue
+                rows.append((today_key, "d", counts))
+                scopes[scope] = encode_rows(downsample_rows(rows, today, week_start=period.week_start))
+
+            document["updated_at"] = current.isoformat()
+            self._write(document)
+
+    def scopes(self, cache_id: str) -> list[str]:
+        entry = (self._read().get("snapshots") or {}).get(cache_id) or {}
+        return sorted((entry.get("scopes") or {}).keys())
+
+    def trend(
+        self,
+        cache_id: str,
+        scope: str = "board",
+        weeks: int = 12,
+        now: datetime | None = None,
+        period: PeriodEngine | None = None,
+    ) -> list[dict[str, Any]]:
+        """最近 ``weeks`` 周（含本周）的周序列：存量取周内最后一次快照，流量求和；无快照的周存量为 None。
+
+        周边界按 ``period`` 的时区与周起始日划分（与 ``record_snapshot`` 一致）。
+        """
+        period = period or PeriodEngine()
+        entry = (self._read().get("snapshots") or {}).get(cache_id) or {}
+        rows = decode_rows((entry.get("scopes") or {}).get(scope, []))
+        current_week = period.week_floor((period.localize(now) if now is not None else period.now()).date())
+        starts = [current_week - timedelta(weeks=offset) for offset in range(max(weeks, 1) - 1, -1, -1)]
+        buckets: dict[date, dict[str, Any]] = {
+            start: {
+                "week_start": start.isoformat(),
+                "snapshot_count": 0,
+                **{metric: None for metric in STOCK_METRICS},
+                **{metric: 0 for metric in FLOW_METRICS},
+            }
+            for start in starts
+        }
+        for day, _, counts in rows:
+            bucket = buckets.get(period.week_floor(date.fromisoformat(day)))
+            if bucket is None:
+                continue
+            bucket["snapshot_count"] += 1
+            for metric in STOCK_METRICS:
+                bucket[metric] = counts.get(metric, 0)
+            for metric in FLOW_METRICS:
+                bucket[metric] += counts.get(metric, 0)
+        return [buckets[start] for start in starts]
@@ -0,0 +1,116 @@
+"""写缓存前裁剪 Jira 原始响应：只保留 ``normalize_issue`` 及同步流程会读到的内容。
+
+- changelog：只保留 ``status`` / ``assignee`` / Task Owner（任务负责人）条目，条目只留 from/to 及其显示值；
+  裁剪后没有条目的 history 整条丢弃。
+- fields：只保留 ``KEPT_FIELDS`` 与配置的 ``task_owner_field`` / ``agile_settings.sprint_field``；对象值（用户、状态、优先级等）去掉
+  头像、``self`` 链接、iconUrl 等子字段，只留 ``_KEPT_REF_KEYS``。
+
+规则有版本号 ``PRUNE_RULES_VERSION``，随缓存写入 ``prune_version``；规则变化时递增，旧缓存在下一次同步
+（或 ``scripts/upgrade_jira_cache.py``）时按新规则重新裁剪。已被裁掉的内容无法找回，放宽规则需全量同步。
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from .normalize import _is_task_owner_changelog_field
+
+
+PRUNE_RULES_VERSION = 1
+
+KEPT_FIELDS = (
+    "summary",
+    "status",
+    "priority",
+    "issuetype",
+    "assignee",
+    "created",
+    "updated",
+    "resolutiondate",
+    "description",
+    "sprint",
+)
+_KEPT_ITEM_KEYS = ("field", "from", "fromString", "to", "toString")
+# Sprint 引用的所属看板（``normalize._parse_sprint`` 读取为 ``board_id``）也要保留
+_KEPT_REF_KEYS = (
+    "id",
+    "key",
+    "name",
+    "displayName",
+    "value",
+    "state",
+    "startDate",
+    "endDate",
+    "completeDate",
+    "originBoardId",
+    "boardId",
+    "rapidViewId",
+)
+
+
+def _is_kept_changelog_field(field_name: str | None) -> bool:
+    name = (field_name or "").strip()
+    return name.lower() in {"status", "assignee"} or _is_task_owner_changelog_field(name)
+
+
+def _trim_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: value[key] for key in _KEPT_REF_KEYS if key in value}
+    if isinstance(value, list):
+        return [_trim_value(item) for item in value]
+    return value
+
+
+def prune_issue(
+    issue: dict[str, Any],
+    task_owner_field: str | None = None,
+    sprint_field: str | None = None,
+) -> dict[str, Any]:
+    fields = issue.get("fields") or {}
+    kept_fields = [*KEPT_FIELDS]
+    for extra in (task_owner_field, sprint_field):
+        if extra and str(extra).strip():
+            kept_fields.append(str(extra).strip())
+
+    histories: list[dict[str, Any]] = []
+    for history in (issue.get("changelog") or {}).get("histories") or []:
+        items = [
+            {key: item[key] for key in _KEPT_ITEM_KEYS if item.get(key) is not None}
+            for item in history.get("items") or []
+            if _is_kept_changelog_field(item.get("field"))
+        ]
+        if not items:
+            continue
+        histories.append({"id": history.get("id"), "created": history.get("created"), "items": items})
+
+    pruned: dict[str, Any] = {
+        "key": issue.get("key"),
+        "fields": {name: _trim_value(fields[name]) for name in kept_fields if name in fields},
+    }
+    if "changelog" in issue:
+        pruned["changelog"] = {"histories": histories}
+    return pruned
+
+
+def prune_issues(
+    issues: Iterable[dict[str, Any]],
+    task_owner_field: str | None = None,
+    sprint_field: str | None = None,
+) -> list[dict[str, Any]]:
+    return [prune_issue(issue, task_owner_field=task_owner_field, sprint_field=sprint_field) for issue in issues]
+
+
+def needs_upgrade(payload: dict[str, Any]) -> bool:
+    return int(payload.get("prune_version") or 0) < PRUNE_RULES_VERSION
+
+
+def upgrade_payload(
+    payload: dict[str, Any],
+    task_owner_field: str | None = None,
+    sprint_field: str | None = None,
+) -> dict[str, Any]:
+    """按当前规则裁剪旧缓存；已是当前版本时原样返回。"""
+    if not needs_upgrade(payload):
+        return payload
+    issues = prune_issues(payload.get("issues") or [], task_owner_field=task_owner_field, sprint_field=sprint_field)
+    return {**payload, "prune_version": PRUNE_RULES_VERSION, "issues": issues}
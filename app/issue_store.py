@@ -0,0 +1,328 @@
+"""规范化的 SQLite issue 库：每个 issue 只存一份，查询缓存只记录 key 列表。
+
+同一个 issue 常出现在多个 JQL 缓存中，JSON 后端会把含 changelog 的完整 issue 重复存多份；
+这里按 key 存一行（``updated`` 未变则跳过写入），changelog 拆成带索引的事件表。
+
+共享 issue 被其它查询的 ``save`` 改写时，引用它的查询 ``revision`` 加一，``version`` 随之变化；
+``record_access`` 每个查询在 ``ACCESS_RECORD_INTERVAL`` 秒内只写一次库，看板读路径不必每次开写事务。
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from .cache_store import DEFAULT_PAGE_SIZE, T, _relative_label, map_batches
+from .sync import summarize_cached_issues
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    key TEXT PRIMARY KEY,
+    updated TEXT,
+    issue_json TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS changelog_events (
+    issue_key TEXT NOT NULL,
+    history_seq INTEGER NOT NULL,
+    item_seq INTEGER NOT NULL,
+    history_id TEXT,
+    created TEXT,
+    field TEXT,
+    fieldtype TEXT,
+    from_value TEXT,
+    from_string TEXT,
+    to_value TEXT,
+    to_string TEXT,
+    PRIMARY KEY (issue_key, history_seq, item_seq)
+);
+CREATE INDEX IF NOT EXISTS idx_changelog_field_created ON changelog_events (field, created);
+CREATE TABLE IF NOT EXISTS queries (
+    cache_id TEXT PRIMARY KEY,
+    custom_jql TEXT,
+    jql_preview TEXT NOT NULL,
+    issue_count INTEGER NOT NULL,
+    max_updated TEXT,
+    updated_at REAL NOT NULL,
+    last_accessed_at REAL,
+    revision INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS query_issues (
+    cache_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    issue_key TEXT NOT NULL,
+    PRIMARY KEY (cache_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_query_issues_key ON query_issues (issue_key);
+"""
+
+_ITEM_COLUMNS = (
+    ("field", "field"),
+    ("fieldtype", "fieldtype"),
+    ("from", "from_value"),
+    ("fromString", "from_string"),
+    ("to", "to_value"),
+    ("toString", "to_string"),
+)
+
+
+# 最近访问只用于 LRU 淘汰，精度到分钟级即可
+ACCESS_RECORD_INTERVAL = 300.0
+
+
+def _event_rows(key: str, issue: dict[str, Any]) -> Iterator[tuple[Any, ...]]:
+    histories = (issue.get("changelog") or {}).get("histories") or []
+    for history_seq, history in enumerate(histories):
+        for item_seq, item in enumerate(history.get("items") or []):
+            yield (
+                key,
+                history_seq,
+                item_seq,
+                history.get("id"),
+                history.get("created"),
+                *(item.get(source) for source, _ in _ITEM_COLUMNS),
+            )
+
+
+def _ensure_column(conn: sqlite3.Connection, table: str, column: str, definition: str) -> None:
+    columns = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+class SqliteIssueStore:
+    backend = "sqlite"
+
+    def __init__(self, db_path: Path, access_interval: float = ACCESS_RECORD_INTERVAL) -> None:
+        self.db_path = Path(db_path)
+        self.access_interval = access_interval
+        self._accessed_at: dict[str, float] = {}
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            # 早期建出的库缺少后加的列
+            _ensure_column(conn, "issues", "size_bytes", "INTEGER NOT NULL DEFAULT 0")
+            _ensure_column(conn, "queries", "last_accessed_at", "REAL")
+            _ensure_column(conn, "queries", "prune_version", "INTEGER NOT NULL DEFAULT 0")
+            _ensure_column(conn, "issues", "prune_version", "INTEGER NOT NULL DEFAULT 0")
+            _ensure_column(conn, "queries", "revision", "INTEGER NOT NULL DEFAULT 0")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def location(self, cache_id: str) -> Path:
+        return self.db_path
+
+    def source_label(self, cache_id: str, root: Path) -> str:
+        return f"{_relative_label(self.db_path, root)}#{cache_id}"
+
+    def exists(self, cache_id: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute("SELECT 1 FROM queries WHERE cache_id = ?", (cache_id,)).fetchone()
+        return row is not None
+
+    def save(self, cache_id: str, payload: dict[str, Any], updated_at: float | None = None) -> None:
+        issues = [issue for issue in payload.get("issues") or [] if issue.get("key")]
+        prune_version = int(payload.get("prune_version") or 0)
+        with self._connect() as conn:
+            stored = {
+                row["key"]: (row["updated"], row["prune_version"])
+                for row in conn.execute("SELECT key, updated, prune_version FROM issues")
+            }
+            rewritten: list[str] = []
+            for issue in issues:
+                key = issue["key"]
+                updated = (issue.get("fields") or {}).get("updated")
+                # 同一 issue 版本已在库中（可能来自其它查询）且裁剪规则不旧：跳过写入
+                stored_updated, stored_prune_version = stored.get(key, (None, 0))
+                if updated and stored_updated == updated and stored_prune_version >= prune_version:
+                    continue
+                if key in stored:
+                    rewritten.append(key)
+                body = json.dumps(
+                    {name: value for name, value in issue.items() if name != "changelog"}, ensure_ascii=False
+                )
+                events = list(_event_rows(key, issue))
+                # 近似占用：issue 正文 + 事件文本（供保留策略统计）
+                size_bytes = len(body.encode("utf-8")) + sum(
+                    len(str(value).encode("utf-8")) for row in events for value in row[3:] if value is not None
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO issues (key, updated, issue_json, size_bytes, prune_version)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, updated, body, size_bytes, prune_version),
+                )
+                conn.execute("DELETE FROM changelog_events WHERE issue_key = ?", (key,))
+                conn.executemany("INSERT INTO changelog_events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", events)
+            self._bump_sharing_queries(conn, cache_id, rewritten)
+
+            conn.execute("DELETE FROM query_issues WHERE cache_id = ?", (cache_id,))
+            conn.executemany(
+                "INSERT INTO query_issues (cache_id, position, issue_key) VALUES (?, ?, ?)",
+                ((cache_id, position, issue["key"]) for position, issue in enumerate(issues)),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO queries"
+                " (cache_id, custom_jql, jql_preview, issue_count, max_updated, updated_at, prune_version, revision)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?,"
+                " (SELECT COALESCE(MAX(revision), -1) + 1 FROM queries WHERE cache_id = ?))",
+                (
+                    cache_id,
+                    payload.get("custom_jql"),
+                    str(payload.get("jql_preview", "")),
+                    len(issues),
+                    summarize_cached_issues(payload)["max_updated"],
+                    updated_at if updated_at is not None else time.time(),
+                    prune_version,
+                    cache_id,
+                ),
+            )
+            self._delete_orphans(conn)
+
+    def _bump_sharing_queries(self, conn: sqlite3.Connection, cache_id: str, keys: list[str]) -> None:
+        """其它查询引用的 issue 行被改写：这些查询的内容也变了，递增其 ``revision``。"""
+        if not keys:
+            return
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS rewritten_keys (key TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM rewritten_keys")
+        conn.executemany("INSERT OR IGNORE INTO rewritten_keys (key) VALUES (?)", ((key,) for key in keys))
+        conn.execute(
+            "UPDATE queries SET revision = revision + 1 WHERE cache_id != ? AND cache_id IN"
+            " (SELECT qi.cache_id FROM query_issues qi JOIN rewritten_keys r ON r.key = qi.issue_key)",
+            (cache_id,),
+        )
+
+    def _delete_orphans(self, conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM issues WHERE key NOT IN (SELECT issue_key FROM query_issues)")
+        conn.execute("DELETE FROM changelog_events WHERE issue_key NOT IN (SELECT key FROM issues)")
+
+    def load_header(self, cache_id: str) -> dict[str, Any]:
+        with self._connect() as conn:
+            query = conn.execute("SELECT * FROM queries WHERE cache_id = ?", (cache_id,)).fetchone()
+        if query is None:
+            raise FileNotFoundError("Query cache not found")
+        return {
+            "custom_jql": query["custom_jql"],
+            "jql_preview": query["jql_preview"],
+            "issue_count": query["issue_count"],
+            "max_updated": query["max_updated"],
+            "prune_version": query["prune_version"],
+        }
+
+    def version(self, cache_id: str) -> str:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT updated_at, issue_count, revision FROM queries WHERE cache_id = ?", (cache_id,)
+            ).fetchone()
+        if row is None:
+            raise FileNotFoundError("Query cache not found")
+        return f"{row['updated_at']!r}:{row['issue_count']}:{row['revision']}"
+
+    def iter_issues(self, cache_id: str) -> Iterator[dict[str, Any]]:
+        """按查询中的顺序逐个重建原始 issue：issue 行与事件行两个游标按 position 归并。"""
+        if not self.exists(cache_id):
+            raise FileNotFoundError("Query cache not found")
+        with self._connect() as conn:
+            issue_rows = conn.execute(
+                "SELECT q.position, i.issue_json FROM query_issues q JOIN issues i ON i.key = q.issue_key"
+                " WHERE q.cache_id = ? ORDER BY q.position",
+                (cache_id,),
+            )
+            event_rows = conn.execute(
+                "SELECT q.position, e.* FROM query_issues q JOIN changelog_events e ON e.issue_key = q.issue_key"
+                " WHERE q.cache_id = ? ORDER BY q.position, e.history_seq, e.item_seq",
+                (cache_id,),
+            )
+            pending = event_rows.fetchone()
+            for issue_row in issue_rows:
+                issue = json.loads(issue_row["issue_json"])
+                histories: list[dict[str, Any]] = []
+                current_seq: int | None = None
+                while pending is not None and pending["position"] < issue_row["position"]:
+                    pending = event_rows.fetchone()
+                while pending is not None and pending["position"] == issue_row["position"]:
+                    if pending["history_seq"] != current_seq:
+                        current_seq = pending["history_seq"]
+                        histories.append({"id": pending["history_id"], "created": pending["created"], "items": []})
+                    histories[-1]["items"].append(
+                        {source: pending[column] for source, column in _ITEM_COLUMNS if pending[column] is not None}
+                    )
+                    pending = event_rows.fetchone()
+                issue["changelog"] = {"histories": histories}
+                yield issue
+
+    def map_pages(self, cache_id: str, transform: Callable[[list[dict[str, Any]]], T]) -> Iterator[T]:
+        yield from map_batches(self.iter_issues(cache_id), transform, DEFAULT_PAGE_SIZE)
+
+    def load(self, cache_id: str) -> dict[str, Any]:
+        header = self.load_header(cache_id)
+        return {**header, "issues": list(self.iter_issues(cache_id))}
+
+    def latest_id(self) -> str | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT cache_id FROM queries ORDER BY updated_at DESC LIMIT 1").fetchone()
+        return row["cache_id"] if row else None
+
+    def entries(self) -> list[dict[str, Any]]:
+        """``size_bytes`` 为该查询引用的 issue 占用之和（共享 issue 会在各查询中重复计入）。"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT q.cache_id, q.custom_jql, q.jql_preview, q.issue_count, q.updated_at, q.last_accessed_at,"
+                " (SELECT COALESCE(SUM(i.size_bytes), 0) FROM query_issues qi JOIN issues i ON i.key = qi.issue_key"
+                "  WHERE qi.cache_id = q.cache_id) AS size_bytes"
+                " FROM queries q"
+            ).fetchall()
+        return [
+            {
+                "id": row["cache_id"],
+                "custom_jql": row["custom_jql"],
+                "jql_preview": row["jql_preview"],
+                "issue_count": int(row["issue_count"]),
+                "updated_at": float(row["updated_at"]),
+                "size_bytes": int(row["size_bytes"]),
+                "last_accessed_at": float(row["last_accessed_at"] or row["updated_at"]),
+            }
+            for row in rows
+        ]
+
+    def record_access(self, cache_id: str) -> None:
+        """距本进程上次记录不足 ``access_interval`` 秒时不写库。"""
+        now = time.time()
+        if now - self._accessed_at.get(cache_id, float("-inf")) < self.access_interval:
+            return
+        self._accessed_at[cache_id] = now
+        with self._connect() as conn:
+            conn.execute("UPDATE queries SET last_accessed_at = ? WHERE cache_id = ?", (now, cache_id))
+
+    def delete(self, cache_id: str) -> None:
+        self._accessed_at.pop(cache_id, None)
+        with self._connect() as conn:
+            conn.execute("DELETE FROM query_issues WHERE cache_id = ?", (cache_id,))
+            conn.execute("DELETE FROM queries WHERE cache_id = ?", (cache_id,))
+            self._delete_orphans(conn)
+
+    def import_from(self, json_store: Any) -> int:
+        """把 JSON 后端里尚未入库的缓存导入（保留文件 mtime 作为更新时间）；返回导入个数。"""
+        imported = 0
+        for entry in json_store.entries():
+            if self.exists(entry["id"]):
+                continue
+            try:
+                payload = json_store.load(entry["id"])
+            except FileNotFoundError:
+                continue
+            self.save(entry["id"], payload, updated_at=entry["updated_at"])
+            imported += 1
+        return imported
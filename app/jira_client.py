@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import datetime
 from typing import Any
 
 import requests
@@ -20,6 +21,8 @@ class JiraConfig:
     jql_filters: list[str] | None = None
     # 仅填写 customfield_xxx；同步 issue 时附加到 fields（不发起 /field 等额外请求）
     task_owner_field: str | None = None
+    # Sprint 自定义字段（如 customfield_10020）；同上随 search 拉取
+    sprint_field: str | None = None
 
 
 class JiraClient:
@@ -63,19 +66,36 @@ class JiraClient:
             raise JiraClientError("At least one JQL clause is required")
         return " AND ".join(clauses)
 
-    def get_issues_by_jql(self, jql: str | None = None) -> list[dict[str, Any]]:
+    def probe_freshness(self, jql: str | None = None) -> dict[str, Any]:
+        """轻量探测：只取最近更新的 1 条 issue 的 updated 及命中总数，用于判断本地缓存是否仍是最新。"""
+        params: dict[str, Any] = {
+            "startAt": 0,
+            "maxResults": 1,
+            "jql": f"{self.build_search_jql(jql=jql)} ORDER BY updated DESC",
+            "fields": "updated",
+        }
+        data = self._request("GET", "/rest/api/2/search", params=params)
+        chunk = data.get("issues", [])
+        max_updated = (chunk[0].get("fields") or {}).get("updated") if chunk else None
+        return {"total": int(data.get("total", len(chunk))), "max_updated": max_updated}
+
+    def get_issues_by_jql(self, jql: str | None = None, updated_since: datetime | None = None) -> list[dict[str, Any]]:
         issues: list[dict[str, Any]] = []
         start_at = 0
         max_results = 50
         search_jql = self.build_search_jql(jql=jql)
+        if updated_since is not None:
+            # 增量同步：JQL 日期只支持到分钟
+            search_jql = f'{search_jql} AND (updated >= "{updated_since.strftime("%Y/%m/%d %H:%M")}")'
         while True:
             base_fields = (
                 "summary,status,priority,assignee,created,updated,resolutiondate,description,issuetype,sprint"
             )
             fields_param = base_fields
-            extra = (self.config.task_owner_field or "").strip()
-            if extra:
-                fields_param = f"{base_fields},{extra}"
+            for extra in (self.config.task_owner_field, self.config.sprint_field):
+                extra = (extra or "").strip()
+                if extra:
+                    fields_param = f"{fields_param},{extra}"
 
             params: dict[str, Any] = {
                 "startAt": start_at,
@@ -95,3 +115,21 @@ class JiraClient:
             start_at += max_results
 
         return issues
+
+    def get_board_sprints(self, board_id: int) -> list[dict[str, Any]]:
+        """Agile API：看板下全部 sprint（含 future / active / closed）的起止时间。"""
+        sprints: list[dict[str, Any]] = []
+        start_at = 0
+        max_results = 50
+        while True:
+            data = self._request(
+                "GET",
+                f"/rest/agile/1.0/board/{int(board_id)}/sprint",
+                params={"startAt": start_at, "maxResults": max_results},
+            )
+            chunk = data.get("values", [])
+            sprints.extend(chunk)
+            if data.get("isLast", True) or not chunk:
+                break
+            start_at += len(chunk)
+        return sprints
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import csv
 import hashlib
-import json
+from datetime import datetime, timedelta
 from io import BytesIO, StringIO
 from pathlib import Path
 from typing import Any
@@ -11,29 +11,82 @@ from flask import Flask, jsonify, render_template, request, send_file
 from matplotlib import pyplot as plt
 from openpyxl import Workbook
 
-from .config import load_config
+from .config import CachedConfig, config_fingerprint
+from .event_index import EventIndex, EventIndexCache, cards_as_of, parse_as_of
+from .ingest_prune import PRUNE_RULES_VERSION, needs_upgrade, prune_issues, upgrade_payload
 from .jira_client import JiraClient, JiraClientError, JiraConfig
-from .analytics import build_manager_summary
-from .metrics import build_gantt_rows, compute_member_metrics
-from .normalize import filter_cards, normalize_issue, split_columns
-from .period import resolve_period_window
+from .aging import AgingBaseline, build_aging_baseline, compute_aging
+from .analytics import (
+    build_change_section,
+    build_manager_summary,
+    build_summary_series,
+    summary_templates_version,
+)
+from .cache_diff import REVISIONS_DIR_NAME, DiffCache, RevisionStore, build_projection, count_changes, parse_revision_ref
+from .cache_retention import enforce_retention
+from .cache_store import is_cache_id, open_cache_store
+from .cfd import build_cfd, build_flow_sweep
+from .forecast import FORECAST_HISTORY_DAYS, FORECAST_TRIALS, build_forecast
+from .history_store import HISTORY_FILE_NAME, TeamHistoryStore
+from .metrics import build_gantt_rows, collect_member_stats, compute_member_metrics, compute_team_metrics, rollup_flow_metrics
+from .normalize import build_status_groups, filter_cards, filter_spec, iter_normalized_cards, split_columns
+from .period import PeriodEngine, resolve_period_window, trailing_windows
+from .result_cache import SummaryCache
+from .sprints import (
+    DEFAULT_SPRINT_TTL_SECONDS,
+    SPRINT_METADATA_FILE_NAME,
+    SprintStore,
+    UnknownSprintError,
+    collect_sprints,
+)
+from .stages import compute_stage_metrics
+from .teams import TeamDirectory, UnknownTeamError, card_owner
+from .throughput import ThroughputCounters, ThroughputStore, build_throughput_report
+from .working_calendar import WorkingCalendar, parse_time_basis
+from .warmup import CacheWarmer, NormalizedCardCache, select_warmup_targets
+from .sync import (
+    SYNC_DELTA,
+    SYNC_FULL,
+    SYNC_SKIPPED_FRESH,
+    delta_since,
+    is_fresh,
+    merge_issues,
+    summarize_cache_header,
+    summarize_cached_issues,
+)
 
 
-def create_app(config_path: str | None = None, jira_client: JiraClient | None = None) -> Flask:
+def create_app(
+    config_path: str | None = None,
+    jira_client: JiraClient | None = None,
+    storage_dir: str | Path | None = None,
+) -> Flask:
     app = Flask(__name__, template_folder="../templates", static_folder="../static")
-    cfg = load_config(config_path) if jira_client is None else None
+    # 配置按文件 mtime + 大小缓存：每次请求只 stat 一次，文件变化后自动重新加载
+    config_cache = CachedConfig(config_path) if jira_client is None else None
+    cfg = config_cache.get() if config_cache is not None else None
+    static_fingerprint = config_fingerprint(cfg)
+    client_cache: dict[str, Any] = {}
 
     def get_runtime_config() -> dict[str, Any] | None:
-        if jira_client is not None:
+        if config_cache is None:
             return cfg
-        return load_config(config_path)
+        return config_cache.get()
+
+    def get_config_fingerprint() -> str:
+        if config_cache is None:
+            return static_fingerprint
+        return config_cache.fingerprint
 
     def get_runtime_client(runtime_cfg: dict[str, Any] | None = None) -> JiraClient:
         if jira_client is not None:
             return jira_client
 
         resolved_cfg = runtime_cfg or get_runtime_config() or {}
-        return JiraClient(
+        # 同一份配置对象复用客户端（及其连接池），配置重新加载后重建
+        if client_cache.get("cfg") is resolved_cfg:
+            return client_cache["client"]
+        client = JiraClient(
             JiraConfig(
                 base_url=resolved_cfg["base_url"],
                 username=resolved_cfg["username"],
@@ -42,11 +95,36 @@ def create_app(config_path: str | None = None, jira_client: JiraClient | None =
                 timeout_seconds=resolved_cfg["request_timeout_seconds"],
                 jql_filters=resolved_cfg.get("jql_filters", []),
                 task_owner_field=(resolved_cfg.get("task_owner_field") or None),
+                sprint_field=((resolved_cfg.get("agile_settings") or {}).get("sprint_field") or None),
             )
         )
+        client_cache.update(cfg=resolved_cfg, client=client)
+        return client
 
-    cache_dir = Path(__file__).resolve().parent.parent / "storage" / "jira_query_cache"
-    cache_dir.mkdir(parents=True, exist_ok=True)
+    root_dir = Path(__file__).resolve().parent.parent
+    storage_root = Path(storage_dir) if storage_dir else root_dir / "storage"
+    store = open_cache_store((cfg or {}).get("cache_settings"), storage_root)
+    history = TeamHistoryStore(storage_root / HISTORY_FILE_NAME)
+    event_indexes = EventIndexCache()
+    revisions = RevisionStore(storage_root / REVISIONS_DIR_NAME)
+    diff_cache = DiffCache()
+    # 存储后端、结果缓存容量与启动预热只在启动时读取（见 CachedConfig）
+    results_settings = ((cfg or {}).get("cache_settings") or {}).get("results") or {}
+    result_cache_limits = {
+        "max_entries": int(results_settings.get("max_entries") or 128),
+        "max_bytes": int(results_settings.get("max_bytes") or 64 * 1024 * 1024),
+    }
+    summary_cache = SummaryCache(**result_cache_limits)
+    metrics_cache = SummaryCache(**result_cache_limits)
+    team_card_index_cache = SummaryCache(max_entries=8)
+    flow_sweep_cache = SummaryCache(max_entries=16)
+    aging_baseline_cache = SummaryCache(max_entries=8)
+    throughput_store = ThroughputStore()
+    team_directory_cache: dict[str, Any] = {}
+    working_calendar_cache: dict[str, Any] = {}
+    warmup_settings = ((cfg or {}).get("cache_settings") or {}).get("warmup") or {}
+    card_cache = NormalizedCardCache(max_entries=max(8, int(warmup_settings.get("latest") or 0) + 2))
+    sprint_store = SprintStore(storage_root / SPRINT_METADATA_FILE_NAME)
 
     def build_jql_preview(custom_jql: str | None, runtime_cfg: dict[str, Any] | None = None) -> str:
         runtime_client = get_runtime_client(runtime_cfg)
@@ -56,103 +134,445 @@ def create_app(config_path: str | None = None, jira_client: JiraClient | None =
             return f"({custom_jql})"
         return ""
 
-    def get_cache_file(custom_jql: str | None, runtime_cfg: dict[str, Any] | None = None) -> Path:
+    def get_cache_id(custom_jql: str | None, runtime_cfg: dict[str, Any] | None = None) -> str:
         key_source = build_jql_preview(custom_jql, runtime_cfg=runtime_cfg)
-        key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()
-        return cache_dir / f"{key}.json"
+        return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
 
-    def get_latest_cache_file() -> Path | None:
-        files = [path for path in cache_dir.glob("*.json") if path.is_file()]
-        if not files:
+    def get_cache_id_if_exists(cache_id: str | None) -> str | None:
+        if not is_cache_id(cache_id):
             return None
-        return max(files, key=lambda path: path.stat().st_mtime)
-
-    def get_cache_file_by_id(cache_id: str | None) -> Path | None:
-        normalized = (cache_id or "").strip().lower()
-        if len(normalized) != 64 or any(ch not in "0123456789abcdef" for ch in normalized):
+        normalized = str(cache_id).strip().lower()
+        if not store.exists(normalized):
             return None
-        path = cache_dir / f"{normalized}.json"
-        if not path.exists() or not path.is_file():
-            return None
-        return path
+        return normalized
 
-    def load_cache_payload(cache_file: Path) -> dict[str, Any]:
-        try:
-            return json.loads(cache_file.read_text(encoding="utf-8"))
-        except json.JSONDecodeError as exc:
-            raise FileNotFoundError("Query cache not found") from exc
-
-    def query_and_cache_issues(custom_jql: str | None, runtime_cfg: dict[str, Any] | None = None) -> dict[str, Any]:
+    def query_and_cache_issues(
+        custom_jql: str | None,
+        runtime_cfg: dict[str, Any] | None = None,
+        force: bool = False,
+    ) -> dict[str, Any]:
         runtime_client = get_runtime_client(runtime_cfg)
-        issues = runtime_client.get_issues_by_jql(jql=custom_jql)
+        cache_id = get_cache_id(custom_jql, runtime_cfg=runtime_cfg)
+        task_owner_field = (runtime_cfg or {}).get("task_owner_field")
+        sprint_field = ((runtime_cfg or {}).get("agile_settings") or {}).get("sprint_field")
+        refresh_sprint_metadata(runtime_client, runtime_cfg)
+
+        # 先只读缓存头部做新鲜度比较；确需增量合并（或升级旧缓存）时才读出全部 issue
+        header: dict[str, Any] | None = None
+        if not force and store.exists(cache_id) and hasattr(runtime_client, "probe_freshness"):
+            try:
+                header = store.load_header(cache_id)
+            except FileNotFoundError:
+                header = None
+        cached_state = summarize_cache_header(header) if header is not None else None
+
+        previous: dict[str, Any] | None = None
+        upgraded = False
+        if header is not None and (cached_state is None or needs_upgrade(header)):
+            # 旧版裁剪规则（或未裁剪）的缓存：先按当前规则升级，跳过同步时也回写
+            try:
+                loaded = store.load(cache_id)
+            except FileNotFoundError:
+                header = None
+            else:
+                previous = upgrade_payload(loaded, task_owner_field=task_owner_field, sprint_field=sprint_field)
+                upgraded = previous is not loaded
+                cached_state = summarize_cached_issues(previous)
+
+        issues: list[dict[str, Any]] | None = None
+        sync_status = SYNC_FULL
+        # 增量同步时记录变化的 issue，预聚合计数只更新这些 issue
+        changed_keys: set[str] | None = None
+        previous_version = store.version(cache_id) if header is not None else None
+        if header is not None and cached_state is not None:
+            probe = runtime_client.probe_freshness(jql=custom_jql)
+            if is_fresh(probe, cached_state):
+                # 缓存内容未变：不重新归一化，也不写历史快照与版本投影
+                if upgraded:
+                    store.save(cache_id, previous)
+                summary = {key: value for key, value in (previous or header).items() if key != "issues"}
+                return {**summary, "sync_status": SYNC_SKIPPED_FRESH}
+
+            since = delta_since(cached_state["max_updated"])
+            if since is not None:
+                changed = prune_issues(
+                    runtime_client.get_issues_by_jql(jql=custom_jql, updated_since=since),
+                    task_owner_field=task_owner_field,
+                    sprint_field=sprint_field,
+                )
+                if previous is None:
+                    previous = store.load(cache_id)
+                merged = merge_issues(previous.get("issues") or [], changed)
+                # 数量对不上说明有 issue 移出查询范围（删除/改项目等），只能回退全量
+                if len(merged) == int(probe.get("total", -1)):
+                    issues = merged
+                    sync_status = SYNC_DELTA
+                    if not upgraded:
+                        changed_keys = {str(issue.get("key")) for issue in changed}
+
+        if issues is None:
+            issues = prune_issues(
+                runtime_client.get_issues_by_jql(jql=custom_jql),
+                task_owner_field=task_owner_field,
+                sprint_field=sprint_field,
+            )
+
         payload = {
             "custom_jql": custom_jql,
             "jql_preview": build_jql_preview(custom_jql, runtime_cfg=runtime_cfg),
             "issue_count": len(issues),
+            "max_updated": summarize_cached_issues({"issues": issues})["max_updated"],
+            "prune_version": PRUNE_RULES_VERSION,
             "issues": issues,
         }
-        cache_file = get_cache_file(custom_jql, runtime_cfg=runtime_cfg)
-        cache_file.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
-        return payload
+        store.save(cache_id, payload)
+        record_sync_snapshots(
+            cache_id, payload, runtime_cfg, changed_keys=changed_keys, previous_version=previous_version
+        )
+        evicted = apply_cache_retention(runtime_cfg, synced_cache_id=cache_id)
+        return {**payload, "sync_status": sync_status, "evicted_cache_ids": [entry["id"] for entry in evicted]}
+
+    def normalize_issues(issues: Any, runtime_cfg: dict[str, Any] | None) -> list[dict[str, Any]]:
+        resolved_cfg = runtime_cfg or {}
+        return list(
+            iter_normalized_cards(
+                issues,
+                base_url=resolved_cfg.get("base_url") or "https://jira.local",
+                status_mapping=resolved_cfg.get("status_mapping"),
+                role_settings=resolved_cfg.get("role_settings"),
+                task_owner_field=resolved_cfg.get("task_owner_field"),
+                sprint_field=(resolved_cfg.get("agile_settings") or {}).get("sprint_field"),
+            )
+        )
+
+    def get_team_directory() -> TeamDirectory:
+        """成员 → 团队查找表只依赖配置，按配置指纹构建一次。"""
+        fingerprint = get_config_fingerprint()
+        if team_directory_cache.get("fingerprint") != fingerprint:
+            directory = TeamDirectory((get_runtime_config() or {}).get("teams"))
+            team_directory_cache.update(fingerprint=fingerprint, directory=directory)
+        return team_directory_cache["directory"]
+
+    def select_team_cards(cards: list[dict[str, Any]], team: str, cache_id: str | None) -> list[dict[str, Any]]:
+        """``team=`` 过滤：整份缓存的团队 → 卡片索引按（缓存版本, 配置指纹）复用；回溯视图现场建索引。"""
+        directory = get_team_directory()
+        if team not in directory:
+            raise UnknownTeamError(f"Unknown team: {team}")
+        if cache_id is None:
+            return directory.index_cards(cards)[team]
+        key = (cache_id, store.version(cache_id), get_config_fingerprint())
+        index = team_card_index_cache.get(key)
+        if index is None:
+            index = directory.index_cards(cards)
+            # 索引只持有卡片引用（卡片本身由归一化缓存持有），按列表指针计大小
+            team_card_index_cache.put(key, index, size=sum(56 + 8 * len(members) for members in index.values()))
+        return index[team]
+
+    def get_working_calendar(time_basis: str) -> WorkingCalendar | None:
+        """``time_basis=business`` 时返回工作日历（前缀数组随查询扩展，按配置指纹复用）；``wall`` 为 None。"""
+        if parse_time_basis(time_basis) == "wall":
+            return None
+        fingerprint = get_config_fingerprint()
+        if working_calendar_cache.get("fingerprint") != fingerprint:
+            runtime_cfg = get_runtime_config() or {}
+            calendar = WorkingCalendar.from_settings(
+                runtime_cfg.get("working_calendar"),
+                timezone=(runtime_cfg.get("period_settings") or {}).get("timezone"),
+            )
+            working_calendar_cache.update(fingerprint=fingerprint, calendar=calendar)
+        return working_calendar_cache["calendar"]
+
+    def get_member_metrics(
+        cards: list[dict[str, Any]],
+        cache_id: str,
+        filters: tuple[str, ...],
+        as_of: datetime | None,
+        time_basis: str,
+    ) -> dict[str, Any]:
+        """成员 / 看板 / 团队三级指标（``metrics`` / ``flow_metrics`` / ``team_metrics``），按（缓存版本, 配置指纹,
+        过滤条件, 回溯时刻, 时长口径）记忆，看板与 Excel 导出共用。团队行与看板分位数由成员草图合并，不重扫卡片。"""
+        key = result_key("metrics", cache_id, filters, as_of.isoformat() if as_of else "", time_basis)
+        bundle = metrics_cache.get(key)
+        if bundle is None:
+            runtime_cfg = get_runtime_config() or {}
+            quality_names = set((runtime_cfg.get("role_settings") or {}).get("quality_roles") or [])
+            stats = collect_member_stats(cards, calendar=get_working_calendar(time_basis))
+            bundle = {
+                "metrics": compute_member_metrics(cards, exclude_roles=quality_names, stats=stats),
+                "flow_metrics": rollup_flow_metrics(stats),
+                "team_metrics": compute_team_metrics(stats, get_team_directory(), exclude_roles=quality_names),
+            }
+            metrics_cache.put(key, bundle)
+        return bundle
+
+    def get_aging_baseline(cache_id: str, time_basis: str) -> AgingBaseline:
+        """老化阈值取自整份缓存（不随看板过滤变化），按（缓存版本, 配置指纹, 时长口径）复用。"""
+        key = result_key("aging_baseline", cache_id, time_basis)
+        baseline = aging_baseline_cache.get(key)
+        if baseline is None:
+            baseline = build_aging_baseline(
+                load_normalized_cards(cache_id, get_runtime_config()), calendar=get_working_calendar(time_basis)
+            )
+            aging_baseline_cache.put(key, baseline)
+        return baseline
+
+    def get_period_engine() -> PeriodEngine:
+        return PeriodEngine.from_settings((get_runtime_config() or {}).get("period_settings"))
+
+    def refresh_sprint_metadata(runtime_client: Any, runtime_cfg: dict[str, Any] | None) -> None:
+        """同步时按 TTL 刷新看板的 sprint 元数据；看板读取只查本地，不请求 Jira。"""
+        agile_settings = (runtime_cfg or {}).get("agile_settings") or {}
+        board_id = agile_settings.get("board_id")
+        if not board_id or not hasattr(runtime_client, "get_board_sprints"):
+            return
+        try:
+            sprint_store.refresh_board(
+                board_id,
+                runtime_client.get_board_sprints,
+                ttl_seconds=int(agile_settings.get("sprint_ttl_seconds") or DEFAULT_SPRINT_TTL_SECONDS),
+            )
+        except JiraClientError:
+            pass
+
+    def configured_board_id() -> Any:
+        """当前（热加载后的）配置中的看板 id，与同步时 ``refresh_sprint_metadata`` 读同一份配置。"""
+        return ((get_runtime_config() or {}).get("agile_settings") or {}).get("board_id")
+
+    def resolve_sprint(sprint_id: int | None) -> dict[str, Any] | None:
+        if sprint_id is not None:
+            return sprint_store.get(sprint_id)
+        return sprint_store.current(board_id=configured_board_id())
+
+    def result_key(kind: str, cache_id: str, *parts: Any) -> tuple[Any, ...]:
+        """结果缓存键：（结果类型, 缓存 id, 缓存版本, 配置指纹, ...）；缓存内容或配置变化后旧结果自然失效。"""
+        return (kind, cache_id, store.version(cache_id), get_config_fingerprint(), *parts)
+
+    def window_key(window: dict[str, Any], bucketed: dict[str, Any], bucket: int) -> tuple[str, str, str, str]:
+        """结果缓存中的窗口键：``bucketed`` 为按取整时刻解析出的同一窗口，起止与真实窗口不同的一端由当前时刻推出
+        （最近 7 天、未结束的 sprint），换成时间桶序号，同一桶内键不变；自然周 / 月等固定起止照常入键。"""
+        start, end = (
+            window[name].isoformat() if window[name] == bucketed[name] else f"bucket:{bucket}"
+            for name in ("start", "end")
+        )
+        return (window["mode"], window["label"], start, end)
+
+    def resolve_request_window(
+        default_mode: str, engine: PeriodEngine
+    ) -> tuple[dict[str, Any], tuple[str, str, str, str]]:
+        """请求参数 ``window`` / ``start`` / ``end`` / ``sprint=<id>`` → (统计窗口, 结果缓存用的窗口键)。
+
+        窗口按真实当前时刻计算；只有缓存键按（当前配置的）``window_bucket_seconds`` 取整。
+        ``sprint`` 不是整数抛 ValueError；本地 sprint 元数据中没有该 id 抛 ``UnknownSprintError``。
+        """
+        raw_sprint = (request.args.get("sprint") or "").strip()
+        try:
+            sprint_id = int(raw_sprint) if raw_sprint else None
+        except ValueError:
+            raise ValueError("sprint must be an integer sprint id") from None
+        window_mode = request.args.get("window", default_mode)
+        sprint = None
+        if sprint_id is not None or window_mode == "sprint":
+            # sprint=<id> 或当前 sprint：按 id 直接查本地 sprint 元数据，不扫描卡片
+            sprint = resolve_sprint(sprint_id)
+            if sprint_id is not None and sprint is None:
+                raise UnknownSprintError(f"Unknown sprint: {sprint_id}")
+            window_mode = "sprint"
+        results_settings = ((get_runtime_config() or {}).get("cache_settings") or {}).get("results") or {}
+        window_bucket_seconds = int(results_settings.get("window_bucket_seconds") or 300)
+        now = engine.now()
+        bounds = (window_mode, request.args.get("start"), request.args.get("end"))
+        window = resolve_period_window(*bounds, sprint=sprint, engine=engine, now=now)
+        bucketed = resolve_period_window(
+            *bounds, sprint=sprint, engine=engine, now=now - timedelta(seconds=now.timestamp() % window_bucket_seconds)
+        )
+        bucket = int(now.timestamp() // window_bucket_seconds)
+        return window, window_key(window, bucketed, bucket)
+
+    def get_throughput_counters(cache_id: str) -> ThroughputCounters:
+        version = store.version(cache_id)
+        fingerprint = get_config_fingerprint()
+        counters = throughput_store.get(cache_id, version, fingerprint)
+        if counters is None:
+            counters = ThroughputCounters.build(load_normalized_cards(cache_id, get_runtime_config()), get_period_engine())
+            throughput_store.put(cache_id, version, fingerprint, counters)
+        return counters
+
+    def load_normalized_cards(cache_id: str, runtime_cfg: dict[str, Any] | None) -> list[dict[str, Any]]:
+        """整份缓存归一化后的卡片（过滤前），按缓存版本与归一化配置复用。"""
+        version = store.version(cache_id)
+        key = (cache_id, version, get_config_fingerprint())
+        cards = card_cache.get(key)
+        if cards is None:
+            # 该版本还没有事件索引时在同一遍读取中顺带建好，as_of / CFD 不必再读一遍缓存
+            index = EventIndex() if event_indexes.get(cache_id, version) is None else None
+
+            def transform(page: list[dict[str, Any]]) -> list[dict[str, Any]]:
+                if index is not None:
+                    for issue in page:
+                        index.add_issue(issue)
+                return normalize_issues(page, runtime_cfg)
+
+            # 分页缓存的各页在线程池中预读 + 解压，逐页（按页序、在当前线程）归一化后拼接
+            cards = [card for page in store.map_pages(cache_id, transform) for card in page]
+            card_cache.put(key, cards)
+            if index is not None:
+                event_indexes.put(cache_id, version, index.finalize())
+            sprint_store.observe(collect_sprints(cards))
+        return cards
+
+    def get_event_index(cache_id: str) -> EventIndex:
+        version = store.version(cache_id)
+        index = event_indexes.get(cache_id, version)
+        if index is None:
+            index = EventIndex()
+            for issue in store.iter_issues(cache_id):
+                index.add_issue(issue)
+            index.finalize()
+            event_indexes.put(cache_id, version, index)
+        return index
+
+    def record_sync_snapshots(
+        cache_id: str,
+        payload: dict[str, Any],
+        runtime_cfg: dict[str, Any] | None,
+        changed_keys: set[str] | None = None,
+        previous_version: str | None = None,
+    ) -> None:
+        """同步后：团队历史快照 + 差异比较用的版本投影（缓存内容未变时不新增版本）。
+
+        增量同步（``changed_keys``）时把吞吐量计数从 ``previous_version`` 推进到新版本，只更新变化的 issue。
+        """
+        issues = payload.get("issues") or []
+        cards = normalize_issues(issues, runtime_cfg)
+        card_cache.put((cache_id, store.version(cache_id), get_config_fingerprint()), cards)
+        # 卡片已预热进 card_cache，之后的归一化读取不会再走一遍缓存，事件索引也趁手里的 issue 建好
+        index = EventIndex()
+        for issue in issues:
+            index.add_issue(issue)
+        event_indexes.put(cache_id, store.version(cache_id), index.finalize())
+        if changed_keys is not None and previous_version is not None:
+            throughput_store.advance(
+                cache_id,
+                previous_version,
+                store.version(cache_id),
+                get_config_fingerprint(),
+                [card for card in cards if card["key"] in changed_keys],
+            )
+        sprint_store.observe(collect_sprints(cards))
+        teams = (runtime_cfg or {}).get("teams")
+        history.record_snapshot(
+            cache_id,
+            str(payload.get("jql_preview") or ""),
+            cards,
+            teams=teams,
+            period=PeriodEngine.from_settings((runtime_cfg or {}).get("period_settings")),
+        )
+        revisions.record(cache_id, store.version(cache_id), build_projection(cards))
+
+    def load_projection(cache_id: str, revision: int | None = None, before_latest: bool = False) -> tuple[dict[str, Any], str]:
+        """返回 (版本信息, 投影)；当前缓存尚无版本记录（旧缓存）时现场归一化并补记。"""
+        if revision is not None or before_latest:
+            row = revisions.get(cache_id, revision=revision, before_latest=before_latest)
+            if row is None:
+                raise FileNotFoundError("Cache revision not found")
+            return row, f"{cache_id}@{row['version']}"
+        if not store.exists(cache_id):
+            raise FileNotFoundError("Query cache not found")
+        version = store.version(cache_id)
+        row = revisions.get(cache_id)
+        if row is None or row.get("version") != version:
+            projection = build_projection(load_normalized_cards(cache_id, get_runtime_config()))
+            row = revisions.record(cache_id, version, projection)
+        return row, f"{cache_id}@{version}"
+
+    def diff_caches(
+        from_id: str,
+        to_id: str,
+        from_revision: int | None = None,
+        to_revision: int | None = None,
+    ) -> tuple[dict[str, Any], dict[str, Any], list[dict[str, Any]]]:
+        # 同一缓存且未指定版本：与上一次同步比较
+        same_latest = from_id == to_id and from_revision is None and to_revision is None
+        to_row, to_token = load_projection(to_id, to_revision)
+        from_row, from_token = load_projection(from_id, from_revision, before_latest=same_latest)
+        changes = diff_cache.get_or_compute(
+            (from_token, to_token), from_row.get("projection") or {}, to_row.get("projection") or {}
+        )
+        return from_row, to_row, changes
+
+    def apply_cache_retention(
+        runtime_cfg: dict[str, Any] | None = None,
+        synced_cache_id: str | None = None,
+    ) -> list[dict[str, Any]]:
+        retention = ((runtime_cfg or {}).get("cache_settings") or {}).get("retention")
+        try:
+            # 仅由 jql_filters 组成的默认查询缓存固定保留
+            pinned = {build_jql_preview(None, runtime_cfg=runtime_cfg)}
+        except JiraClientError:
+            pinned = set()
+        # 本次同步刚写入的缓存也不淘汰：其访问时间可能沿用旧版本，按 LRU 会排在最后
+        evicted = enforce_retention(
+            store,
+            retention,
+            pinned_previews=pinned,
+            pinned_ids={synced_cache_id} if synced_cache_id else None,
+        )
+        for entry in evicted:
+            revisions.delete(entry["id"])
+        return evicted
 
     def load_cached_issues(
         custom_jql: str | None,
         runtime_cfg: dict[str, Any] | None = None,
         source: str = "auto",
         cache_id: str | None = None,
-    ) -> tuple[dict[str, Any], Path, bool]:
-        requested_cache_file = get_cache_file(custom_jql, runtime_cfg=runtime_cfg)
-        cache_file = requested_cache_file
+    ) -> tuple[dict[str, Any], str, bool]:
+        requested_cache_id = get_cache_id(custom_jql, runtime_cfg=runtime_cfg)
+        selected_cache_id = requested_cache_id
         fallback_used = False
         source_mode = (source or "auto").strip().lower()
 
         if source_mode == "requested":
-            if not requested_cache_file.exists():
+            if not store.exists(requested_cache_id):
                 raise FileNotFoundError("Query cache not found")
-            cache_file = requested_cache_file
         elif source_mode == "latest":
-            latest_cache_file = get_latest_cache_file()
-            if latest_cache_file is None:
+            latest_cache_id = store.latest_id()
+            if latest_cache_id is None:
                 raise FileNotFoundError("Query cache not found")
-            cache_file = latest_cache_file
-            fallback_used = latest_cache_file != requested_cache_file
+            selected_cache_id = latest_cache_id
+            fallback_used = latest_cache_id != requested_cache_id
         elif source_mode == "cache_id":
-            selected_cache_file = get_cache_file_by_id(cache_id)
-            if selected_cache_file is None:
+            explicit_cache_id = get_cache_id_if_exists(cache_id)
+            if explicit_cache_id is None:
                 raise FileNotFoundError("Query cache not found")
-            cache_file = selected_cache_file
-            fallback_used = selected_cache_file != requested_cache_file
+            selected_cache_id = explicit_cache_id
+            fallback_used = explicit_cache_id != requested_cache_id
         else:
-            if not requested_cache_file.exists():
-                latest_cache_file = get_latest_cache_file()
-                if latest_cache_file is None:
+            if not store.exists(requested_cache_id):
+                latest_cache_id = store.latest_id()
+                if latest_cache_id is None:
                     raise FileNotFoundError("Query cache not found")
-                cache_file = latest_cache_file
+                selected_cache_id = latest_cache_id
                 fallback_used = True
 
-        return load_cache_payload(cache_file), cache_file, fallback_used
+        return store.load_header(selected_cache_id), selected_cache_id, fallback_used
 
     def list_cached_queries(runtime_cfg: dict[str, Any] | None = None) -> list[dict[str, Any]]:
         latest_by_jql: dict[str, dict[str, Any]] = {}
-        for cache_file in cache_dir.glob("*.json"):
-            try:
-                payload = json.loads(cache_file.read_text(encoding="utf-8"))
-            except Exception:
-                continue
-
-            custom_jql_value = payload.get("custom_jql")
+        for entry in store.entries():
+            custom_jql_value = entry.get("custom_jql")
             custom_jql = str(custom_jql_value).strip() if custom_jql_value else None
             expected_preview = build_jql_preview(custom_jql, runtime_cfg=runtime_cfg)
-            if str(payload.get("jql_preview", "")) != expected_preview:
+            if entry["jql_preview"] != expected_preview:
                 continue
 
             current = {
-                "id": cache_file.stem,
+                "id": entry["id"],
                 "name": expected_preview,
-                "issue_count": int(payload.get("issue_count", 0)),
-                "jql_preview": str(payload.get("jql_preview", "")),
+                "issue_count": entry["issue_count"],
+                "jql_preview": entry["jql_preview"],
                 "custom_jql": custom_jql or "",
-                "updated_at": cache_file.stat().st_mtime,
+                "updated_at": entry["updated_at"],
             }
 
             previous = latest_by_jql.get(expected_preview)
@@ -162,60 +582,102 @@ def create_app(config_path: str | None = None, jira_client: JiraClient | None =
         return sorted(latest_by_jql.values(), key=lambda row: row["updated_at"], reverse=True)
 
     def list_all_cache_sources() -> list[dict[str, Any]]:
-        entries: list[dict[str, Any]] = []
-        for cache_file in cache_dir.glob("*.json"):
-            try:
-                payload = load_cache_payload(cache_file)
-            except FileNotFoundError:
-                continue
-            entries.append(
-                {
-                    "id": cache_file.stem,
-                    "issue_count": int(payload.get("issue_count", 0)),
-                    "jql_preview": str(payload.get("jql_preview", "")),
-                    "custom_jql": str(payload.get("custom_jql", "") or ""),
-                    "updated_at": cache_file.stat().st_mtime,
-                }
-            )
+        entries = [
+            {
+                "id": entry["id"],
+                "issue_count": entry["issue_count"],
+                "jql_preview": entry["jql_preview"],
+                "custom_jql": str(entry.get("custom_jql") or ""),
+                "updated_at": entry["updated_at"],
+            }
+            for entry in store.entries()
+        ]
         return sorted(entries, key=lambda row: row["updated_at"], reverse=True)
 
-    def get_cards(
+    def select_cards(
         assignee: str | None,
         priority: str | None,
         keyword: str | None,
         custom_jql: str | None,
         source: str = "auto",
         cache_id: str | None = None,
-    ) -> tuple[list[dict[str, Any]], str, str, bool]:
+        as_of: datetime | None = None,
+        team: str | None = None,
+    ) -> tuple[list[dict[str, Any]], str, str, bool, str]:
+        """同 ``get_cards``，额外返回实际读取的缓存 id（供按缓存版本记忆的结果使用）。"""
         runtime_cfg = get_runtime_config()
-        payload, cache_file, fallback_used = load_cached_issues(
+        header, selected_cache_id, fallback_used = load_cached_issues(
             custom_jql,
             runtime_cfg=runtime_cfg,
             source=source,
             cache_id=cache_id,
         )
-        issues = payload.get("issues", [])
-        base_url = (runtime_cfg or {}).get("base_url") or "https://jira.local"
-        status_mapping = (runtime_cfg or {}).get("status_mapping")
-        role_settings = (runtime_cfg or {}).get("role_settings")
-        task_owner_field = (runtime_cfg or {}).get("task_owner_field")
-        cards = [
-            normalize_issue(
-                issue,
-                base_url=base_url,
-                status_mapping=status_mapping,
-                role_settings=role_settings,
-                task_owner_field=task_owner_field,
+        cards = load_normalized_cards(selected_cache_id, runtime_cfg)
+        if as_of is not None:
+            cards = cards_as_of(
+                cards,
+                get_event_index(selected_cache_id),
+                as_of,
+                status_mapping=(runtime_cfg or {}).get("status_mapping"),
+                role_settings=(runtime_cfg or {}).get("role_settings"),
             )
-            for issue in issues
-        ]
-        cache_source = str(cache_file.relative_to(Path(__file__).resolve().parent.parent)).replace("\\", "/")
+        if team:
+            cards = select_team_cards(cards, team, selected_cache_id if as_of is None else None)
+        store.record_access(selected_cache_id)
+        cache_source = store.source_label(selected_cache_id, root_dir)
         return (
             filter_cards(cards, assignee=assignee, priority=priority, keyword=keyword),
-            str(payload.get("jql_preview", "")),
+            str(header.get("jql_preview", "")),
             cache_source,
             fallback_used,
+            selected_cache_id,
+        )
+
+    def get_cards(
+        assignee: str | None,
+        priority: str | None,
+        keyword: str | None,
+        custom_jql: str | None,
+        source: str = "auto",
+        cache_id: str | None = None,
+        as_of: datetime | None = None,
+        team: str | None = None,
+    ) -> tuple[list[dict[str, Any]], str, str, bool]:
+        cards, jql_preview, cache_source, fallback_used, _ = select_cards(
+            assignee, priority, keyword, custom_jql, source=source, cache_id=cache_id, as_of=as_of, team=team
         )
+        return cards, jql_preview, cache_source, fallback_used
+
+    def warmup_targets() -> list[str]:
+        pinned: set[str] = set()
+        try:
+            pinned.add(get_cache_id(None, runtime_cfg=cfg))
+        except JiraClientError:
+            pass
+        return select_warmup_targets(store.entries(), int(warmup_settings.get("latest") or 0), pinned)
+
+    warmer = CacheWarmer(lambda cache_id: load_normalized_cards(cache_id, get_runtime_config()), warmup_targets)
+    if warmup_settings.get("enabled"):
+        warmer.start()
+    app.extensions["cache_warmer"] = warmer
+    app.extensions["throughput_store"] = throughput_store
+    result_caches = {
+        "summary": summary_cache,
+        "metrics": metrics_cache,
+        "team_card_index": team_card_index_cache,
+        "flow_sweep": flow_sweep_cache,
+        "aging_baseline": aging_baseline_cache,
+    }
+    app.extensions["result_caches"] = result_caches
+
+    @app.get("/api/ready")
+    def api_ready():
+        return jsonify({"ready": warmer.ready, "warmup": warmer.progress(), "warm_cache_ids": card_cache.cache_ids()})
+
+    @app.get("/api/cache_stats")
+    def api_cache_stats():
+        """各结果缓存的条数、估算字节数与命中 / 未命中 / 淘汰次数。"""
+        return jsonify({"caches": {name: cache.stats() for name, cache in result_caches.items()}})
 
     @app.get("/")
     def index() -> str:
@@ -242,9 +704,10 @@ def create_app(config_path: str | None = None, jira_client: JiraClient | None =
             return jsonify({"error": "Jira query requires confirmation. Set confirmed=true."}), 400
 
         custom_jql = request.args.get("jql")
+        force = (request.args.get("force") or "").strip().lower() == "true"
         runtime_cfg = get_runtime_config()
         try:
-            payload = query_and_cache_issues(custom_jql, runtime_cfg=runtime_cfg)
+            payload = query_and_cache_issues(custom_jql, runtime_cfg=runtime_cfg, force=force)
         except JiraClientError as error:
             return jsonify({"error": str(error)}), 502
 
@@ -252,7 +715,410 @@ def create_app(config_path: str | None = None, jira_client: JiraClient | None =
             {
                 "issue_count": payload.get("issue_count", 0),
                 "jql_preview": payload.get("jql_preview", ""),
-                "cache_file": str(get_cache_file(custom_jql, runtime_cfg=runtime_cfg).name),
+                "cache_file": store.location(get_cache_id(custom_jql, runtime_cfg=runtime_cfg)).name,
+                "sync_status": payload.get("sync_status", SYNC_FULL),
+                "evicted_cache_ids": payload.get("evicted_cache_ids", []),
+            }
+        )
+
+    @app.get("/api/history/trend")
+    def api_history_trend():
+        runtime_cfg = get_runtime_config()
+        cache_id = get_cache_id_if_exists(request.args.get("cache_id")) or get_cache_id(
+            request.args.get("jql"), runtime_cfg=runtime_cfg
+        )
+        scope = (request.args.get("scope") or "board").strip() or "board"
+        try:
+            weeks = int(request.args.get("weeks", 12))
+        except ValueError:
+            return jsonify({"error": "weeks must be an integer"}), 400
+        if weeks < 1 or weeks > 520:
+            return jsonify({"error": "weeks must be between 1 and 520"}), 400
+
+        return jsonify(
+            {
+                "cache_id": cache_id,
+                "scope": scope,
+                "scopes": history.scopes(cache_id),
+                "weeks": history.trend(cache_id, scope=scope, weeks=weeks, period=get_period_engine()),
+            }
+        )
+
+    @app.get("/api/summary/trend")
+    def api_summary_trend():
+        try:
+            count = int(request.args.get("count", 12))
+        except ValueError:
+            return jsonify({"error": "count must be an integer"}), 400
+        if count < 1 or count > 104:
+            return jsonify({"error": "count must be between 1 and 104"}), 400
+        try:
+            windows = trailing_windows(
+                request.args.get("window", "weekly"),
+                count,
+                sprints=sprint_store.recent(board_id=configured_board_id()),
+                engine=get_period_engine(),
+            )
+        except ValueError as error:
+            return jsonify({"error": str(error)}), 400
+
+        assignee = request.args.get("assignee")
+        priority = request.args.get("priority")
+        keyword = request.args.get("q")
+        team = request.args.get("team")
+        try:
+            cards, jql_preview, cache_source, _, selected_cache_id = select_cards(
+                assignee,
+                priority,
+                keyword,
+                request.args.get("jql"),
+                source=request.args.get("source", "auto"),
+                cache_id=request.args.get("cache_id"),
+                team=team,
+            )
+        except FileNotFoundError:
+            return jsonify({"error": "No local query cache found. Call /api/query first."}), 409
+        except UnknownTeamError as error:
+            return jsonify({"error": str(error)}), 404
+        except JiraClientError as error:
+            return jsonify({"error": str(error)}), 502
+
+        series_key = result_key(
+            "trend",
+            selected_cache_id,
+            windows[0]["mode"],
+            windows[0]["start"].isoformat(),
+            count,
+            filter_spec(assignee, priority, keyword, team),
+        )
+        cached = summary_cache.get(series_key)
+        if cached is None:
+            cached = {"windows": build_summary_series(cards, windows)}
+            summary_cache.put(series_key, cached)
+
+        return jsonify(
+            {
+                "cache_id": selected_cache_id,
+                "cache_source": cache_source,
+                "jql_preview": jql_preview,
+                "mode": windows[0]["mode"],
+                "timezone": windows[0]["timezone"],
+                "windows": cached["windows"],
+            }
+        )
+
+    @app.get("/api/metrics/stages")
+    def api_metrics_stages():
+        assignee = request.args.get("assignee")
+        priority = request.args.get("priority")
+        keyword = request.args.get("q")
+        team = request.args.get("team")
+        include_cards = (request.args.get("include_cards") or "").strip().lower() == "true"
+        try:
+            time_basis = parse_time_basis(request.args.get("time_basis"))
+        except ValueError as error:
+            return jsonify({"error": str(error)}), 400
+        try:
+            cards, jql_preview, cache_source, _, selected_cache_id = select_cards(
+                assignee,
+                priority,
+                keyword,
+                request.args.get("jql"),
+                source=request.args.get("source", "auto"),
+                cache_id=request.args.get("cache_id"),
+                team=team,
+            )
+        except FileNotFoundError:
+            return jsonify({"error": "No local query cache found. Call /api/query first."}), 409
+        except UnknownTeamError as error:
+            return jsonify({"error": str(error)}), 404
+        except JiraClientError as error:
+            return jsonify({"error": str(error)}), 502
+
+        stages_key = result_key(
+            "stages", selected_cache_id, filter_spec(assignee, priority, keyword, team), include_cards, time_basis
+        )
+        cached = summary_cache.get(stages_key)
+        if cached is None:
+            cached = compute_stage_metrics(
+                cards,
+                directory=get_team_directory(),
+                include_cards=include_cards,
+                calendar=get_working_calendar(time_basis),
+            )
+            summary_cache.put(stages_key, cached)
+
+        return jsonify(
+            {
+                "cache_id": selected_cache_id,
+                "cache_source": cache_source,
+                "jql_preview": jql_preview,
+                "time_basis": time_basis,
+                **cached,
+            }
+        )
+
+    @app.get("/api/metrics/aging")
+    def api_metrics_aging():
+        team = request.args.get("team")
+        try:
+            time_basis = parse_time_basis(request.args.get("time_basis"))
+        except ValueError as error:
+            return jsonify({"error": str(error)}), 400
+        try:
+            cards, jql_preview, cache_source, _, selected_cache_id = select_cards(
+                request.args.get("assignee"),
+                request.args.get("priority"),
+                request.args.get("q"),
+                request.args.get("jql"),
+                source=request.args.get("source", "auto"),
+                cache_id=request.args.get("cache_id"),
+                team=team,
+            )
+        except FileNotFoundError:
+            return jsonify({"error": "No local query cache found. Call /api/query first."}), 409
+        except UnknownTeamError as error:
+            return jsonify({"error": str(error)}), 404
+        except JiraClientError as error:
+            return jsonify({"error": str(error)}), 502
+
+        engine = get_period_engine()
+        report = compute_aging(
+            cards,
+            get_aging_baseline(selected_cache_id, time_basis),
+            engine.now(),
+            calendar=get_working_calendar(time_basis),
+        )
+        return jsonify(
+            {
+                "cache_id": selected_cache_id,
+                "cache_source": cache_source,
+                "jql_preview": jql_preview,
+                "time_basis": time_basis,
+                "timezone": engine.timezone_label,
+                **report,
+            }
+        )
+
+    @app.get("/api/metrics/cfd")
+    def api_metrics_cfd():
+        assignee = request.args.get("assignee")
+        priority = request.args.get("priority")
+        keyword = request.args.get("q")
+        team = request.args.get("team")
+        granularity = (request.args.get("granularity") or "day").strip().lower()
+        engine = get_period_engine()
+        try:
+            window, _ = resolve_request_window("sprint", engine)
+        except UnknownSprintError as error:
+            return jsonify({"error": str(error)}), 404
+        except ValueError as error:
+            return jsonify({"error": str(error)}), 400
+        try:
+            cards, jql_preview, cache_source, _, selected_cache_id = select_cards(
+                assignee,
+                priority,
+                keyword,
+                request.args.get("jql"),
+                source=request.args.get("source", "auto"),
+                cache_id=request.args.get("cache_id"),
+                team=team,
+            )
+        except FileNotFoundError:
+            return jsonify({"error": "No local query cache found. Call /api/query first."}), 409
+        except UnknownTeamError as error:
+            return jsonify({"error": str(error)}), 404
+        except JiraClientError as error:
+            return jsonify({"error": str(error)}), 502
+
+        # 扫描线结果只取决于缓存内容与过滤条件：换窗口 / 粒度时只重新取样
+        sweep_key = result_key("sweep", selected_cache_id, filter_spec(assignee, priority, keyword, team))
+        cached = flow_sweep_cache.get(sweep_key)
+        if cached is None:
+            status_groups = build_status_groups((get_runtime_config() or {}).get("status_mapping"))
+            cached = {"sweep": build_flow_sweep(cards, get_event_index(selected_cache_id), status_groups)}
+            flow_sweep_cache.put(sweep_key, cached)
+        try:
+            cfd = build_cfd(cached["sweep"], window, granularity=granularity, engine=engine)
+        except ValueError as error:
+            return jsonify({"error": str(error)}), 400
+
+        return jsonify(
+            {
+                "cache_id": selected_cache_id,
+                "cache_source": cache_source,
+                "jql_preview": jql_preview,
+                "window": {
+                    "mode": window["mode"],
+                    "label": window["label"],
+                    "start": window["start"].isoformat(),
+                    "end": window["end"].isoformat(),
+                    "timezone": window["timezone"],
+                    "sprint_id": window.get("sprint_id"),
+                },
+                **cfd,
+            }
+        )
+
+    @app.get("/api/metrics/throughput")
+    def api_metrics_throughput():
+        bucket = (request.args.get("bucket") or "week").strip().lower()
+        engine = get_period_engine()
+        try:
+            window, _ = resolve_request_window("quarterly", engine)
+        except UnknownSprintError as error:
+            return jsonify({"error": str(error)}), 404
+        except ValueError as error:
+            return jsonify({"error": str(error)}), 400
+        try:
+            # 预聚合计数按负责人保存，不支持 assignee / priority / q 等逐卡过滤
+            _, jql_preview, cache_source, _, selected_cache_id = select_cards(
+                None,
+                None,
+                None,
+                request.args.get("jql"),
+                source=request.args.get("source", "auto"),
+                cache_id=request.args.get("cache_id"),
+            )
+        except FileNotFoundError:
+            return jsonify({"error": "No local query cache found. Call /api/query first."}), 409
+        except JiraClientError as error:
+            return jsonify({"error": str(error)}), 502
+
+        try:
+            report = build_throughput_report(
+                get_throughput_counters(selected_cache_id), window, bucket=bucket, teams=get_team_directory()
+            )
+        except ValueError as error:
+            return jsonify({"error": str(error)}), 400
+
+        return jsonify(
+            {
+                "cache_id": selected_cache_id,
+                "cache_source": cache_source,
+                "jql_preview": jql_preview,
+                "window": {
+                    "mode": window["mode"],
+                    "label": window["label"],
+                    "start": window["start"].isoformat(),
+                    "end": window["end"].isoformat(),
+                    "timezone": window["timezone"],
+                    "sprint_id": window.get("sprint_id"),
+                },
+                **report,
+            }
+        )
+
+    @app.get("/api/metrics/forecast")
+    def api_metrics_forecast():
+        team = request.args.get("team")
+        owner = (request.args.get("owner") or "").strip() or None
+        if team and owner:
+            return jsonify({"error": "team and owner are mutually exclusive"}), 400
+        try:
+            history_days = int(request.args.get("history_days", FORECAST_HISTORY_DAYS))
+            trials = int(request.args.get("trials", FORECAST_TRIALS))
+            remaining_override = request.args.get("remaining")
+            remaining_override = int(remaining_override) if remaining_override not in (None, "") else None
+        except ValueError:
+            return jsonify({"error": "history_days, trials and remaining must be integers"}), 400
+        try:
+            cards, jql_preview, cache_source, _, selected_cache_id = select_cards(
+                None,
+                None,
+                None,
+                request.args.get("jql"),
+                source=request.args.get("source", "auto"),
+                cache_id=request.args.get("cache_id"),
+                team=team,
+            )
+        except FileNotFoundError:
+            return jsonify({"error": "No local query cache found. Call /api/query first."}), 409
+        except UnknownTeamError as error:
+            return jsonify({"error": str(error)}), 404
+        except JiraClientError as error:
+            return jsonify({"error": str(error)}), 502
+
+        engine = get_period_engine()
+        if team:
+            scope = {"kind": "team", "id": team}
+        elif owner:
+            scope = {"kind": "owner", "id": owner}
+        else:
+            scope = {"kind": "board", "id": None}
+        forecast_key = result_key(
+            "forecast",
+            selected_cache_id,
+            scope["kind"],
+            scope["id"] or "",
+            remaining_override,
+            history_days,
+            trials,
+            engine.now().date().isoformat(),
+        )
+        cached = summary_cache.get(forecast_key)
+        if cached is None:
+            counters = get_throughput_counters(selected_cache_id)
+            if team:
+                owners: list[str] | None = get_team_directory().group_owners(counters.owners())[team]
+            elif owner:
+                owners = [owner]
+                cards = [card for card in cards if card_owner(card) == owner]
+            else:
+                owners = None
+            remaining = sum(1 for card in cards if card["column"] != "Done")
+            try:
+                cached = build_forecast(
+                    counters,
+                    remaining if remaining_override is None else remaining_override,
+                    owners=owners,
+                    history_days=history_days,
+                    trials=trials,
+                    # 同一（缓存版本, 范围）的预测可复现，不随进程变化
+                    seed=int(hashlib.sha256(repr(forecast_key).encode("utf-8")).hexdigest()[:8], 16),
+                )
+            except ValueError as error:
+                return jsonify({"error": str(error)}), 400
+            summary_cache.put(forecast_key, cached)
+
+        return jsonify(
+            {
+                "cache_id": selected_cache_id,
+                "cache_source": cache_source,
+                "jql_preview": jql_preview,
+                "scope": scope,
+                "timezone": engine.timezone_label,
+                **cached,
+            }
+        )
+
+    @app.get("/api/diff")
+    def api_diff():
+        from_ref = parse_revision_ref(request.args.get("from"))
+        to_ref = parse_revision_ref(request.args.get("to") or request.args.get("from"))
+        if from_ref is None or to_ref is None:
+            return jsonify({"error": "from/to must be <cache_id> or <cache_id>@<revision>"}), 400
+
+        try:
+            from_row, to_row, changes = diff_caches(from_ref[0], to_ref[0], from_ref[1], to_ref[1])
+        except FileNotFoundError as error:
+            return jsonify({"error": str(error)}), 404
+
+        def describe(cache_id: str, row: dict[str, Any]) -> dict[str, Any]:
+            return {
+                "cache_id": cache_id,
+                "revision": row.get("revision"),
+                "synced_at": row.get("synced_at"),
+                "issue_count": row.get("issue_count"),
+            }
+
+        return jsonify(
+            {
+                "from": describe(from_ref[0], from_row),
+                "to": describe(to_ref[0], to_row),
+                "summary": count_changes(changes),
+                "changes": changes,
+                "text": "\n".join(build_change_section(changes)),
             }
         )
 
@@ -264,30 +1130,68 @@ def create_app(config_path: str | None = None, jira_client: JiraClient | None =
         custom_jql = request.args.get("jql")
         source = request.args.get("source", "auto")
         cache_id = request.args.get("cache_id")
-        window_mode = request.args.get("window", "weekly")
-        window_start = request.args.get("start")
-        window_end = request.args.get("end")
+        team = request.args.get("team")
 
         try:
-            cards, jql_preview, cache_source, cache_fallback = get_cards(
+            as_of = parse_as_of(request.args.get("as_of"))
+            window, summary_window_key = resolve_request_window("weekly", get_period_engine())
+            time_basis = parse_time_basis(request.args.get("time_basis"))
+        except UnknownSprintError as error:
+            return jsonify({"error": str(error)}), 404
+        except ValueError as error:
+            return jsonify({"error": str(error)}), 400
+
+        try:
+            cards, jql_preview, cache_source, cache_fallback, selected_cache_id = select_cards(
                 assignee,
                 priority,
                 keyword,
                 custom_jql,
                 source=source,
                 cache_id=cache_id,
+                as_of=as_of,
+                team=team,
             )
         except FileNotFoundError:
             return jsonify({"error": "No local query cache found. Call /api/query first."}), 409
+        except UnknownTeamError as error:
+            return jsonify({"error": str(error)}), 404
         except JiraClientError as error:
             return jsonify({"error": str(error)}), 502
 
         columns = split_columns(cards)
-        runtime_cfg_board = get_runtime_config() or {}
-        quality_names = set((runtime_cfg_board.get("role_settings") or {}).get("quality_roles") or [])
-        metrics = compute_member_metrics(cards, exclude_roles=quality_names)
-        window = resolve_period_window(window_mode, window_start, window_end, cards=cards)
-        summary = build_manager_summary(cards, window)
+        metrics_bundle = get_member_metrics(
+            cards, selected_cache_id, filter_spec(assignee, priority, keyword, team), as_of, time_basis
+        )
+        team_directory = get_team_directory()
+        # 在制品老化：阈值按缓存版本复用；回溯视图以回溯时刻的卡片为历史
+        calendar = get_working_calendar(time_basis)
+        if as_of is None:
+            baseline = get_aging_baseline(selected_cache_id, time_basis)
+            aging = compute_aging(cards, baseline, get_period_engine().now(), calendar)
+        else:
+            aging = compute_aging(cards, build_aging_baseline(cards, calendar), as_of, calendar)
+        include_changes = (request.args.get("include_changes") or "").strip().lower() == "true" and as_of is None
+        # 总结只取决于缓存内容、窗口、过滤条件与配置/模板版本：命中时跳过分类与文本渲染
+        summary_key = result_key(
+            "summary",
+            selected_cache_id,
+            summary_templates_version(),
+            summary_window_key,
+            filter_spec(assignee, priority, keyword, team),
+            as_of.isoformat() if as_of else "",
+            include_changes,
+        )
+        summary = summary_cache.get(summary_key)
+        if summary is None:
+            changes: list[dict[str, Any]] | None = None
+            if include_changes:
+                try:
+                    _, _, changes = diff_caches(selected_cache_id, selected_cache_id)
+                except FileNotFoundError:
+                    changes = None
+            summary = build_manager_summary(cards, window, changes=changes, teams=team_directory)
+            summary_cache.put(summary_key, summary)
         assignees = sorted(
             {name for card in cards for name in (card["assignee"], card.get("metric_owner")) if name}
         )
@@ -297,28 +1201,39 @@ def create_app(config_path: str | None = None, jira_client: JiraClient | None =
             {
                 "columns": columns,
                 "cards": cards,
-                "metrics": metrics,
+                **metrics_bundle,
+                "time_basis": time_basis,
+                "aging": {
+                    "summary": aging["summary"],
+                    "cards": {
+                        row["key"]: {"age_hours": row["age_hours"], "level": row["level"], "aged": row["aged"]}
+                        for row in aging["cards"]
+                    },
+                },
                 "filters": {
                     "assignees": assignees,
                     "priorities": priorities,
+                    "teams": [{"id": row["id"], "name": row["name"]} for row in team_directory.teams],
                 },
                 "jql_preview": jql_preview,
                 "cache_source": cache_source,
                 "cache_fallback": cache_fallback,
                 "cache_mode": source,
                 "cache_id": cache_id,
+                "as_of": as_of.isoformat() if as_of else None,
                 "summary_window": summary["summary_window"],
                 "manager_summary_cards": summary["manager_summary_cards"],
                 "manager_summary_text": summary["manager_summary_text"],
                 "period_focus": summary["period_focus"],
+                "team_summary": summary["team_summary"],
             }
         )
 
     @app.get("/api/gantt")
     def api_gantt():
         mode = request.args.get("mode", "member")
-        if mode not in {"member", "sprint"}:
-            return jsonify({"error": "mode must be member or sprint"}), 400
+        if mode not in {"member", "sprint", "team"}:
+            return jsonify({"error": "mode must be member, sprint or team"}), 400
 
         assignee = request.args.get("assignee")
         priority = request.args.get("priority")
@@ -326,6 +1241,12 @@ def create_app(config_path: str | None = None, jira_client: JiraClient | None =
         custom_jql = request.args.get("jql")
         source = request.args.get("source", "auto")
         cache_id = request.args.get("cache_id")
+        team = request.args.get("team")
+
+        try:
+            as_of = parse_as_of(request.args.get("as_of"))
+        except ValueError as error:
+            return jsonify({"error": str(error)}), 400
 
         try:
             cards, jql_preview, cache_source, cache_fallback = get_cards(
@@ -335,21 +1256,26 @@ def create_app(config_path: str | None = None, jira_client: JiraClient | None =
                 custom_jql,
                 source=source,
                 cache_id=cache_id,
+                as_of=as_of,
+                team=team,
             )
         except FileNotFoundError:
             return jsonify({"error": "No local query cache found. Call /api/query first."}), 409
+        except UnknownTeamError as error:
+            return jsonify({"error": str(error)}), 404
         except JiraClientError as error:
             return jsonify({"error": str(error)}), 502
 
         return jsonify(
             {
-                "rows": build_gantt_rows(cards, mode=mode),
+                "rows": build_gantt_rows(cards, mode=mode, directory=get_team_directory()),
                 "mode": mode,
                 "jql_preview": jql_preview,
                 "cache_source": cache_source,
                 "cache_fallback": cache_fallback,
                 "cache_mode": source,
                 "cache_id": cache_id,
+                "as_of": as_of.isoformat() if as_of else None,
             }
         )
 
@@ -365,9 +1291,12 @@ def create_app(config_path: str | None = None, jira_client: JiraClient | None =
                 request.args.get("jql"),
                 source=source,
                 cache_id=cache_id,
+                team=request.args.get("team"),
             )
         except FileNotFoundError:
             return jsonify({"error": "No local query cache found. Call /api/query first."}), 409
+        except UnknownTeamError as error:
+            return jsonify({"error": str(error)}), 404
 
         output = StringIO()
         writer = csv.writer(output)
@@ -394,20 +1323,33 @@ def create_app(config_path: str | None = None, jira_client: JiraClient | None =
     def api_export_xlsx():
         source = request.args.get("source", "auto")
         cache_id = request.args.get("cache_id")
+        assignee = request.args.get("assignee")
+        priority = request.args.get("priority")
+        keyword = request.args.get("q")
+        team = request.args.get("team")
         try:
-            cards, _, _, _ = get_cards(
-                request.args.get("assignee"),
-                request.args.get("priority"),
-                request.args.get("q"),
+            time_basis = parse_time_basis(request.args.get("time_basis"))
+        except ValueError as error:
+            return jsonify({"error": str(error)}), 400
+        try:
+            cards, _, _, _, selected_cache_id = select_cards(
+                assignee,
+                priority,
+                keyword,
                 request.args.get("jql"),
                 source=source,
                 cache_id=cache_id,
+                team=team,
             )
         except FileNotFoundError:
             return jsonify({"error": "No local query cache found. Call /api/query first."}), 409
-        runtime_cfg_export = get_runtime_config() or {}
-        quality_names_export = set((runtime_cfg_export.get("role_settings") or {}).get("quality_roles") or [])
-        metrics = compute_member_metrics(cards, exclude_roles=quality_names_export)
+        except UnknownTeamError as error:
+            return jsonify({"error": str(error)}), 404
+        calendar = get_working_calendar(time_basis)
+        # 与看板共用同一份指标结果：刚打开过的看板导出时不再重算
+        metrics = get_member_metrics(
+            cards, selected_cache_id, filter_spec(assignee, priority, keyword, team), None, time_basis
+        )["metrics"]
 
         workbook = Workbook()
         details = workbook.active
@@ -429,7 +1371,23 @@ def create_app(config_path: str | None = None, jira_client: JiraClient | None =
             )
 
         stats = workbook.create_sheet("Metrics")
-        stats.append(["Assignee", "Total", "Resolved", "Resolution Rate", "WIP", "Avg Lead Time Hours", "Weighted Progress"])
+        stats.append(
+            [
+                "Assignee",
+                "Total",
+                "Resolved",
+                "Resolution Rate",
+                "WIP",
+                "Avg Lead Time Hours",
+                "Lead Time P50 Hours",
+                "Lead Time P85 Hours",
+                "Lead Time P95 Hours",
+                "Cycle Time P50 Hours",
+                "Cycle Time P85 Hours",
+                "Cycle Time P95 Hours",
+                "Weighted Progress",
+            ]
+        )
         for row in metrics:
             stats.append(
                 [
@@ -439,10 +1397,38 @@ def create_app(config_path: str | None = None, jira_client: JiraClient | None =
                     row["resolution_rate"],
                     row["wip"],
                     row["avg_lead_time_hours"],
+                    row["lead_time_p50_hours"],
+                    row["lead_time_p85_hours"],
+                    row["lead_time_p95_hours"],
+                    row["cycle_time_p50_hours"],
+                    row["cycle_time_p85_hours"],
+                    row["cycle_time_p95_hours"],
                     row["weighted_progress"],
                 ]
             )
 
+        stage_metrics = compute_stage_metrics(cards, directory=get_team_directory(), calendar=calendar)
+        stage_labels = {stage["id"]: stage["label"] for stage in stage_metrics["stages"]}
+        stage_sheet = workbook.create_sheet("Stages")
+        stage_sheet.append(["Scope", "Name", "Stage", "Count", "Avg Hours", "P50 Hours", "P85 Hours", "P95 Hours"])
+        scopes = [("Board", "All", stage_metrics["board"]["stages"])]
+        scopes += [("Team", row["name"], row["stages"]) for row in stage_metrics["teams"]]
+        scopes += [("Owner", row["owner"], row["stages"]) for row in stage_metrics["owners"]]
+        for scope, name, distributions in scopes:
+            for stage_id, row in distributions.items():
+                stage_sheet.append(
+                    [
+                        scope,
+                        name,
+                        stage_labels[stage_id],
+                        row["count"],
+                        row["avg_hours"],
+                        row["p50_hours"],
+                        row["p85_hours"],
+                        row["p95_hours"],
+                    ]
+                )
+
         binary = BytesIO()
         workbook.save(binary)
         binary.seek(0)
@@ -466,10 +1452,13 @@ def create_app(config_path: str | None = None, jira_client: JiraClient | None =
                 request.args.get("jql"),
                 source=source,
                 cache_id=cache_id,
+                team=request.args.get("team"),
             )
         except FileNotFoundError:
             return jsonify({"error": "No local query cache found. Call /api/query first."}), 409
-        rows = build_gantt_rows(cards, mode=mode)
+        except UnknownTeamError as error:
+            return jsonify({"error": str(error)}), 404
+        rows = build_gantt_rows(cards, mode=mode, directory=get_team_directory())
 
         lanes = sorted({row["lane"] for row in rows})
         lane_index = {lane: index for index, lane in enumerate(lanes)}
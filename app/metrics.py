@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-from statistics import mean
-from typing import Any
+from typing import Any, Iterable
 
 from .normalize import parse_datetime
+from .period import to_epochs
+from .quantiles import QuantileSketch, merge_sketches, percentile_fields
+from .teams import NO_TEAM_LANE, TeamDirectory, card_owner
+from .working_calendar import WorkingCalendar
 
 
 PRIORITY_WEIGHT = {
@@ -24,72 +27,186 @@ def _hours_between(start: str | None, end: str | None) -> float | None:
     return delta.total_seconds() / 3600
 
 
+class MemberStats:
+    """单个负责人的计数与交付周期草图；草图可合并，团队 / 看板汇总时直接合并，不必重扫卡片。"""
+
+    __slots__ = ("total", "resolved", "wip", "total_weight", "resolved_weight", "lead", "cycle")
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.resolved = 0
+        self.wip = 0
+        self.total_weight = 0
+        self.resolved_weight = 0
+        self.lead = QuantileSketch()
+        self.cycle = QuantileSketch()
+
+    def merge(self, other: "MemberStats") -> "MemberStats":
+        self.total += other.total
+        self.resolved += other.resolved
+        self.wip += other.wip
+        self.total_weight += other.total_weight
+        self.resolved_weight += other.resolved_weight
+        self.lead.merge(other.lead)
+        self.cycle.merge(other.cycle)
+        return self
+
+
+def _business_hours(cards: list[dict[str, Any]], calendar: WorkingCalendar) -> tuple[list[float], list[float]]:
+    """批量换算工作时间坐标，返回每张卡片的 lead / cycle 工作小时数（缺失为 NaN）。"""
+    timelines = [card["timeline"] for card in cards]
+    created, started, resolved = (
+        calendar.positions(to_epochs(timeline.get(name) for timeline in timelines))
+        for name in ("created_at", "developer_started_at", "resolved_at")
+    )
+    return ((resolved - created) / 3600).tolist(), ((resolved - started) / 3600).tolist()
+
+
+def collect_member_stats(
+    cards: list[dict[str, Any]],
+    calendar: WorkingCalendar | None = None,
+) -> dict[str, MemberStats]:
+    """一次遍历卡片，按负责人累计计数与 lead time（创建→解决）/ cycle time（开始开发→解决）样本。
+
+    给出 ``calendar`` 时样本为工作小时数（按工作日历扣除非工作时段），否则为自然小时数。
+    """
+    stats: dict[str, MemberStats] = {}
+    business = _business_hours(cards, calendar) if calendar is not None and cards else None
+    for position, card in enumerate(cards):
+        owner = card_owner(card)
+        row = stats.get(owner)
+        if row is None:
+            row = stats[owner] = MemberStats()
+        weight = PRIORITY_WEIGHT.get(card["priority"].lower(), 1)
+        row.total += 1
+        row.total_weight += weight
+        if card["column"] == "Done":
+            row.resolved += 1
+            row.resolved_weight += weight
+        elif card["column"] in {"In Progress", "审核中"}:
+            row.wip += 1
+
+        if business is not None:
+            lead, cycle = business[0][position], business[1][position]
+            lead = None if lead != lead else lead
+            cycle = None if cycle != cycle else cycle
+        else:
+            timeline = card["timeline"]
+            lead = _hours_between(timeline.get("created_at"), timeline.get("resolved_at"))
+            cycle = _hours_between(timeline.get("developer_started_at"), timeline.get("resolved_at"))
+        if lead is not None:
+            row.lead.add(lead)
+        if cycle is not None:
+            row.cycle.add(cycle)
+    return stats
+
+
 def compute_member_metrics(
     cards: list[dict[str, Any]],
     exclude_roles: set[str] | None = None,
+    stats: dict[str, MemberStats] | None = None,
 ) -> list[dict[str, Any]]:
+    """``stats`` 为 ``collect_member_stats`` 的结果（可缓存复用）；未传时现场计算。"""
     _exclude = {name.strip().lower() for name in (exclude_roles or set()) if name}
-    grouped: dict[str, list[dict[str, Any]]] = {}
-    for card in cards:
-        owner = str(card.get("metric_owner") or card.get("assignee") or "Unassigned")
-        grouped.setdefault(owner, []).append(card)
+    if stats is None:
+        stats = collect_member_stats(cards)
+
+    rows = [
+        {"assignee": assignee, **_stats_fields(item)}
+        for assignee, item in stats.items()
+        if not (_exclude and assignee.strip().lower() in _exclude)
+    ]
+    rows.sort(key=lambda row: (-row["weighted_progress"], row["assignee"]))
+    return rows
 
-    rows: list[dict[str, Any]] = []
-    for assignee, items in grouped.items():
-        if _exclude and assignee.strip().lower() in _exclude:
-            continue
-        total = len(items)
-        resolved = len([item for item in items if item["column"] == "Done"])
-        wip = len([item for item in items if item["column"] in {"In Progress", "审核中"}])
-        lead_times = [
-            _hours_between(item["timeline"].get("created_at"), item["timeline"].get("resolved_at"))
-            for item in items
-        ]
-        valid_lead_times = [value for value in lead_times if value is not None]
-
-        total_weight = sum(PRIORITY_WEIGHT.get(item["priority"].lower(), 1) for item in items) or 1
-        resolved_weight = sum(
-            PRIORITY_WEIGHT.get(item["priority"].lower(), 1) for item in items if item["column"] == "Done"
-        )
-
-        rows.append(
-            {
-                "assignee": assignee,
-                "total": total,
-                "resolved": resolved,
-                "resolution_rate": round((resolved / total) * 100, 2) if total else 0,
-                "wip": wip,
-                "avg_lead_time_hours": round(mean(valid_lead_times), 2) if valid_lead_times else None,
-                "weighted_progress": round((resolved_weight / total_weight) * 100, 2),
-            }
-        )
 
-    rows.sort(key=lambda row: (-row["weighted_progress"], row["assignee"]))
+def _stats_fields(item: MemberStats) -> dict[str, Any]:
+    total = item.total
+    avg_lead_time = item.lead.mean()
+    return {
+        "total": total,
+        "resolved": item.resolved,
+        "resolution_rate": round((item.resolved / total) * 100, 2) if total else 0,
+        "wip": item.wip,
+        "avg_lead_time_hours": round(avg_lead_time, 2) if avg_lead_time is not None else None,
+        **percentile_fields("lead_time", item.lead),
+        **percentile_fields("cycle_time", item.cycle),
+        "weighted_progress": round((item.resolved_weight / (item.total_weight or 1)) * 100, 2),
+    }
+
+
+def compute_team_metrics(
+    stats: dict[str, MemberStats],
+    directory: TeamDirectory,
+    exclude_roles: set[str] | None = None,
+) -> list[dict[str, Any]]:
+    """按团队合并成员的 ``MemberStats``（计数相加、草图合并），字段与 ``compute_member_metrics`` 的行一致。
+
+    ``exclude_roles`` 与 ``compute_member_metrics`` 相同，被排除的负责人不计入团队，团队合计等于其成员行之和。
+    """
+    _exclude = {name.strip().lower() for name in (exclude_roles or set()) if name}
+    counted = [owner for owner in stats if owner.strip().lower() not in _exclude]
+    rows: list[dict[str, Any]] = []
+    for team_id, owners in directory.group_owners(counted).items():
+        merged = MemberStats()
+        for owner in owners:
+            merged.merge(stats[owner])
+        rows.append({"team": team_id, "name": directory.name_of(team_id), "members": sorted(owners), **_stats_fields(merged)})
     return rows
 
 
-def build_gantt_rows(cards: list[dict[str, Any]], mode: str = "member") -> list[dict[str, Any]]:
+def rollup_flow_metrics(stats: dict[str, MemberStats], owners: Iterable[str] | None = None) -> dict[str, Any]:
+    """合并（部分）负责人的草图，得到看板或团队整体的 lead / cycle time 分位数。"""
+    selected = [stats[owner] for owner in owners if owner in stats] if owners is not None else list(stats.values())
+    lead = merge_sketches(item.lead for item in selected)
+    cycle = merge_sketches(item.cycle for item in selected)
+    avg_lead_time = lead.mean()
+    return {
+        "issue_count": sum(item.total for item in selected),
+        "lead_time_samples": lead.count,
+        "cycle_time_samples": cycle.count,
+        "avg_lead_time_hours": round(avg_lead_time, 2) if avg_lead_time is not None else None,
+        **percentile_fields("lead_time", lead),
+        **percentile_fields("cycle_time", cycle),
+    }
+
+
+def build_gantt_rows(
+    cards: list[dict[str, Any]],
+    mode: str = "member",
+    directory: TeamDirectory | None = None,
+) -> list[dict[str, Any]]:
+    """``mode=team`` 时按负责人所属团队分泳道（与 member 同口径：开始开发→解决）；属于多个团队的卡片
+    在每个团队各出现一次，不属于任何团队的归入 ``No Team``。"""
     rows: list[dict[str, Any]] = []
     for card in cards:
-        start = card["timeline"].get("developer_started_at") if mode == "member" else card["timeline"].get("created_at")
+        start = card["timeline"].get("created_at") if mode == "sprint" else card["timeline"].get("developer_started_at")
         end = card["timeline"].get("resolved_at")
-        lane = str(card.get("metric_owner") or card.get("assignee") or "Unassigned") if mode == "member" else (card.get("sprint") or "Unknown Sprint")
 
         if not start or not end:
             continue
 
-        rows.append(
-            {
-                "lane": lane,
-                "key": card["key"],
-                "summary": card["summary"],
-                "priority": card["priority"],
-                "status": card["status"],
-                "start": start,
-                "end": end,
-                "url": card["url"],
-            }
-        )
+        if mode == "member":
+            lanes = [card_owner(card)]
+        elif mode == "team":
+            team_ids = directory.teams_of(card_owner(card)) if directory is not None else []
+            lanes = [directory.name_of(team_id) for team_id in team_ids] or [NO_TEAM_LANE]
+        else:
+            lanes = [card.get("sprint") or "Unknown Sprint"]
+
+        for lane in lanes:
+            rows.append(
+                {
+                    "lane": lane,
+                    "key": card["key"],
+                    "summary": card["summary"],
+                    "priority": card["priority"],
+                    "status": card["status"],
+                    "start": start,
+                    "end": end,
+                    "url": card["url"],
+                }
+            )
 
     rows.sort(key=lambda row: (row["lane"], row["start"]))
     return rows
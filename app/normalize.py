@@ -2,16 +2,21 @@ from __future__ import annotations
 
 import re
 from datetime import datetime
-from typing import Any
+from typing import Any, Iterable, Iterator
 
 
 _TZ_NO_COLON = re.compile(r'([+-])(\d{2})(\d{2})$')
+# Jira Server 旧格式：com.atlassian.greenhopper.service.sprint.Sprint@1a2b[id=12,state=CLOSED,name=Sprint 11,...]
+_GREENHOPPER_SPRINT = re.compile(r"\[(.*)\]\s*$", re.S)
+_GREENHOPPER_PAIR = re.compile(r"(\w+)=(.*?)(?=,\w+=|$)", re.S)
 
 
 TODO_STATES = {"to do", "open", "backlog", "selected for development"}
 IN_PROGRESS_STATES = {"in progress", "development", "testing"}
 REVIEW_STATES = {"in review", "code review", "reviewing", "审核中"}
 DONE_STATES = {"done", "resolved", "closed", "已解决"}
+# 看板列（显示顺序）
+BOARD_COLUMNS = ("To Do", "In Progress", "审核中", "Done")
 
 
 def build_status_groups(status_mapping: dict[str, list[str]] | None = None) -> dict[str, set[str]]:
@@ -347,12 +352,59 @@ def extract_timeline(
     return timeline
 
 
+def _sprint_value(raw: Any) -> Any:
+    if raw is None or raw == "" or raw == "<null>":
+        return None
+    return raw
+
+
+def _parse_sprint(raw: Any) -> dict[str, Any] | None:
+    if isinstance(raw, str):
+        match = _GREENHOPPER_SPRINT.search(raw)
+        if not match:
+            return None
+        raw = {key: value for key, value in _GREENHOPPER_PAIR.findall(match.group(1))}
+        raw["originBoardId"] = raw.get("originBoardId") or raw.get("rapidViewId")
+    if not isinstance(raw, dict):
+        return None
+    try:
+        sprint_id = int(raw.get("id"))
+    except (TypeError, ValueError):
+        sprint_id = None
+    name = _sprint_value(raw.get("name"))
+    if sprint_id is None and not name:
+        return None
+    board_id = _sprint_value(raw.get("originBoardId") or raw.get("boardId"))
+    return {
+        "id": sprint_id,
+        "name": str(name) if name else None,
+        "state": str(_sprint_value(raw.get("state")) or "").lower() or None,
+        "start_date": _sprint_value(raw.get("startDate")),
+        "end_date": _sprint_value(raw.get("endDate")),
+        "complete_date": _sprint_value(raw.get("completeDate")),
+        "board_id": int(board_id) if str(board_id or "").isdigit() else None,
+    }
+
+
+def parse_sprint_field(value: Any) -> list[dict[str, Any]]:
+    """解析 Sprint 字段：对象 / 对象数组（Jira Cloud、Agile API）或 greenhopper 字符串数组（Jira Server）。"""
+    items = value if isinstance(value, list) else [value]
+    return [sprint for sprint in (_parse_sprint(item) for item in items) if sprint]
+
+
+def _extract_sprints(fields: dict[str, Any], sprint_field: str | None) -> list[dict[str, Any]]:
+    if sprint_field and fields.get(sprint_field) is not None:
+        return parse_sprint_field(fields.get(sprint_field))
+    return parse_sprint_field(fields.get("sprint"))
+
+
 def normalize_issue(
     issue: dict[str, Any],
     base_url: str,
     status_mapping: dict[str, list[str]] | None = None,
     role_settings: dict[str, list[str]] | None = None,
     task_owner_field: str | None = None,
+    sprint_field: str | None = None,
 ) -> dict[str, Any]:
     status_groups = build_status_groups(status_mapping)
     fields = issue.get("fields", {})
@@ -376,6 +428,7 @@ def normalize_issue(
         metric_owner = task_owner
 
     timeline = extract_timeline(issue, status_groups=status_groups, role_settings=role_settings)
+    sprints = _extract_sprints(fields, sprint_field)
     return {
         "key": issue.get("key"),
         "summary": fields.get("summary", ""),
@@ -395,10 +448,33 @@ def normalize_issue(
         "description": fields.get("description") or "",
         "url": f"{base_url}/browse/{issue.get('key')}",
         "timeline": timeline,
-        "sprint": fields.get("sprint", {}).get("name") if isinstance(fields.get("sprint"), dict) else None,
+        # 多个 sprint 时取最后一个（Jira 按加入顺序排列，最后一个为当前 / 最近的 sprint）
+        "sprint": sprints[-1]["name"] if sprints else None,
+        "sprint_ids": [sprint["id"] for sprint in sprints if sprint["id"] is not None],
+        "sprints": sprints,
     }
 
 
+def iter_normalized_cards(
+    issues: Iterable[dict[str, Any]],
+    base_url: str,
+    status_mapping: dict[str, list[str]] | None = None,
+    role_settings: dict[str, list[str]] | None = None,
+    task_owner_field: str | None = None,
+    sprint_field: str | None = None,
+) -> Iterator[dict[str, Any]]:
+    """流式归一化：配合缓存的逐条读取，原始 issue 用完即释放，只保留归一化后的卡片。"""
+    for issue in issues:
+        yield normalize_issue(
+            issue,
+            base_url=base_url,
+            status_mapping=status_mapping,
+            role_settings=role_settings,
+            task_owner_field=task_owner_field,
+            sprint_field=sprint_field,
+        )
+
+
 def filter_cards(
     cards: list[dict[str, Any]],
     assignee: str | None = None,
@@ -419,8 +495,18 @@ def filter_cards(
     return output
 
 
+def filter_spec(
+    assignee: str | None = None,
+    priority: str | None = None,
+    keyword: str | None = None,
+    team: str | None = None,
+) -> tuple[str, str, str, str]:
+    """过滤条件的规范形式，供结果缓存作键：空值统一为空串，keyword 与 ``filter_cards`` 一样不区分大小写。"""
+    return (assignee or "", priority or "", (keyword or "").lower(), team or "")
+
+
 def split_columns(cards: list[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
-    columns = {"To Do": [], "In Progress": [], "审核中": [], "Done": []}
+    columns: dict[str, list[dict[str, Any]]] = {column: [] for column in BOARD_COLUMNS}
     for card in cards:
         columns.setdefault(card["column"], []).append(card)
     return columns
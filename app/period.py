@@ -1,23 +1,223 @@
+"""统计窗口：按团队时区（``period_settings.timezone``）与周起始日计算自然周 / 双周 / 月 / 季度窗口。
+
+- ``PeriodEngine``：给定时刻所在窗口、最近 N 个连续窗口；时区未配置时用服务器本地时区（与旧行为一致）。
+- ``BucketEdges``：把一组窗口的起止预先转成 epoch 秒数组，成批事件的归属用 numpy ``searchsorted`` 一次完成，
+  不再逐个事件做 datetime 比较。
+"""
+
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from typing import Any
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from typing import Any, Iterable
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
 
 from .normalize import parse_datetime
+from .sprints import sprint_end
+
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+CALENDAR_MODES = ("weekly", "biweekly", "monthly", "quarterly")
+TREND_WINDOW_MODES = (*CALENDAR_MODES, "sprint")
+SPRINT_LENGTH_DAYS = 14
+# 双周窗口的对齐基准（周一）；按周起始日平移，保证同一配置下双周边界固定
+_BIWEEKLY_ANCHOR = date(1970, 1, 5)
+
+GRANULARITIES = ("day", "week", "hour")
+
+_CURRENT_LABELS = {"weekly": "本周", "biweekly": "本双周", "monthly": "本月", "quarterly": "本季度"}
+
+
+def parse_week_start(raw: Any) -> int:
+    """周起始日：``monday``..``sunday``（不区分大小写）或 0..6（0 为周一）；空值为周一。"""
+    if raw is None or str(raw).strip() == "":
+        return 0
+    text = str(raw).strip().lower()
+    if text in WEEKDAYS:
+        return WEEKDAYS.index(text)
+    if text.isdigit() and 0 <= int(text) <= 6:
+        return int(text)
+    raise ValueError(f"Invalid week_start: {raw}")
+
+
+def resolve_timezone(name: str | None) -> tzinfo | None:
+    """IANA 时区名（如 ``Asia/Shanghai``）；空值返回 None，表示服务器本地时区。"""
+    if name is None or not str(name).strip():
+        return None
+    try:
+        return ZoneInfo(str(name).strip())
+    except (ZoneInfoNotFoundError, ValueError) as exc:
+        raise ValueError(f"Unknown timezone: {name}") from exc
+
+
+def _add_months(day: date, months: int) -> date:
+    total = day.year * 12 + day.month - 1 + months
+    return date(total // 12, total % 12 + 1, 1)
+
+
+class PeriodEngine:
+    def __init__(self, timezone: str | None = None, week_start: int = 0) -> None:
+        self.timezone_name = (timezone or "").strip() or None
+        self.tz = resolve_timezone(self.timezone_name)
+        self.week_start = week_start
+
+    @classmethod
+    def from_settings(cls, settings: dict[str, Any] | None) -> "PeriodEngine":
+        settings = settings or {}
+        return cls(timezone=settings.get("timezone"), week_start=parse_week_start(settings.get("week_start")))
+
+    def now(self) -> datetime:
+        return datetime.now(self.tz) if self.tz is not None else datetime.now().astimezone()
+
+    def localize(self, point: datetime) -> datetime:
+        return point.astimezone(self.tz) if self.tz is not None else point.astimezone()
+
+    @property
+    def timezone_label(self) -> str:
+        return self.timezone_name or str(self.now().tzinfo or "local")
+
+    def day_start(self, day: date) -> datetime:
+        # 按当地零点构造（夏令时切换日也落在正确的偏移上），而不是对已有时刻加减 timedelta
+        if self.tz is not None:
+            return datetime(day.year, day.month, day.day, tzinfo=self.tz)
+        return datetime(day.year, day.month, day.day).astimezone()
+
+    def week_floor(self, day: date) -> date:
+        return day - timedelta(days=(day.weekday() - self.week_start) % 7)
+
+    def bucket_start(self, point: datetime, mode: str) -> datetime:
+        day = self.localize(point).date()
+        if mode == "weekly":
+            day = self.week_floor(day)
+        elif mode == "biweekly":
+            day = self.week_floor(day)
+            anchor = _BIWEEKLY_ANCHOR + timedelta(days=self.week_start)
+            if ((day - anchor).days // 7) % 2:
+                day -= timedelta(days=7)
+        elif mode == "monthly":
+            day = day.replace(day=1)
+        elif mode == "quarterly":
+            day = date(day.year, (day.month - 1) // 3 * 3 + 1, 1)
+        else:
+            raise ValueError(f"Unsupported period mode: {mode}")
+        return self.day_start(day)
 
+    def shift(self, start: datetime, mode: str, steps: int) -> datetime:
+        """``start`` 为某个窗口的起点，返回向后（负数为向前）``steps`` 个窗口的起点。"""
+        day = self.localize(start).date()
+        if mode == "weekly":
+            day += timedelta(days=7 * steps)
+        elif mode == "biweekly":
+            day += timedelta(days=14 * steps)
+        elif mode == "monthly":
+            day = _add_months(day, steps)
+        elif mode == "quarterly":
+            day = _add_months(day, 3 * steps)
+        else:
+            raise ValueError(f"Unsupported period mode: {mode}")
+        return self.day_start(day)
 
-def _start_of_week(now: datetime) -> datetime:
-    return now - timedelta(days=now.weekday(), hours=now.hour, minutes=now.minute, seconds=now.second, microseconds=now.microsecond)
+    def _label(self, mode: str, start: datetime, end: datetime) -> str:
+        if mode == "weekly":
+            return f"{start:%Y-%m-%d} 周"
+        if mode == "monthly":
+            return f"{start:%Y-%m}"
+        if mode == "quarterly":
+            return f"{start.year}Q{(start.month - 1) // 3 + 1}"
+        return f"{start:%m-%d}~{end - timedelta(days=1):%m-%d}"
+
+    def window(self, mode: str, now: datetime | None = None) -> dict[str, Any]:
+        start = self.bucket_start(now or self.now(), mode)
+        return {
+            "mode": mode,
+            "label": _CURRENT_LABELS[mode],
+            "start": start,
+            "end": self.shift(start, mode, 1),
+            "timezone": self.timezone_label,
+        }
+
+    def windows(self, mode: str, count: int, now: datetime | None = None) -> list[dict[str, Any]]:
+        """最近 ``count`` 个连续窗口（按时间升序，最后一个包含 ``now``）。"""
+        last_start = self.bucket_start(now or self.now(), mode)
+        starts = [self.shift(last_start, mode, -offset) for offset in range(count - 1, -1, -1)]
+        ends = [*starts[1:], self.shift(last_start, mode, 1)]
+        return [
+            {
+                "mode": mode,
+                "label": self._label(mode, start, end),
+                "start": start,
+                "end": end,
+                "timezone": self.timezone_label,
+            }
+            for start, end in zip(starts, ends)
+        ]
+
+    def boundaries(self, start: datetime, end: datetime, granularity: str = "day") -> list[datetime]:
+        """覆盖 [start, end) 的逐日 / 逐周 / 逐小时分桶边界（团队时区）：第一个为 ``start`` 所在日 / 周 / 小时的起点，
+        最后一个不早于 ``end``，相邻两个为一个桶。"""
+        if granularity == "day":
+            day = self.localize(start).date()
+            points = [self.day_start(day)]
+            while points[-1] < end:
+                day += timedelta(days=1)
+                points.append(self.day_start(day))
+        elif granularity == "week":
+            points = [self.bucket_start(start, "weekly")]
+            while points[-1] < end:
+                points.append(self.shift(points[-1], "weekly", 1))
+        elif granularity == "hour":
+            points = [self.localize(start).replace(minute=0, second=0, microsecond=0)]
+            while points[-1] < end:
+                # 按绝对时间加一小时（夏令时切换时本地钟点会跳过或重复）
+                points.append(self.localize(points[-1].astimezone(timezone.utc) + timedelta(hours=1)))
+        else:
+            raise ValueError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+        return points
+
+
+class BucketEdges:
+    """一组按时间升序、互不重叠的窗口；``assign`` 返回每个时间点所属窗口的下标（不属于任何窗口为 -1）。"""
+
+    def __init__(self, windows: list[dict[str, Any]]) -> None:
+        self.starts = np.array([window["start"].timestamp() for window in windows], dtype=np.float64)
+        self.ends = np.array([window["end"].timestamp() for window in windows], dtype=np.float64)
+        if np.any(self.starts[1:] < self.ends[:-1]):
+            raise ValueError("Summary windows must be sorted and non-overlapping")
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def assign(self, epochs: np.ndarray) -> np.ndarray:
+        if not len(self.starts):
+            return np.full(len(epochs), -1, dtype=np.int64)
+        index = np.searchsorted(self.starts, epochs, side="right") - 1
+        # NaN（缺失的时间）比较结果为 False，自然落到 -1
+        inside = (index >= 0) & (epochs < self.ends[np.clip(index, 0, None)])
+        return np.where(inside, index, -1)
+
+
+def to_epochs(values: Iterable[str | None]) -> np.ndarray:
+    """ISO 时间字符串 → epoch 秒（缺失或无法解析为 NaN）。"""
+    points = (parse_datetime(value) for value in values)
+    return np.array([point.timestamp() if point else np.nan for point in points], dtype=np.float64)
 
 
 def resolve_period_window(
     mode: str | None,
     start: str | None,
     end: str | None,
-    cards: list[dict[str, Any]] | None = None,
+    sprint: dict[str, Any] | None = None,
+    engine: PeriodEngine | None = None,
+    now: datetime | None = None,
 ) -> dict[str, Any]:
+    """``sprint`` 为 ``SprintStore`` 中的 sprint（当前 sprint 或请求指定的 ``sprint=<id>``）。
+
+    ``now`` 为空时取 ``engine`` 的当前时刻。
+    """
     normalized_mode = (mode or "weekly").strip().lower()
-    now = datetime.now().astimezone()
+    engine = engine or PeriodEngine()
+    now = now or engine.now()
 
     parsed_start = parse_datetime(start)
     parsed_end = parse_datetime(end)
@@ -36,40 +236,70 @@ def resolve_period_window(
             "label": "最近7天",
             "start": now - timedelta(days=7),
             "end": now,
-            "timezone": str(now.tzinfo or "local"),
+            "timezone": engine.timezone_label,
         }
 
     if normalized_mode == "sprint":
-        if cards:
-            points: list[datetime] = []
-            for card in cards:
-                timeline = card.get("timeline", {}) or {}
-                for key in ("created_at", "developer_started_at", "resolved_at"):
-                    point = parse_datetime(timeline.get(key))
-                    if point:
-                        points.append(point)
-            if points:
-                return {
-                    "mode": "sprint",
-                    "label": "当前Sprint",
-                    "start": min(points),
-                    "end": max(points),
-                    "timezone": str((min(points).tzinfo or now.tzinfo or "local")),
-                }
-
+        if sprint is not None:
+            return sprint_window(sprint, now)
+        # 没有 sprint 元数据：按最近 14 天
         return {
             "mode": "sprint",
             "label": "当前Sprint",
-            "start": now - timedelta(days=14),
+            "start": now - timedelta(days=SPRINT_LENGTH_DAYS),
             "end": now,
-            "timezone": str(now.tzinfo or "local"),
+            "timezone": engine.timezone_label,
         }
 
-    start_of_week = _start_of_week(now)
+    if normalized_mode in CALENDAR_MODES:
+        return engine.window(normalized_mode, now)
+    return engine.window("weekly", now)
+
+
+def sprint_window(sprint: dict[str, Any], now: datetime | None = None) -> dict[str, Any]:
+    """sprint 的真实起止时间；未结束的 sprint 若缺少结束时间则截至 ``now``。"""
+    current = now or datetime.now().astimezone()
+    start = parse_datetime(sprint.get("start_date")) or current - timedelta(days=SPRINT_LENGTH_DAYS)
+    end = sprint_end(sprint) or current
     return {
-        "mode": "weekly",
-        "label": "本周",
-        "start": start_of_week,
-        "end": start_of_week + timedelta(days=7),
-        "timezone": str(now.tzinfo or "local"),
+        "mode": "sprint",
+        "label": sprint.get("name") or f"Sprint {sprint.get('id')}",
+        "start": start,
+        "end": end,
+        "timezone": str(start.tzinfo or current.tzinfo or "local"),
+        "sprint_id": sprint.get("id"),
     }
+
+
+def trailing_windows(
+    mode: str | None,
+    count: int,
+    now: datetime | None = None,
+    sprints: list[dict[str, Any]] | None = None,
+    engine: PeriodEngine | None = None,
+) -> list[dict[str, Any]]:
+    """最近 ``count`` 个连续窗口（按时间升序，最后一个包含 ``now``）。
+
+    ``weekly`` / ``biweekly`` / ``monthly`` / ``quarterly`` 为团队时区下的自然窗口；``sprint`` 优先用 ``sprints``
+    （已开始的 sprint，按开始时间升序）的真实起止时间，与前一个 sprint 重叠时保留较晚的；
+    没有 sprint 元数据时退回双周窗口。
+    """
+    normalized_mode = (mode or "weekly").strip().lower()
+    if normalized_mode not in TREND_WINDOW_MODES:
+        raise ValueError(f"window must be one of: {', '.join(TREND_WINDOW_MODES)}")
+    engine = engine or PeriodEngine()
+    current = engine.localize(now) if now is not None else engine.now()
+    if normalized_mode == "sprint" and sprints:
+        selected: list[dict[str, Any]] = []
+        for sprint in sprints:
+            window = sprint_window(sprint, current)
+            if window["start"] >= window["end"]:
+                continue
+            if selected and window["start"] < selected[-1]["end"]:
+                selected[-1] = window
+                continue
+            selected.append(window)
+        return selected[-count:]
+    if normalized_mode == "sprint":
+        return [{**window, "mode": "sprint"} for window in engine.windows("biweekly", count, current)]
+    return engine.windows(normalized_mode, count, current)
@@ -0,0 +1,119 @@
+"""可合并的分位数草图，用于交付周期（lead / cycle time）的 p50 / p85 / p95。
+
+- 样本数不超过 ``exact_limit`` 时保存全部样本，分位数精确（线性插值，与 numpy 默认口径一致）。
+- 超过后转为 KLL 式分层压缩器：第 h 层每个样本代表 2^h 个原始样本，层满时排序后隔一取一推到上一层；
+  内存约为 O(k)，秩误差约 O(1/k)。压缩的取样偏移在奇偶间交替（不用随机数），结果可复现。
+- ``merge`` 把另一个草图并入（逐层拼接后再压缩），因此可以按负责人缓存草图，团队 / 看板汇总时合并而不必重扫卡片。
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Iterable
+
+
+DEFAULT_K = 200
+EXACT_LIMIT = 512
+FLOW_PERCENTILES = (50, 85, 95)
+
+
+class QuantileSketch:
+    __slots__ = ("k", "exact_limit", "count", "total", "minimum", "maximum", "_levels", "_flip")
+
+    def __init__(self, k: int = DEFAULT_K, exact_limit: int = EXACT_LIMIT) -> None:
+        self.k = k
+        self.exact_limit = exact_limit
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self._levels: list[list[float]] = [[]]
+        self._flip = False
+
+    @property
+    def exact(self) -> bool:
+        return self.count <= self.exact_limit
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        self._levels[0].append(value)
+        if not self.exact and len(self._levels[0]) > self._capacity(0):
+            self._compress()
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if not other.count:
+            return self
+        while len(self._levels) < len(other._levels):
+            self._levels.append([])
+        for level, items in enumerate(other._levels):
+            self._levels[level].extend(items)
+        self.count += other.count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        if not self.exact:
+            self._compress()
+        return self
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(8, math.ceil(self.k * (2 / 3) ** depth))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self._levels):
+                    self._levels.append([])
+                items.sort()
+                # 奇数个时最大的一个留在本层，其余成对压缩
+                keep = items[-1:] if len(items) % 2 else []
+                body = items[: len(items) - len(keep)]
+                offset = int(self._flip)
+                self._flip = not self._flip
+                self._levels[level + 1].extend(body[offset::2])
+                self._levels[level] = keep
+            level += 1
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        if self.exact:
+            values = sorted(self._levels[0])
+            position = (len(values) - 1) * q
+            lower = math.floor(position)
+            upper = min(lower + 1, len(values) - 1)
+            return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+        weighted = sorted((value, 1 << level) for level, items in enumerate(self._levels) for value in items)
+        total_weight = sum(weight for _, weight in weighted)
+        target = q * total_weight
+        seen = 0
+        for value, weight in weighted:
+            seen += weight
+            if seen >= target:
+                return min(max(value, self.minimum), self.maximum)
+        return self.maximum
+
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+
+def merge_sketches(sketches: Iterable[QuantileSketch]) -> QuantileSketch:
+    merged = QuantileSketch()
+    for sketch in sketches:
+        merged.merge(sketch)
+    return merged
+
+
+def percentile_fields(prefix: str, sketch: QuantileSketch) -> dict[str, float | None]:
+    """``{prefix}_p50_hours`` 等字段（保留两位小数）；无样本时为 None。"""
+    fields: dict[str, float | None] = {}
+    for percentile in FLOW_PERCENTILES:
+        value = sketch.quantile(percentile / 100)
+        fields[f"{prefix}_p{percentile}_hours"] = round(value, 2) if value is not None else None
+    return fields
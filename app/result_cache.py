@@ -0,0 +1,107 @@
+"""结果缓存：看板指标、周期总结、阶段耗时等计算结果按键记忆，受条数与估算字节数上限约束（LRU）。"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any
+
+import numpy as np
+
+
+_SIZE_SAMPLE = 32
+
+
+def estimate_size(value: Any) -> int:
+    """结果对象的近似内存占用（字节）：递归累加容器、字符串与 numpy 数组，同一对象只计一次。
+
+    长列表只抽样 ``_SIZE_SAMPLE`` 个元素按比例放大，估算耗时与结果规模基本无关。与其他缓存共享的对象
+    （如卡片 dict）也会计入，结果偏大，只用于容量控制。
+    """
+    seen: set[int] = set()
+    total = 0.0
+    stack: list[tuple[Any, float]] = [(value, 1.0)]
+    while stack:
+        item, weight = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        if isinstance(item, np.ndarray):
+            total += weight * (item.nbytes + 112)
+            continue
+        total += weight * sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend((child, weight) for child in item.keys())
+            stack.extend((child, weight) for child in item.values())
+        elif isinstance(item, (list, tuple)):
+            if len(item) > _SIZE_SAMPLE:
+                step = len(item) / _SIZE_SAMPLE
+                stack.extend((item[int(index * step)], weight * step) for index in range(_SIZE_SAMPLE))
+            else:
+                stack.extend((child, weight) for child in item)
+        elif isinstance(item, (set, frozenset)):
+            stack.extend((child, weight) for child in item)
+        elif hasattr(item, "__dict__"):
+            stack.extend((child, weight) for child in vars(item).values())
+        elif hasattr(item, "__slots__"):
+            stack.extend((getattr(item, name), weight) for name in item.__slots__ if hasattr(item, name))
+    return int(total)
+
+
+class SummaryCache:
+    """按 (缓存版本, 配置指纹, 过滤条件, 窗口 ...) 记忆计算结果，超出条数或字节上限时按 LRU 丢弃。
+
+    每条结果写入时估算一次大小（``estimate_size``，或由调用方给出），并累计命中 / 未命中 / 淘汰次数供 ``stats()`` 查看。
+    缓存的结果在多个请求间共享，调用方不要修改。
+    """
+
+    def __init__(self, max_entries: int = 64, max_bytes: int | None = None) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[Any, ...], tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[Any, ...]) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: tuple[Any, ...], value: Any, size: int | None = None) -> None:
+        size = estimate_size(value) if size is None else size
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            # 至少保留刚写入的一条
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self._evictions += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+            }
@@ -0,0 +1,149 @@
+"""Sprint 元数据的本地缓存（``storage/sprint_metadata.json``），用于按 sprint id 直接查出真实起止时间。
+
+两个来源，按 sprint id 合并，Agile API 的数据优先：
+
+- ``boards``：``/rest/agile/1.0/board/{id}/sprint`` 的结果，按 ``agile_settings.sprint_ttl_seconds`` 过期后重新拉取；
+  拉取失败时继续使用过期数据（从未拉取成功时才抛错）。
+- ``observed``：同步 / 归一化时从 issue 的 Sprint 字段解析出的 sprint（Jira Cloud 对象与 Server 字符串都带起止时间），
+  未配置看板时也能解析 sprint 窗口。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from .normalize import parse_datetime, parse_sprint_field
+
+
+SPRINT_METADATA_FILE_NAME = "sprint_metadata.json"
+DEFAULT_SPRINT_TTL_SECONDS = 3600
+
+
+class UnknownSprintError(LookupError):
+    pass
+
+
+def sprint_end(sprint: dict[str, Any]) -> datetime | None:
+    """已完成的 sprint 以实际完成时间为准，否则取计划结束时间。"""
+    return parse_datetime(sprint.get("complete_date")) or parse_datetime(sprint.get("end_date"))
+
+
+def collect_sprints(cards: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """归一化卡片上出现过的 sprint（按 id 去重）。"""
+    seen: dict[int, dict[str, Any]] = {}
+    for card in cards:
+        for sprint in card.get("sprints") or []:
+            if sprint.get("id") is not None:
+                seen[int(sprint["id"])] = sprint
+    return list(seen.values())
+
+
+class SprintStore:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._data: dict[str, Any] | None = None
+        self._index: dict[int, dict[str, Any]] | None = None
+
+    def _load(self) -> dict[str, Any]:
+        if self._data is None:
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+            except (FileNotFoundError, ValueError):
+                data = {}
+            self._data = {"boards": dict(data.get("boards") or {}), "observed": dict(data.get("observed") or {})}
+        return self._data
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(self._data, ensure_ascii=False), encoding="utf-8")
+        os.replace(temp_path, self.path)
+        self._index = None
+
+    def refresh_board(
+        self,
+        board_id: int,
+        fetch: Callable[[int], list[dict[str, Any]]],
+        ttl_seconds: int = DEFAULT_SPRINT_TTL_SECONDS,
+        now: float | None = None,
+    ) -> list[dict[str, Any]]:
+        """``ttl_seconds`` 内直接返回本地数据，过期后调用 ``fetch``（``JiraClient.get_board_sprints``）刷新。
+
+        TTL 由调用方每次按当前配置传入，修改 ``agile_settings.sprint_ttl_seconds`` 后立即生效。
+        """
+        current = time.time() if now is None else now
+        with self._lock:
+            entry = self._load()["boards"].get(str(board_id))
+            if entry is not None and current - float(entry.get("fetched_at") or 0) < ttl_seconds:
+                return list(entry.get("sprints") or [])
+        try:
+            sprints = parse_sprint_field(fetch(board_id))
+        except Exception:
+            if entry is not None:
+                return list(entry.get("sprints") or [])
+            raise
+        for sprint in sprints:
+            sprint["board_id"] = sprint.get("board_id") or int(board_id)
+        with self._lock:
+            self._load()["boards"][str(board_id)] = {"fetched_at": current, "sprints": sprints}
+            self._save()
+        return sprints
+
+    def observe(self, sprints: Iterable[dict[str, Any]]) -> None:
+        """合并从 issue 解析出的 sprint；内容没有变化时不写文件。"""
+        with self._lock:
+            observed = self._load()["observed"]
+            changed = False
+            for sprint in sprints:
+                if sprint.get("id") is None:
+                    continue
+                key = str(sprint["id"])
+                if observed.get(key) != sprint:
+                    observed[key] = dict(sprint)
+                    changed = True
+            if changed:
+                self._save()
+
+    def index(self) -> dict[int, dict[str, Any]]:
+        """sprint id → sprint；看板数据覆盖 issue 中解析出的数据。"""
+        with self._lock:
+            if self._index is None:
+                data = self._load()
+                index = {int(key): sprint for key, sprint in data["observed"].items()}
+                for entry in data["boards"].values():
+                    for sprint in entry.get("sprints") or []:
+                        if sprint.get("id") is not None:
+                            index[int(sprint["id"])] = sprint
+                self._index = index
+            return self._index
+
+    def get(self, sprint_id: int) -> dict[str, Any] | None:
+        return self.index().get(int(sprint_id))
+
+    def recent(self, board_id: int | None = None, now: datetime | None = None) -> list[dict[str, Any]]:
+        """已开始的 sprint，按开始时间升序；指定看板时只取该看板的 sprint。"""
+        current = now or datetime.now().astimezone()
+        started: list[tuple[datetime, dict[str, Any]]] = []
+        for sprint in self.index().values():
+            if board_id is not None and sprint.get("board_id") not in (None, board_id):
+                continue
+            start = parse_datetime(sprint.get("start_date"))
+            if start is not None and start <= current and sprint_end(sprint) is not None:
+                started.append((start, sprint))
+        started.sort(key=lambda row: row[0])
+        return [sprint for _, sprint in started]
+
+    def current(self, board_id: int | None = None, now: datetime | None = None) -> dict[str, Any] | None:
+        """进行中的 sprint（多个时取开始最晚的）；没有进行中的则取最近开始的一个。"""
+        recent = self.recent(board_id=board_id, now=now)
+        active = [sprint for sprint in recent if sprint.get("state") == "active"]
+        if active:
+            return active[-1]
+        return recent[-1] if recent else None
@@ -0,0 +1,71 @@
+"""同步前的新鲜度探测与增量合并：大多数点击「从JIRA更新」时数据并未变化，无需全量下载。"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any
+
+from .normalize import parse_datetime
+
+
+SYNC_FULL = "full"
+SYNC_DELTA = "delta"
+SYNC_SKIPPED_FRESH = "skipped: fresh"
+
+# JQL 的 updated 比较只精确到分钟，且按 Jira 用户时区解释；向前多取一天以吸收时区差异
+DELTA_OVERLAP = timedelta(days=1)
+
+
+def _max_updated(issues: list[dict[str, Any]]) -> str | None:
+    latest_raw: str | None = None
+    latest_at: datetime | None = None
+    for issue in issues:
+        raw = (issue.get("fields") or {}).get("updated")
+        point = parse_datetime(raw)
+        if point and (latest_at is None or point > latest_at):
+            latest_at = point
+            latest_raw = raw
+    return latest_raw
+
+
+def summarize_cached_issues(payload: dict[str, Any]) -> dict[str, Any]:
+    """缓存侧的新鲜度指纹：issue 数 + 最大 updated（写缓存时已记录则直接使用）。"""
+    issues = payload.get("issues") or []
+    max_updated = payload.get("max_updated") or _max_updated(issues)
+    return {"issue_count": len(issues), "max_updated": max_updated}
+
+
+def summarize_cache_header(header: dict[str, Any]) -> dict[str, Any] | None:
+    """只读缓存头部得到新鲜度指纹；旧缓存头部缺少 issue_count / max_updated 时返回 None。"""
+    if "issue_count" not in header or "max_updated" not in header:
+        return None
+    return {"issue_count": int(header["issue_count"] or 0), "max_updated": header["max_updated"]}
+
+
+def is_fresh(probe: dict[str, Any], cached: dict[str, Any]) -> bool:
+    """探测结果与缓存指纹一致（总数相同且最近更新时间未变）即视为无需同步。"""
+    if int(probe.get("total", -1)) != int(cached.get("issue_count", -2)):
+        return False
+    probe_at = parse_datetime(probe.get("max_updated"))
+    cached_at = parse_datetime(cached.get("max_updated"))
+    if probe_at is None or cached_at is None:
+        return probe.get("max_updated") is None and cached.get("max_updated") is None
+    return probe_at == cached_at
+
+
+def delta_since(max_updated: str | None) -> datetime | None:
+    point = parse_datetime(max_updated)
+    if point is None:
+        return None
+    return point - DELTA_OVERLAP
+
+
+def merge_issues(cached: list[dict[str, Any]], changed: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """按 key 用增量结果覆盖旧 issue；新出现的 key 追加在末尾，保持原有顺序。"""
+    changed_by_key = {issue.get("key"): issue for issue in changed}
+    merged: list[dict[str, Any]] = []
+    for issue in cached:
+        key = issue.get("key")
+        merged.append(changed_by_key.pop(key, issue))
+    merged.extend(changed_by_key.values())
+    return merged
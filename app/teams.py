@@ -0,0 +1,82 @@
+"""团队归属：由配置 ``teams``（id / name / owner / members）推导成员 → 团队的查找表。"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+
+def build_member_team_index(teams: list[dict[str, Any]] | None) -> dict[str, list[str]]:
+    """成员名（含团队 owner，小写）→ 所属团队 id 列表；同一人可属于多个团队。"""
+    index: dict[str, list[str]] = {}
+    for team in teams or []:
+        team_id = str(team.get("id") or team.get("name") or "").strip()
+        if not team_id:
+            continue
+        names = [*(team.get("members") or []), team.get("owner") or ""]
+        for name in names:
+            normalized = str(name).strip().lower()
+            if not normalized:
+                continue
+            bucket = index.setdefault(normalized, [])
+            if team_id not in bucket:
+                bucket.append(team_id)
+    return index
+
+
+def teams_of(owner: str | None, index: dict[str, list[str]]) -> list[str]:
+    return index.get((owner or "").strip().lower(), [])
+
+
+NO_TEAM_LANE = "No Team"
+
+
+class UnknownTeamError(LookupError):
+    pass
+
+
+class TeamDirectory:
+    """配置 ``teams`` 的查找结构：团队元数据 + 成员 → 团队索引。
+
+    只依赖配置内容，调用方按配置指纹缓存一份；团队汇总通过 ``group_owners`` 把负责人映射到团队后
+    合并各负责人的聚合结果，不重扫卡片。
+    """
+
+    def __init__(self, teams: list[dict[str, Any]] | None = None) -> None:
+        self.teams: list[dict[str, Any]] = []
+        for team in teams or []:
+            team_id = str(team.get("id") or team.get("name") or "").strip()
+            if team_id and team_id not in self:
+                self.teams.append({"id": team_id, "name": team.get("name") or team_id, "owner": team.get("owner") or ""})
+        self.index = build_member_team_index(teams)
+
+    def __contains__(self, team_id: object) -> bool:
+        return any(team["id"] == team_id for team in self.teams)
+
+    def __bool__(self) -> bool:
+        return bool(self.teams)
+
+    def name_of(self, team_id: str) -> str:
+        return next((team["name"] for team in self.teams if team["id"] == team_id), team_id)
+
+    def teams_of(self, owner: str | None) -> list[str]:
+        return teams_of(owner, self.index)
+
+    def group_owners(self, owners: Iterable[str]) -> dict[str, list[str]]:
+        """团队 id → 属于该团队的负责人（按配置中的团队顺序，未出现的团队为空列表）。"""
+        groups: dict[str, list[str]] = {team["id"]: [] for team in self.teams}
+        for owner in owners:
+            for team_id in self.teams_of(owner):
+                groups[team_id].append(owner)
+        return groups
+
+    def index_cards(self, cards: list[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+        """团队 id → 负责人属于该团队的卡片（保持原顺序），供 ``team=`` 过滤直接取用。"""
+        by_team: dict[str, list[dict[str, Any]]] = {team["id"]: [] for team in self.teams}
+        for card in cards:
+            for team_id in self.teams_of(card_owner(card)):
+                by_team[team_id].append(card)
+        return by_team
+
+
+def card_owner(card: dict[str, Any]) -> str:
+    return str(card.get("metric_owner") or card.get("assignee") or "Unassigned")
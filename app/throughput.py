@@ -0,0 +1,186 @@
+"""吞吐量 / 到达量 / 燃起图（burn-up）的预聚合计数。
+
+每个缓存维护按负责人的「团队时区自然日 → 数量」计数（创建、解决各一份），以及每个 issue 当前的贡献
+``(负责人, 创建日, 解决日)``。增量同步只改动了少数 issue 时，``apply`` 对这些 issue 先减去旧贡献再加上新贡献，
+其余计数不动；看板整体与团队的序列在读取时由负责人计数合并得到（与 ``compute_team_metrics`` 同一思路）。
+
+计数与（缓存版本, 配置指纹）绑定，由 ``ThroughputStore`` 在内存中保存：同步时从旧版本推进到新版本，
+找不到可推进的计数（首次读取、全量同步、进程重启）时按整份缓存重建一次。
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Iterable
+
+import numpy as np
+
+from .normalize import parse_datetime
+from .period import PeriodEngine
+from .teams import TeamDirectory, card_owner
+
+
+THROUGHPUT_BUCKETS = ("day", "week")
+THROUGHPUT_MAX_BUCKETS = 730
+
+
+class ThroughputCounters:
+    def __init__(self, engine: PeriodEngine) -> None:
+        self.engine = engine
+        self._contributions: dict[str, tuple[str, int | None, int | None]] = {}
+        self._created: dict[str, Counter[int]] = {}
+        self._resolved: dict[str, Counter[int]] = {}
+        # 同步线程推进计数时，读取方可能正在合并同一份计数
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, cards: Iterable[dict[str, Any]], engine: PeriodEngine) -> "ThroughputCounters":
+        counters = cls(engine)
+        counters.apply(cards)
+        return counters
+
+    def _day(self, value: str | None) -> int | None:
+        point = parse_datetime(value)
+        return self.engine.localize(point).date().toordinal() if point else None
+
+    def _contribution(self, card: dict[str, Any]) -> tuple[str, int | None, int | None]:
+        timeline = card.get("timeline") or {}
+        return card_owner(card), self._day(timeline.get("created_at")), self._day(timeline.get("resolved_at"))
+
+    def _add(self, contribution: tuple[str, int | None, int | None], sign: int) -> None:
+        owner, created, resolved = contribution
+        for counters, day in ((self._created, created), (self._resolved, resolved)):
+            if day is None:
+                continue
+            counter = counters.setdefault(owner, Counter())
+            counter[day] += sign
+            if not counter[day]:
+                del counter[day]
+                if not counter:
+                    del counters[owner]
+
+    def apply(self, cards: Iterable[dict[str, Any]], removed_keys: Iterable[str] = ()) -> int:
+        """按卡片的最新内容更新计数，返回贡献发生变化的 issue 数。"""
+        with self._lock:
+            return self._apply(cards, removed_keys)
+
+    def _apply(self, cards: Iterable[dict[str, Any]], removed_keys: Iterable[str]) -> int:
+        changed = 0
+        for key in removed_keys:
+            previous = self._contributions.pop(key, None)
+            if previous is not None:
+                self._add(previous, -1)
+                changed += 1
+        for card in cards:
+            contribution = self._contribution(card)
+            previous = self._contributions.get(card["key"])
+            if previous == contribution:
+                continue
+            if previous is not None:
+                self._add(previous, -1)
+            self._add(contribution, 1)
+            self._contributions[card["key"]] = contribution
+            changed += 1
+        return changed
+
+    def owners(self) -> list[str]:
+        with self._lock:
+            return sorted(set(self._created) | set(self._resolved))
+
+    def _merged(self, counters: dict[str, Counter[int]], owners: Iterable[str]) -> tuple[np.ndarray, np.ndarray]:
+        merged: Counter[int] = Counter()
+        for owner in owners:
+            merged.update(counters.get(owner) or {})
+        days = np.array(sorted(merged), dtype=np.int64)
+        return days, np.array([merged[day] for day in days.tolist()], dtype=np.int64)
+
+    def series(self, edges: np.ndarray, owners: Iterable[str] | None = None) -> dict[str, list[int]]:
+        """``edges`` 为分桶边界的日序号（相邻两个为一个桶）；``owners`` 为空时取全部负责人。
+
+        返回每个桶的到达量 / 吞吐量，以及桶结束时累计的范围（全部已创建）与完成（全部已解决）——即燃起图。
+        """
+        selected = list(owners) if owners is not None else self.owners()
+        result: dict[str, list[int]] = {}
+        for name, counters in (("arrivals", self._created), ("throughput", self._resolved)):
+            with self._lock:
+                days, counts = self._merged(counters, selected)
+            bucket = np.searchsorted(edges, days, side="right") - 1
+            inside = (bucket >= 0) & (bucket < len(edges) - 1)
+            per_bucket = np.bincount(bucket[inside], weights=counts[inside], minlength=len(edges) - 1)
+            before = int(counts[days < edges[0]].sum())
+            result[name] = per_bucket.astype(np.int64).tolist()
+            result[f"{name}_cumulative"] = (before + np.cumsum(per_bucket)).astype(np.int64).tolist()
+        return {
+            "arrivals": result["arrivals"],
+            "throughput": result["throughput"],
+            "burnup_scope": result["arrivals_cumulative"],
+            "burnup_done": result["throughput_cumulative"],
+        }
+
+
+def build_throughput_report(
+    counters: ThroughputCounters,
+    window: dict[str, Any],
+    bucket: str = "week",
+    teams: TeamDirectory | None = None,
+) -> dict[str, Any]:
+    if bucket not in THROUGHPUT_BUCKETS:
+        raise ValueError(f"bucket must be one of: {', '.join(THROUGHPUT_BUCKETS)}")
+    boundaries: list[datetime] = counters.engine.boundaries(window["start"], window["end"], bucket)
+    if len(boundaries) - 1 > THROUGHPUT_MAX_BUCKETS:
+        raise ValueError(f"Throughput window is limited to {THROUGHPUT_MAX_BUCKETS} buckets")
+    edges = np.array([point.date().toordinal() for point in boundaries], dtype=np.int64)
+
+    owners = counters.owners()
+    team_rows = []
+    for team_id, members in (teams.group_owners(owners) if teams else {}).items():
+        team_rows.append({"team": team_id, "name": teams.name_of(team_id), **counters.series(edges, members)})
+    return {
+        "bucket": bucket,
+        "buckets": [point.isoformat() for point in boundaries[:-1]],
+        "board": counters.series(edges),
+        "owners": [{"owner": owner, **counters.series(edges, [owner])} for owner in owners],
+        "teams": team_rows,
+    }
+
+
+class ThroughputStore:
+    """cache_id → (缓存版本, 配置指纹, 计数)。"""
+
+    def __init__(self, max_entries: int = 8) -> None:
+        self.max_entries = max_entries
+        self._entries: dict[str, tuple[str, str, ThroughputCounters]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, cache_id: str, version: str, fingerprint: str) -> ThroughputCounters | None:
+        with self._lock:
+            entry = self._entries.get(cache_id)
+        if entry and entry[0] == version and entry[1] == fingerprint:
+            return entry[2]
+        return None
+
+    def put(self, cache_id: str, version: str, fingerprint: str, counters: ThroughputCounters) -> None:
+        with self._lock:
+            self._entries.pop(cache_id, None)
+            self._entries[cache_id] = (version, fingerprint, counters)
+            while len(self._entries) > self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+
+    def advance(
+        self,
+        cache_id: str,
+        from_version: str,
+        to_version: str,
+        fingerprint: str,
+        changed_cards: Iterable[dict[str, Any]],
+    ) -> bool:
+        """增量同步：计数仍对应 ``from_version`` 时只更新变化的 issue 并推进到 ``to_version``；否则丢弃。"""
+        with self._lock:
+            entry = self._entries.pop(cache_id, None)
+            if entry is None or entry[0] != from_version or entry[1] != fingerprint:
+                return False
+            entry[2].apply(changed_cards)
+            self._entries[cache_id] = (to_version, fingerprint, entry[2])
+            return True
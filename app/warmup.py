@@ -0,0 +1,110 @@
+"""归一化卡片的内存缓存与启动预热。
+
+- ``NormalizedCardCache``：按 ``(cache_id, 缓存版本, 配置指纹)`` 缓存整份归一化后的卡片（过滤前），
+  重新同步或修改配置后自然失效；超出容量按 LRU 丢弃。
+- ``CacheWarmer``：``create_app`` 启动后在后台线程里预先解析并归一化最近的 K 个缓存和 ``jql_filters``
+  默认查询缓存，第一位打开看板的用户无需承担冷读取；进度由 ``/api/ready`` 报告。
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+
+class NormalizedCardCache:
+    def __init__(self, max_entries: int = 8) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str, str], list[dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[str, str, str]) -> list[dict[str, Any]] | None:
+        with self._lock:
+            cards = self._entries.get(key)
+            if cards is not None:
+                self._entries.move_to_end(key)
+            return cards
+
+    def put(self, key: tuple[str, str, str], cards: list[dict[str, Any]]) -> None:
+        with self._lock:
+            # 同一缓存的旧版本 / 旧配置不再有用
+            for stale in [existing for existing in self._entries if existing[0] == key[0] and existing != key]:
+                del self._entries[stale]
+            self._entries[key] = cards
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def cache_ids(self) -> list[str]:
+        with self._lock:
+            return [key[0] for key in self._entries]
+
+
+def select_warmup_targets(entries: list[dict[str, Any]], latest: int, pinned_ids: set[str]) -> list[str]:
+    """固定保留的默认查询缓存在前，其后是最近同步的 ``latest`` 个缓存（去重）。"""
+    ordered = sorted(entries, key=lambda entry: entry.get("updated_at") or 0, reverse=True)
+    known = {entry["id"] for entry in entries}
+    targets = [cache_id for cache_id in sorted(pinned_ids) if cache_id in known]
+    for entry in ordered[: max(latest, 0)]:
+        if entry["id"] not in targets:
+            targets.append(entry["id"])
+    return targets
+
+
+class CacheWarmer:
+    """后台预热；``load`` 为看板读取缓存时使用的同一个函数（结果进入 ``NormalizedCardCache``）。"""
+
+    def __init__(self, load: Callable[[str], Any], targets: Callable[[], list[str]]) -> None:
+        self._load = load
+        self._targets = targets
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._progress: dict[str, Any] = {
+            "state": "disabled",
+            "total": 0,
+            "completed": 0,
+            "cache_ids": [],
+            "errors": [],
+            "started_at": None,
+            "finished_at": None,
+        }
+
+    def progress(self) -> dict[str, Any]:
+        with self._lock:
+            return {**self._progress, "cache_ids": list(self._progress["cache_ids"]), "errors": list(self._progress["errors"])}
+
+    @property
+    def ready(self) -> bool:
+        return self.progress()["state"] in {"disabled", "done"}
+
+    def _update(self, **changes: Any) -> None:
+        with self._lock:
+            self._progress.update(changes)
+
+    def run(self) -> None:
+        self._update(state="running", started_at=time.time())
+        try:
+            targets = self._targets()
+        except Exception as error:  # 列举缓存失败不影响服务，按未预热处理
+            self._update(state="done", errors=[str(error)], finished_at=time.time())
+            return
+        self._update(total=len(targets), cache_ids=targets)
+        errors: list[str] = []
+        for position, cache_id in enumerate(targets, start=1):
+            try:
+                self._load(cache_id)
+            except Exception as error:  # 单个缓存损坏或被删除：记录后继续
+                errors.append(f"{cache_id[:12]}: {error}")
+            self._update(completed=position, errors=list(errors))
+        self._update(state="done", finished_at=time.time())
+
+    def start(self) -> None:
+        self._update(state="pending")
+        self._thread = threading.Thread(target=self.run, name="cache-warmup", daemon=True)
+        self._thread.start()
+
+    def join(self, timeout: float | None = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,176 @@
+"""工作日历（``working_calendar``）：工作日、每日工作时段、法定节假日与调休补班日。
+
+两个时刻之间的工作时长按「工作时间坐标」相减得到：坐标 = 基准日至当日零点的累计工作秒数（按日预计算的前缀和数组）
++ 当日零点至该时刻落在工作时段内的秒数。前缀数组按需向两端扩展（每次至少一年），之后任意两点的工作时长都是 O(1) 查表，
+不再逐日循环；成批时刻（阶段耗时矩阵）用 numpy 一次换算。时段按团队时区（``period_settings.timezone``）的当地时间计。
+"""
+
+from __future__ import annotations
+
+import threading
+from datetime import date, datetime, timedelta, tzinfo
+from typing import Any, Iterable
+
+import numpy as np
+
+from .period import parse_week_start, resolve_timezone
+
+
+TIME_BASES = ("wall", "business")
+DEFAULT_WORKDAYS = (0, 1, 2, 3, 4)
+DEFAULT_WORKING_HOURS = ("09:00-18:00",)
+_EXTEND_DAYS = 366
+
+
+def parse_time_basis(raw: Any) -> str:
+    """时长口径：``wall``（自然时间，默认）或 ``business``（按工作日历）。"""
+    text = str(raw or "wall").strip().lower()
+    if text not in TIME_BASES:
+        raise ValueError(f"time_basis must be one of: {', '.join(TIME_BASES)}")
+    return text
+
+
+def _clock_seconds(text: str, raw: Any) -> int:
+    hours, _, minutes = text.strip().partition(":")
+    if not hours.isdigit() or not minutes.isdigit() or int(minutes) >= 60 or int(hours) * 60 + int(minutes) > 24 * 60:
+        raise ValueError(f"Invalid working_calendar.hours: {raw}")
+    return int(hours) * 3600 + int(minutes) * 60
+
+
+def parse_working_hours(raw: Any) -> list[tuple[int, int]]:
+    """``["09:00-12:00", "13:30-18:30"]`` → 当日零点起的秒数区间（升序、不重叠）；空值为 09:00-18:00。"""
+    items = raw if isinstance(raw, (list, tuple)) else [raw] if raw else []
+    spans: list[tuple[int, int]] = []
+    for item in items or DEFAULT_WORKING_HOURS:
+        start, separator, end = str(item).partition("-")
+        if not separator:
+            raise ValueError(f"Invalid working_calendar.hours: {item}")
+        span = (_clock_seconds(start, item), _clock_seconds(end, item))
+        if span[0] >= span[1]:
+            raise ValueError(f"Invalid working_calendar.hours: {item}")
+        spans.append(span)
+    spans.sort()
+    for previous, current in zip(spans, spans[1:]):
+        if current[0] < previous[1]:
+            raise ValueError("working_calendar.hours must not overlap")
+    return spans
+
+
+def parse_workdays(raw: Any) -> list[int]:
+    """``monday``..``sunday`` 或 0..6（0 为周一）；空值为周一至周五。"""
+    if raw is None or raw == []:
+        return list(DEFAULT_WORKDAYS)
+    items = raw if isinstance(raw, (list, tuple)) else [raw]
+    try:
+        return sorted({parse_week_start(item) for item in items})
+    except ValueError as exc:
+        raise ValueError(f"Invalid working_calendar.workdays: {raw}") from exc
+
+
+def parse_date_list(raw: Any, key: str) -> list[str]:
+    """日期列表，支持 ``2026-10-01..2026-10-08`` 闭区间；返回去重排序后的 ISO 日期。"""
+    days: set[date] = set()
+    for item in raw or []:
+        first, _, last = str(item).strip().partition("..")
+        try:
+            start = date.fromisoformat(first.strip())
+            end = date.fromisoformat(last.strip()) if last else start
+        except ValueError as exc:
+            raise ValueError(f"Invalid working_calendar.{key}: {item}") from exc
+        if end < start:
+            raise ValueError(f"Invalid working_calendar.{key}: {item}")
+        days.update(start + timedelta(days=offset) for offset in range((end - start).days + 1))
+    return [day.isoformat() for day in sorted(days)]
+
+
+def parse_working_calendar(raw: dict[str, Any] | None) -> dict[str, Any]:
+    """配置 ``working_calendar`` 规范化（``load_config`` 调用），非法值抛 ValueError。"""
+    raw = raw or {}
+    return {
+        "workdays": parse_workdays(raw.get("workdays")),
+        "hours": [f"{start // 3600:02d}:{start % 3600 // 60:02d}-{end // 3600:02d}:{end % 3600 // 60:02d}"
+                  for start, end in parse_working_hours(raw.get("hours"))],
+        "holidays": parse_date_list(raw.get("holidays"), "holidays"),
+        "makeup_workdays": parse_date_list(raw.get("makeup_workdays"), "makeup_workdays"),
+    }
+
+
+class WorkingCalendar:
+    def __init__(
+        self,
+        workdays: Iterable[int] = DEFAULT_WORKDAYS,
+        hours: Iterable[str] = DEFAULT_WORKING_HOURS,
+        holidays: Iterable[str] = (),
+        makeup_workdays: Iterable[str] = (),
+        timezone: str | None = None,
+    ) -> None:
+        self.workdays = frozenset(workdays)
+        self.spans = parse_working_hours(list(hours))
+        self.holidays = frozenset(date.fromisoformat(day).toordinal() for day in holidays)
+        self.makeup_workdays = frozenset(date.fromisoformat(day).toordinal() for day in makeup_workdays)
+        self.tz: tzinfo | None = resolve_timezone(timezone)
+        self.seconds_per_day = sum(end - start for start, end in self.spans)
+        self._span_starts = np.array([start for start, _ in self.spans], dtype=np.float64)
+        self._span_lengths = np.array([end - start for start, end in self.spans], dtype=np.float64)
+        self._lock = threading.Lock()
+        self._base = 0
+        # _prefix[i]：基准日至第 base+i 天零点的累计工作秒数；_working[i]：第 base+i 天是否上班
+        self._prefix = np.zeros(1, dtype=np.float64)
+        self._working = np.zeros(0, dtype=bool)
+
+    @classmethod
+    def from_settings(cls, settings: dict[str, Any] | None, timezone: str | None = None) -> "WorkingCalendar":
+        normalized = parse_working_calendar(settings)
+        return cls(
+            workdays=normalized["workdays"],
+            hours=normalized["hours"],
+            holidays=normalized["holidays"],
+            makeup_workdays=normalized["makeup_workdays"],
+            timezone=timezone,
+        )
+
+    def is_workday(self, ordinal: int) -> bool:
+        if ordinal in self.makeup_workdays:
+            return True
+        return ordinal not in self.holidays and date.fromordinal(ordinal).weekday() in self.workdays
+
+    def _ensure(self, first: int, last: int) -> tuple[int, np.ndarray, np.ndarray]:
+        """保证前缀数组覆盖 [first, last] 天，返回 (基准日, 前缀和, 是否上班)。"""
+        with self._lock:
+            size = len(self._working)
+            if size and self._base <= first and last < self._base + size:
+                return self._base, self._prefix, self._working
+            start = min(first, self._base) if size else first
+            end = max(last, self._base + size - 1) if size else last
+            start -= _EXTEND_DAYS
+            end += _EXTEND_DAYS
+            working = np.array([self.is_workday(ordinal) for ordinal in range(start, end + 1)], dtype=bool)
+            prefix = np.concatenate(([0.0], np.cumsum(working * float(self.seconds_per_day))))
+            self._base, self._prefix, self._working = start, prefix, working
+            return start, prefix, working
+
+    def _local_parts(self, epochs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """epoch 秒 → (当地日序号, 当地零点起的秒数)；NaN 对应位置为 0。"""
+        ordinals = np.zeros(len(epochs), dtype=np.int64)
+        clock = np.zeros(len(epochs), dtype=np.float64)
+        for position, value in enumerate(epochs.tolist()):
+            if value != value:
+                continue
+            local = datetime.fromtimestamp(value, self.tz) if self.tz is not None else datetime.fromtimestamp(value)
+            ordinals[position] = local.toordinal()
+            clock[position] = local.hour * 3600 + local.minute * 60 + local.second + local.microsecond / 1e6
+        return ordinals, clock
+
+    def positions(self, epochs: np.ndarray) -> np.ndarray:
+        """epoch 秒 → 工作时间坐标（秒）；两点坐标之差即其间的工作时长。NaN 保持 NaN。"""
+        epochs = np.asarray(epochs, dtype=np.float64)
+        result = np.full(epochs.shape, np.nan)
+        present = ~np.isnan(epochs)
+        if not present.any():
+            return result
+        ordinals, clock = self._local_parts(epochs[present])
+        base, prefix, working = self._ensure(int(ordinals.min()), int(ordinals.max()))
+        offset = ordinals - base
+        within_day = np.clip(clock[:, None] - self._span_starts, 0, self._span_lengths).sum(axis=1)
+        result[present] = prefix[offset] + np.where(working[offset], within_day, 0.0)
+        return result
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+缓存编码基准：在合成的 5k issue 缓存上比较各编码的文件大小、写入与加载耗时。
+
+用法（在 Kanban 项目根目录）:
+  .\\.venv\\Scripts\\python.exe scripts\\benchmark_cache_codecs.py
+  .\\.venv\\Scripts\\python.exe scripts\\benchmark_cache_codecs.py --issues 20000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app import cache_codec
+from app.cache_codec import CACHE_CODECS, decode_payload, encode_payload, resolve_codec
+
+_STATUSES = ["Open", "开发中", "审核中", "已解决", "已关闭"]
+_PEOPLE = [("xieyi", "谢屹"), ("chenxing", "陈兴"), ("humeng", "胡梦"), ("zhangruiyan", "张锐岩")]
+
+
+def _user(login: str, display: str) -> dict:
+    return {
+        "self": f"https://jira.example.com/rest/api/2/user?username={login}",
+        "name": login,
+        "key": login,
+        "displayName": display,
+        "emailAddress": f"{login}@example.com",
+        "avatarUrls": {size: f"https://jira.example.com/secure/useravatar?size={size}&owner={login}" for size in ("48x48", "24x24", "16x16", "32x32")},
+        "active": True,
+        "timeZone": "Asia/Shanghai",
+    }
+
+
+def synthetic_payload(issue_count: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    base = datetime(2026, 1, 1, tzinfo=timezone(timedelta(hours=8)))
+    issues = []
+    for index in range(issue_count):
+        created = base + timedelta(minutes=rng.randint(0, 60 * 24 * 60))
+        histories = []
+        point = created
+        for history_index in range(rng.randint(3, 12)):
+            point += timedelta(hours=rng.randint(1, 48))
+            login, display = rng.choice(_PEOPLE)
+            field = rng.choice(["status", "assignee", "Sprint", "description", "Rank"])
+            histories.append(
+                {
+                    "id": str(index * 100 + history_index),
+                    "author": _user(login, display),
+                    "created": point.strftime("%Y-%m-%dT%H:%M:%S.000+0800"),
+                    "items": [
+                        {
+                            "field": field,
+                            "fieldtype": "jira",
+                            "from": None,
+                            "fromString": rng.choice(_STATUSES),
+                            "to": login,
+                            "toString": rng.choice(_STATUSES) if field == "status" else display,
+                        }
+                    ],
+                }
+            )
+        login, display = rng.choice(_PEOPLE)
+        issues.append(
+            {
+                "expand": "operations,versionedRepresentations,editmeta,changelog,renderedFields",
+                "id": str(100000 + index),
+                "self": f"https://jira.example.com/rest/api/2/issue/{100000 + index}",
+                "key": f"ZWCAD-{40000 + index}",
+                "fields": {
+                    "summary": f"问题 {index}：打开图纸后执行命令，软件崩溃 #{rng.randint(1, 9999)}",
+                    "status": {"name": rng.choice(_STATUSES), "self": "https://jira.example.com/rest/api/2/status/1", "iconUrl": "https://jira.example.com/images/icons/statuses/open.png"},
+                    "priority": {"name": rng.choice(["High", "Medium", "Low"]), "iconUrl": "https://jira.example.com/images/icons/priorities/major.svg"},
+                    "issuetype": {"name": "Bug", "subtask": False, "iconUrl": "https://jira.example.com/images/icons/issuetypes/bug.png"},
+                    "assignee": _user(login, display),
+                    "created": created.strftime("%Y-%m-%dT%H:%M:%S.000+0800"),
+                    "updated": point.strftime("%Y-%m-%dT%H:%M:%S.000+0800"),
+                    "resolutiondate": None,
+                    "description": "复现步骤：\n1. 打开图纸\n2. 执行命令\n" * rng.randint(1, 4),
+                },
+                "changelog": {"startAt": 0, "maxResults": len(histories), "total": len(histories), "histories": histories},
+            }
+        )
+    return {"custom_jql": "", "jql_preview": "(project = ZWCAD)", "issue_count": len(issues), "issues": issues}
+
+
+def _best_of(repeat: int, func) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark cache codecs on a synthetic Jira cache.")
+    parser.add_argument("--issues", type=int, default=5000, help="Number of synthetic issues (default: 5000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions; best run is reported")
+    args = parser.parse_args()
+
+    payload = synthetic_payload(args.issues)
+    parser_name = "orjson" if cache_codec.orjson is not None else "json (stdlib)"
+    print(f"issues={args.issues}  parser={parser_name}")
+    print(f"{'codec':<8}{'size (MB)':>12}{'ratio':>8}{'write (ms)':>12}{'load (ms)':>12}")
+
+    baseline_size = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in CACHE_CODECS:
+            codec = resolve_codec(name)
+            if codec != name:
+                print(f"{name:<8}{'(unavailable, falls back to ' + codec + ')':>44}")
+                continue
+            path = Path(tmp) / f"cache.{name}"
+            write_s = _best_of(args.repeat, lambda: path.write_bytes(encode_payload(payload, codec)))
+            load_s = _best_of(args.repeat, lambda: decode_payload(path.read_bytes()))
+            size = path.stat().st_size
+            baseline_size = baseline_size or size
+            print(f"{name:<8}{size / 1e6:>12.2f}{baseline_size / size:>7.1f}x{write_s * 1000:>12.1f}{load_s * 1000:>12.1f}")
+
+        if cache_codec.orjson is not None:
+            path = Path(tmp) / "cache.stdlib"
+            path.write_bytes(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+            load_s = _best_of(args.repeat, lambda: json.loads(path.read_text(encoding="utf-8")))
+            print(f"{'stdlib':<8}{path.stat().st_size / 1e6:>12.2f}{'':>8}{'':>12}{load_s * 1000:>12.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
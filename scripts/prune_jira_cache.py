@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+按 cache_settings.retention 清理本地 Jira 查询缓存（LRU；jql_filters 默认查询缓存固定保留）。
+
+用法（在 Kanban 项目根目录）:
+  .\\.venv\\Scripts\\python.exe scripts\\prune_jira_cache.py --dry-run
+  .\\.venv\\Scripts\\python.exe scripts\\prune_jira_cache.py
+  .\\.venv\\Scripts\\python.exe scripts\\prune_jira_cache.py --max-age-days 30 --max-per-jql 1 --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.cache_diff import REVISIONS_DIR_NAME, RevisionStore
+from app.cache_retention import enforce_retention
+from app.cache_store import open_cache_store
+from app.config import load_config
+from app.jira_client import JiraClient, JiraClientError, JiraConfig
+
+
+def _pinned_previews(cfg: dict) -> set[str]:
+    client = JiraClient(
+        JiraConfig(
+            base_url=cfg["base_url"],
+            username=cfg["username"],
+            password=cfg["password"],
+            jql_filters=cfg.get("jql_filters", []),
+        )
+    )
+    try:
+        return {client.build_search_jql(None)}
+    except JiraClientError:
+        return set()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Evict old Jira query caches according to the retention policy.")
+    parser.add_argument(
+        "--config",
+        type=str,
+        default=None,
+        help="Path to jira_auth.yaml (default: config/jira_auth.yaml next to app)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Only print what would be evicted")
+    parser.add_argument("--max-total-bytes", type=int, default=None, help="Override retention.max_total_bytes")
+    parser.add_argument("--max-age-days", type=float, default=None, help="Override retention.max_age_days")
+    parser.add_argument("--max-per-jql", type=int, default=None, help="Override retention.max_per_jql")
+    args = parser.parse_args()
+
+    cfg = load_config(args.config)
+    retention = dict(cfg["cache_settings"]["retention"])
+    for key in ("max_total_bytes", "max_age_days", "max_per_jql"):
+        override = getattr(args, key)
+        if override is not None:
+            retention[key] = override or None
+
+    store = open_cache_store(cfg.get("cache_settings"), ROOT / "storage")
+    plan = enforce_retention(store, retention, pinned_previews=_pinned_previews(cfg), dry_run=args.dry_run)
+    if not args.dry_run:
+        revisions = RevisionStore(ROOT / "storage" / REVISIONS_DIR_NAME)
+        for entry in plan:
+            revisions.delete(entry["id"])
+
+    action = "would evict" if args.dry_run else "evicted"
+    total_bytes = sum(int(entry.get("size_bytes") or 0) for entry in plan)
+    for entry in plan:
+        accessed = datetime.fromtimestamp(entry["last_accessed_at"]).isoformat(timespec="seconds")
+        print(
+            f"{action}\t{entry['id'][:12]}\t{entry['reason']}\t{entry.get('size_bytes', 0)} B"
+            f"\tlast_access={accessed}\t{entry['jql_preview']}"
+        )
+    print(f"{action} {len(plan)} cache(s), {total_bytes} bytes", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
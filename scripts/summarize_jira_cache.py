@@ -20,20 +20,11 @@ ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from app.cache_store import is_cache_id, open_cache_store
+from app.cache_stream import iter_issues, read_header
 from app.cache_summary import build_summary_payload, format_text_report
 from app.config import load_config, normalize_task_owner_field_id
-from app.normalize import normalize_issue
-
-
-def _latest_cache_file(cache_dir: Path) -> Path | None:
-    files = [p for p in cache_dir.glob("*.json") if p.is_file()]
-    if not files:
-        return None
-    return max(files, key=lambda p: p.stat().st_mtime)
-
-
-def _load_payload(path: Path) -> dict:
-    return json.loads(path.read_text(encoding="utf-8"))
+from app.normalize import iter_normalized_cards
 
 
 def main() -> int:
@@ -61,49 +52,51 @@ def main() -> int:
     role_settings = cfg.get("role_settings")
     task_owner_field = normalize_task_owner_field_id(cfg.get("task_owner_field"))
 
-    cache_dir = ROOT / "storage" / "jira_query_cache"
-    cache_path: Path | None = None
+    store = open_cache_store(cfg.get("cache_settings"), ROOT / "storage")
     if args.cache_file:
         cache_path = Path(args.cache_file).resolve()
         if not cache_path.is_file():
             print(f"[error] cache file not found: {cache_path}", file=sys.stderr)
             return 1
-    elif args.cache_id:
-        stem = args.cache_id.strip().lower()
-        if len(stem) != 64 or any(c not in "0123456789abcdef" for c in stem):
-            print("[error] --cache-id must be 64 hex characters", file=sys.stderr)
-            return 1
-        cache_path = cache_dir / f"{stem}.json"
-        if not cache_path.is_file():
-            print(f"[error] cache not found: {cache_path}", file=sys.stderr)
-            return 1
+        header = read_header(cache_path)
+        issues = iter_issues(cache_path)
+        try:
+            cache_rel = str(cache_path.relative_to(ROOT.resolve()))
+        except ValueError:
+            cache_rel = str(cache_path)
     else:
-        cache_path = _latest_cache_file(cache_dir)
-        if cache_path is None:
-            print(f"[error] no JSON caches under {cache_dir}", file=sys.stderr)
-            return 1
-
-    payload_raw = _load_payload(cache_path)
-    issues = payload_raw.get("issues") or []
-    cards = [
-        normalize_issue(
-            issue,
+        if args.cache_id:
+            cache_id = args.cache_id.strip().lower()
+            if not is_cache_id(cache_id):
+                print("[error] --cache-id must be 64 hex characters", file=sys.stderr)
+                return 1
+            if not store.exists(cache_id):
+                print(f"[error] cache not found: {store.source_label(cache_id, ROOT)}", file=sys.stderr)
+                return 1
+        else:
+            cache_id = store.latest_id()
+            if cache_id is None:
+                print(f"[error] no caches under {ROOT / 'storage'} ({store.backend} backend)", file=sys.stderr)
+                return 1
+        header = store.load_header(cache_id)
+        issues = store.iter_issues(cache_id)
+        cache_rel = store.source_label(cache_id, ROOT)
+
+    cards = list(
+        iter_normalized_cards(
+            issues,
             base_url=base_url,
             status_mapping=status_mapping,
             role_settings=role_settings,
             task_owner_field=task_owner_field,
+            sprint_field=(cfg.get("agile_settings") or {}).get("sprint_field"),
         )
-        for issue in issues
-    ]
+    )
 
-    try:
-        cache_rel = str(cache_path.resolve().relative_to(ROOT.resolve()))
-    except ValueError:
-        cache_rel = str(cache_path.resolve())
     meta = {
         "cache_file": cache_rel,
-        "jql_preview": payload_raw.get("jql_preview"),
-        "issue_count_cache": payload_raw.get("issue_count"),
+        "jql_preview": header.get("jql_preview"),
+        "issue_count_cache": header.get("issue_count"),
         "normalized_count": len(cards),
     }
     summary = build_summary_payload(cards, meta=meta)
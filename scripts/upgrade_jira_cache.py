@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+按当前裁剪规则（app/ingest_prune.py 的 PRUNE_RULES_VERSION）升级本地 Jira 查询缓存，不访问 Jira。
+
+已是当前版本的缓存跳过；升级后保留原同步时间（JSON 文件 mtime / SQLite updated_at），不影响保留策略。
+
+用法（在 Kanban 项目根目录）:
+  .\\.venv\\Scripts\\python.exe scripts\\upgrade_jira_cache.py --dry-run
+  .\\.venv\\Scripts\\python.exe scripts\\upgrade_jira_cache.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.cache_store import open_cache_store
+from app.config import load_config
+from app.ingest_prune import PRUNE_RULES_VERSION, needs_upgrade, upgrade_payload
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Re-prune cached Jira payloads with the current ingest rules.")
+    parser.add_argument(
+        "--config",
+        type=str,
+        default=None,
+        help="Path to jira_auth.yaml (default: config/jira_auth.yaml next to app)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Only list caches that would be upgraded")
+    args = parser.parse_args()
+
+    cfg = load_config(args.config)
+    store = open_cache_store(cfg.get("cache_settings"), ROOT / "storage")
+
+    upgraded = 0
+    for entry in store.entries():
+        cache_id = entry["id"]
+        header = store.load_header(cache_id)
+        if not needs_upgrade(header):
+            continue
+        before = int(entry.get("size_bytes") or 0)
+        if args.dry_run:
+            print(f"would upgrade\t{cache_id[:12]}\tv{int(header.get('prune_version') or 0)}\t{before} B")
+            upgraded += 1
+            continue
+
+        payload = upgrade_payload(
+            store.load(cache_id),
+            task_owner_field=cfg.get("task_owner_field"),
+            sprint_field=(cfg.get("agile_settings") or {}).get("sprint_field"),
+        )
+        if store.backend == "sqlite":
+            store.save(cache_id, payload, updated_at=entry["updated_at"])
+        else:
+            stat = store.location(cache_id).stat()
+            store.save(cache_id, payload)
+            os.utime(store.location(cache_id), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        after = next((row for row in store.entries() if row["id"] == cache_id), {}).get("size_bytes", 0)
+        print(f"upgraded\t{cache_id[:12]}\t{before} B -> {after} B\t{entry['jql_preview']}")
+        upgraded += 1
+
+    action = "would upgrade" if args.dry_run else "upgraded"
+    print(f"{action} {upgraded} cache(s) to prune rules v{PRUNE_RULES_VERSION}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,11 +1,13 @@
 const elements = {
   assigneeSelect: document.getElementById("assigneeSelect"),
   prioritySelect: document.getElementById("prioritySelect"),
+  teamSelect: document.getElementById("teamSelect"),
   keywordInput: document.getElementById("keywordInput"),
   modeSelect: document.getElementById("modeSelect"),
   sourceModeSelect: document.getElementById("sourceModeSelect"),
   cacheIdSelect: document.getElementById("cacheIdSelect"),
   windowSelect: document.getElementById("windowSelect"),
+  timeBasisSelect: document.getElementById("timeBasisSelect"),
   periodStartInput: document.getElementById("periodStartInput"),
   periodEndInput: document.getElementById("periodEndInput"),
   customDateRange: document.getElementById("customDateRange"),
@@ -53,8 +55,10 @@ function buildQuery() {
   if (elements.windowSelect.value) params.set("window", elements.windowSelect.value);
   if (elements.periodStartInput.value) params.set("start", `${elements.periodStartInput.value}T00:00:00+08:00`);
   if (elements.periodEndInput.value) params.set("end", `${elements.periodEndInput.value}T23:59:59+08:00`);
+  if (elements.timeBasisSelect.value !== "wall") params.set("time_basis", elements.timeBasisSelect.value);
   if (elements.assigneeSelect.value) params.set("assignee", elements.assigneeSelect.value);
   if (elements.prioritySelect.value) params.set("priority", elements.prioritySelect.value);
+  if (elements.teamSelect.value) params.set("team", elements.teamSelect.value);
   if (elements.keywordInput.value) params.set("q", elements.keywordInput.value);
   if (elements.jqlInput.value) params.set("jql", elements.jqlInput.value);
   return params;
@@ -88,7 +92,7 @@ function setExportLinks() {
   elements.pngExport.href = `/api/export/png?${query}&mode=${encodeURIComponent(elements.modeSelect.value)}`;
 }
 
-function renderCards(columns, cards) {
+function renderCards(columns, cards, aging = {}) {
   elements.kanban.innerHTML = "";
   ["To Do", "In Progress", "审核中", "Done"].forEach((name) => {
     const col = document.createElement("div");
@@ -96,9 +100,11 @@ function renderCards(columns, cards) {
     col.innerHTML = `<h3>${name} (${(columns[name] || []).length})</h3>`;
     (columns[name] || []).forEach((card) => {
       const node = document.createElement("div");
-      node.className = "card";
+      const age = aging[card.key];
+      node.className = age?.aged ? `card aged-${age.level}` : "card";
       const owner = card.metric_owner || card.assignee;
-      node.innerHTML = `<strong>${card.key}</strong><div>${card.summary}</div><small>${owner} | ${card.priority}</small>`;
+      const ageText = age?.age_hours != null ? ` | 在途 ${age.age_hours}h` : "";
+      node.innerHTML = `<strong>${card.key}</strong><div>${card.summary}</div><small>${owner} | ${card.priority}${ageText}</small>`;
       node.onclick = () => {
         elements.details.innerHTML = `
           <h3>${card.key}</h3>
@@ -113,6 +119,7 @@ function renderCards(columns, cards) {
           <p>开发开始: ${card.timeline.developer_started_at || "-"}</p>
           <p>审核开始: ${card.timeline.review_at || "-"}</p>
           <p>解决: ${card.timeline.resolved_at || "-"}</p>
+          ${age ? `<p>在途时长: ${age.age_hours ?? "-"}h（${age.aged ? `超过历史 ${age.level}` : "正常"}）</p>` : ""}
           <p><a href="${card.url}" target="_blank">打开JIRA</a></p>
         `;
       };
@@ -301,7 +308,7 @@ async function refresh() {
   }
 
   const kanbanData = await kanbanRes.json();
-  renderCards(kanbanData.columns || {}, kanbanData.cards || []);
+  renderCards(kanbanData.columns || {}, kanbanData.cards || [], kanbanData.aging?.cards || {});
   renderMetrics(kanbanData.metrics || []);
   renderSummary(kanbanData);
   renderFocus(kanbanData);
@@ -314,6 +321,7 @@ async function refresh() {
 
   const assignees = kanbanData.filters?.assignees || [];
   const priorities = kanbanData.filters?.priorities || [];
+  const teams = kanbanData.filters?.teams || [];
 
   elements.assigneeSelect.innerHTML = '<option value="">全部负责人</option>';
   assignees.forEach((name) => {
@@ -323,6 +331,16 @@ async function refresh() {
     elements.assigneeSelect.appendChild(option);
   });
 
+  const selectedTeam = elements.teamSelect.value;
+  elements.teamSelect.innerHTML = '<option value="">全部团队</option>';
+  teams.forEach((team) => {
+    const option = document.createElement("option");
+    option.value = team.id;
+    option.textContent = team.name;
+    elements.teamSelect.appendChild(option);
+  });
+  elements.teamSelect.value = selectedTeam;
+
   elements.prioritySelect.innerHTML = '<option value="">全部优先级</option>';
   priorities.forEach((name) => {
     const option = document.createElement("option");
@@ -376,6 +394,7 @@ elements.windowSelect.addEventListener("change", () => {
   refresh();
 });
 elements.periodStartInput.addEventListener("change", refresh);
+elements.timeBasisSelect.addEventListener("change", refresh);
 elements.periodEndInput.addEventListener("change", refresh);
 elements.toggleAdvancedFilters.addEventListener("click", toggleAdvancedFilters);
 elements.toggleAnalysisBtn.addEventListener("click", toggleAnalysisPanel);
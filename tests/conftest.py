@@ -58,8 +58,8 @@ def fake_jira():
 
 
 @pytest.fixture
-def app(fake_jira):
-    app = create_app(jira_client=fake_jira)
+def app(fake_jira, tmp_path):
+    app = create_app(jira_client=fake_jira, storage_dir=tmp_path)
     return app
 
 
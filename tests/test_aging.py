@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta, timezone
+
+from app.aging import build_aging_baseline, compute_aging
+from app.working_calendar import WorkingCalendar
+
+
+NOW = datetime(2026, 3, 20, 0, tzinfo=timezone.utc)
+
+
+def _card(key, column, priority="High", issue_type="Bug", **timeline):
+    return {
+        "key": key,
+        "summary": key,
+        "assignee": "alice",
+        "metric_owner": "alice",
+        "column": column,
+        "priority": priority,
+        "issue_type": issue_type,
+        "timeline": {"created_at": "2026-03-01T00:00:00+00:00", **timeline},
+    }
+
+
+def _done(key, hours, priority="High", issue_type="Bug"):
+    return _card(
+        key,
+        "Done",
+        priority,
+        issue_type,
+        in_progress_at="2026-03-02T00:00:00+00:00",
+        resolved_at=(datetime(2026, 3, 2, tzinfo=timezone.utc) + timedelta(hours=hours)).isoformat(),
+    )
+
+
+HISTORY = [_done(f"H-{hours}", hours) for hours in (10, 20, 30, 40, 50)] + [
+    _done(f"L-{hours}", hours, priority="Low") for hours in (100, 200, 300, 400, 500)
+]
+
+
+def test_age_since_in_progress_or_last_reopen_against_same_priority_and_type():
+    cards = HISTORY + [
+        _card("W-1", "In Progress", in_progress_at="2026-03-19T23:00:00+00:00"),
+        _card(
+            "W-2",
+            "审核中",
+            in_progress_at="2026-03-10T00:00:00+00:00",
+            reopened_events=["2026-03-17T00:00:00+00:00", "2026-03-17T23:00:00+00:00"],
+        ),
+        _card("W-3", "In Progress", priority="Low", in_progress_at="2026-03-18T00:00:00+00:00"),
+        _card("T-1", "To Do"),
+    ]
+    report = compute_aging(cards, build_aging_baseline(cards), NOW)
+    rows = {row["key"]: row for row in report["cards"]}
+
+    assert set(rows) == {"W-1", "W-2", "W-3"}
+    assert rows["W-1"]["age_hours"] == 1
+    assert rows["W-1"]["level"] == "normal"
+    # 重开后从最近一次重开起算：49 小时，超过 High/Bug 的 p95（48 小时）
+    assert rows["W-2"]["age_from"] == "reopened"
+    assert rows["W-2"]["age_hours"] == 49
+    assert rows["W-2"]["baseline"] == "priority_type"
+    assert rows["W-2"]["level"] == "p95"
+    assert rows["W-2"]["aged"] is True
+    # 同样在途两天，Low 优先级的历史周期更长，不算老化
+    assert rows["W-3"]["level"] == "normal"
+    assert [row["key"] for row in report["cards"]] == ["W-2", "W-3", "W-1"]
+    assert report["summary"] == {
+        "wip": 3,
+        "aged": 1,
+        "levels": {"normal": 2, "p50": 0, "p85": 0, "p95": 1},
+        "baseline_samples": 10,
+    }
+
+
+def test_sparse_groups_fall_back_to_priority_then_board():
+    cards = HISTORY + [
+        _card("W-1", "In Progress", issue_type="Story", in_progress_at="2026-03-19T00:00:00+00:00"),
+        _card("W-2", "In Progress", priority="Medium", review_at="2026-03-19T00:00:00+00:00"),
+    ]
+    rows = {row["key"]: row for row in compute_aging(cards, build_aging_baseline(cards), NOW)["cards"]}
+
+    assert rows["W-1"]["baseline"] == "priority"
+    assert rows["W-2"]["baseline"] == "board"
+    assert rows["W-2"]["age_from"] == "review_at"
+
+    empty = compute_aging(cards[-1:], build_aging_baseline([]), NOW)
+    assert empty["cards"][0]["baseline"] is None
+    assert empty["cards"][0]["level"] == "normal"
+
+
+def test_business_time_basis_measures_working_hours():
+    calendar = WorkingCalendar(timezone="UTC")
+    # 周五 17:00 进入开发，下周一 10:00 查看：工作时间 2 小时
+    card = _card("W-1", "In Progress", in_progress_at="2026-03-13T17:00:00+00:00")
+    now = datetime(2026, 3, 16, 10, tzinfo=timezone.utc)
+    report = compute_aging([card], build_aging_baseline([], calendar), now, calendar)
+    assert report["cards"][0]["age_hours"] == 2
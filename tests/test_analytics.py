@@ -1,5 +1,15 @@
-from app.analytics import build_manager_summary
-from app.period import resolve_period_window
+from datetime import datetime, timezone
+
+import pytest
+
+from app.analytics import (
+    CompiledTemplate,
+    SummaryTemplates,
+    build_manager_summary,
+    build_summary_series,
+)
+from app.period import resolve_period_window, trailing_windows
+from app.teams import TeamDirectory
 
 
 def test_build_manager_summary_counts_window_metrics():
@@ -191,3 +201,134 @@ def test_resolved_total_uses_last_resolution_time():
 
     # resolved_at is the LAST resolution time, which is inside the window
     assert result["manager_summary_cards"]["resolved_total"] == 1
+
+
+def test_build_manager_summary_rolls_up_teams_from_owner_counts():
+    window = {
+        "mode": "custom",
+        "label": "本周",
+        "start": datetime(2026, 3, 2, tzinfo=timezone.utc),
+        "end": datetime(2026, 3, 9, tzinfo=timezone.utc),
+        "timezone": "UTC",
+    }
+    cards = [
+        {
+            "key": f"T-{index}",
+            "summary": "x",
+            "status": "Done" if resolved else "Open",
+            "assignee": owner,
+            "metric_owner": owner,
+            "timeline": {
+                "created_at": "2026-03-03T00:00:00+00:00",
+                "dev_manager_assigned_at": "2026-03-03T01:00:00+00:00",
+                "resolved_at": "2026-03-04T00:00:00+00:00" if resolved else None,
+                "reopened_events": ["2026-03-05T00:00:00+00:00"] if owner == "Bob" else [],
+            },
+        }
+        for index, (owner, resolved) in enumerate([("Alice", True), ("Alice", False), ("Bob", True), ("Carol", True)])
+    ]
+    teams = TeamDirectory([{"id": "core", "name": "核心组", "members": ["Alice", "Bob"]}])
+
+    summary = build_manager_summary(cards, window, teams=teams)
+    assert summary["team_summary"] == [
+        {
+            "team": "core",
+            "name": "核心组",
+            "assigned_total": 3,
+            "resolved_total": 2,
+            "unresolved_total": 1,
+            "reopened_event_total": 1,
+            "new_issue_total": 3,
+            "resolution_rate": 66.67,
+        }
+    ]
+    assert "【团队汇总 (1)】" in summary["manager_summary_text"]
+    assert "核心组：分配 3，已解决 2，未解决 1" in summary["manager_summary_text"]
+    assert build_manager_summary(cards, window)["team_summary"] == []
+
+
+def test_compiled_template_renders_values_verbatim():
+    template = CompiledTemplate("{label}：{count:>3} 个 {{字面量}} {missing_ok}")
+
+    assert template.fields == ("label", "count", "missing_ok")
+    text = template.render(label="摘要 {含花括号}", count=7, missing_ok=None)
+    assert text == "摘要 {含花括号}：  7 个 {字面量} "
+
+
+def test_summary_templates_reload_when_file_changes(tmp_path):
+    path = tmp_path / "manager_summary_template.yaml"
+    templates = SummaryTemplates(path)
+    assert templates.version == "builtin"
+    assert templates.compiled()["owner_group"].render(owner="A", count=1) == "  A (1)："
+
+    path.write_text('strings:\n  owner_group: "{owner}={count}"\n', encoding="utf-8")
+    first = templates.compiled()
+    assert first["owner_group"].render(owner="A", count=1) == "A=1"
+    assert templates.compiled() is first
+
+    path.write_text('strings:\n  owner_group: "{owner}: {count} 个"\n', encoding="utf-8")
+    assert templates.compiled()["owner_group"].render(owner="A", count=1) == "A: 1 个"
+    # 未覆盖的键仍回退内置模板
+    assert "{label}" in templates.strings()["overview"]
+
+
+def test_summary_templates_keep_last_good_version_on_bad_edit(tmp_path, caplog):
+    path = tmp_path / "manager_summary_template.yaml"
+    path.write_text('strings:\n  owner_group: "{owner}={count}"\n', encoding="utf-8")
+    templates = SummaryTemplates(path)
+    good = templates.version
+    assert templates.compiled()["owner_group"].render(owner="A", count=1) == "A=1"
+
+    path.write_text('strings:\n  owner_group: "{owner.name} 个"\n', encoding="utf-8")
+    with caplog.at_level("ERROR", logger="app.analytics"):
+        assert templates.compiled()["owner_group"].render(owner="A", count=1) == "A=1"
+    assert templates.version == good
+    assert "Unsupported placeholder" in caplog.text
+
+    # 首次加载即出错：回退内置模板
+    broken = SummaryTemplates(tmp_path / "broken.yaml")
+    broken.path.write_text("strings: [unclosed\n", encoding="utf-8")
+    assert broken.version == "builtin"
+    assert broken.compiled()["owner_group"].render(owner="A", count=1) == "  A (1)："
+
+    path.write_text('strings:\n  owner_group: "{owner}: {count}"\n', encoding="utf-8")
+    assert templates.compiled()["owner_group"].render(owner="A", count=1) == "A: 1"
+
+
+def test_build_summary_series_matches_per_window_summary():
+    cards = [
+        {
+            "key": f"S-{index}",
+            "summary": "s",
+            "status": "Done" if index % 2 else "In Progress",
+            "timeline": {
+                "created_at": f"2026-02-{2 + index:02d}T01:00:00+00:00",
+                "dev_manager_assigned_at": f"2026-02-{3 + index:02d}T01:00:00+00:00",
+                "resolved_at": f"2026-02-{5 + index:02d}T01:00:00+00:00" if index % 2 else None,
+                "closed_at": f"2026-02-{6 + index:02d}T01:00:00+00:00" if index % 3 == 0 else None,
+                "reopened_events": [f"2026-02-{4 + index:02d}T12:00:00+00:00"] if index % 4 == 0 else [],
+            },
+        }
+        for index in range(12)
+    ]
+    windows = trailing_windows("weekly", 4, now=datetime(2026, 2, 25, 12, tzinfo=timezone.utc))
+    assert [window["start"].date().isoformat() for window in windows] == [
+        "2026-02-02",
+        "2026-02-09",
+        "2026-02-16",
+        "2026-02-23",
+    ]
+
+    series = build_summary_series(cards, windows)
+
+    for window, row in zip(windows, series):
+        expected = build_manager_summary(cards, window)["manager_summary_cards"]
+        assert {key: row[key] for key in expected} == expected
+        assert row["label"] == window["label"]
+
+
+def test_build_summary_series_rejects_overlapping_windows():
+    first = resolve_period_window("custom", "2026-02-01T00:00:00+00:00", "2026-02-10T00:00:00+00:00")
+    second = resolve_period_window("custom", "2026-02-05T00:00:00+00:00", "2026-02-12T00:00:00+00:00")
+    with pytest.raises(ValueError):
+        build_summary_series([], [first, second])
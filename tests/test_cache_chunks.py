@@ -0,0 +1,78 @@
+import threading
+from pathlib import Path
+
+from app import cache_chunks
+from app.cache_chunks import MANIFEST_NAME
+from app.cache_store import JsonCacheStore
+
+CACHE_A = "a" * 64
+
+
+def _payload(count):
+    issues = [{"key": f"A-{index}", "fields": {"updated": "2026-02-03T00:00:00.000+0000"}} for index in range(count)]
+    return {"custom_jql": "", "jql_preview": "(project = TEST)", "issue_count": count, "issues": issues}
+
+
+def test_chunked_layout_round_trips_and_prefetches_pages_concurrently(tmp_path: Path, monkeypatch):
+    store = JsonCacheStore(tmp_path, codec="gzip", layout="chunked", page_size=3, load_workers=3)
+    store.save(CACHE_A, _payload(10))
+
+    chunk_dir = tmp_path / f"{CACHE_A}.chunks"
+    assert len(list(chunk_dir.glob("*.json.gz"))) == 4
+    assert store.load_header(CACHE_A)["issue_count"] == 10
+    assert [issue["key"] for issue in store.iter_issues(CACHE_A)] == [f"A-{index}" for index in range(10)]
+
+    threads: dict[str, set[str]] = {"read": set(), "transform": set()}
+    read_raw_page = cache_chunks._read_raw_page
+
+    def tracked_read(path):
+        threads["read"].add(threading.current_thread().name)
+        return read_raw_page(path)
+
+    def keys(page):
+        threads["transform"].add(threading.current_thread().name)
+        return [issue["key"] for issue in page]
+
+    monkeypatch.setattr(cache_chunks, "_read_raw_page", tracked_read)
+    pages = list(store.map_pages(CACHE_A, keys))
+    assert [len(page) for page in pages] == [3, 3, 3, 1]
+    assert pages[0][0] == "A-0" and pages[-1] == ["A-9"]
+    # 只有读文件 + 解压在线程池中；解析与 transform 在调用方线程逐页执行
+    assert all(name.startswith("cache-page") for name in threads["read"])
+    assert threads["transform"] == {threading.current_thread().name}
+
+    entry = store.entries()[0]
+    assert entry["id"] == CACHE_A
+    assert entry["size_bytes"] > 0
+    assert store.latest_id() == CACHE_A
+
+
+def test_rewrite_replaces_pages_and_partial_write_is_invisible(tmp_path: Path):
+    store = JsonCacheStore(tmp_path, layout="chunked", page_size=4)
+    chunk_dir = tmp_path / f"{CACHE_A}.chunks"
+
+    # 只有页文件、没有 manifest：视为不存在
+    chunk_dir.mkdir()
+    (chunk_dir / "deadbeef-00000.json").write_text('{"issues": []}', encoding="utf-8")
+    assert not store.exists(CACHE_A)
+    assert store.latest_id() is None
+
+    store.save(CACHE_A, _payload(9))
+    first_version = store.version(CACHE_A)
+    store.save(CACHE_A, _payload(2))
+    assert len([path for path in chunk_dir.iterdir() if path.name != MANIFEST_NAME]) == 1
+    assert store.version(CACHE_A) != first_version
+    assert len(store.load(CACHE_A)["issues"]) == 2
+
+
+def test_layout_switch_keeps_single_file_caches_readable(tmp_path: Path):
+    JsonCacheStore(tmp_path).save(CACHE_A, _payload(5))
+    chunked = JsonCacheStore(tmp_path, layout="chunked", page_size=2)
+    assert [len(page) for page in chunked.map_pages(CACHE_A, list)] == [2, 2, 1]
+
+    chunked.save(CACHE_A, _payload(5))
+    assert not (tmp_path / f"{CACHE_A}.json").exists()
+    JsonCacheStore(tmp_path).save(CACHE_A, _payload(1))
+    assert not (tmp_path / f"{CACHE_A}.chunks").exists()
+    chunked.delete(CACHE_A)
+    assert not chunked.exists(CACHE_A)
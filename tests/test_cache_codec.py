@@ -0,0 +1,48 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from app.cache_codec import decode_payload, detect_codec, encode_payload, resolve_codec
+from app.cache_store import JsonCacheStore
+
+CACHE_A = "a" * 64
+PAYLOAD = {"custom_jql": "", "jql_preview": "(project = 测试)", "issue_count": 1, "issues": [{"key": "A-1"}]}
+
+
+@pytest.mark.parametrize("codec", ["json", "gzip", "zstd"])
+def test_encode_decode_round_trip(codec):
+    resolved = resolve_codec(codec)
+    data = encode_payload(PAYLOAD, resolved)
+    assert detect_codec(data) == resolved
+    assert decode_payload(data) == PAYLOAD
+
+
+def test_resolve_codec_rejects_unknown():
+    with pytest.raises(ValueError):
+        resolve_codec("brotli")
+
+
+def test_json_store_reads_legacy_plain_cache_with_compressed_codec(tmp_path: Path):
+    (tmp_path / f"{CACHE_A}.json").write_text(json.dumps(PAYLOAD, ensure_ascii=False), encoding="utf-8")
+    store = JsonCacheStore(tmp_path, codec="gzip")
+    assert store.exists(CACHE_A)
+    assert store.load(CACHE_A) == PAYLOAD
+    assert store.latest_id() == CACHE_A
+
+
+def test_json_store_save_replaces_previous_encoding(tmp_path: Path):
+    JsonCacheStore(tmp_path).save(CACHE_A, PAYLOAD)
+    store = JsonCacheStore(tmp_path, codec="gzip")
+    store.save(CACHE_A, PAYLOAD)
+    assert sorted(path.name for path in tmp_path.iterdir()) == [f"{CACHE_A}.json.gz"]
+    assert [entry["id"] for entry in store.entries()] == [CACHE_A]
+    assert store.load(CACHE_A) == PAYLOAD
+
+
+def test_json_store_treats_corrupt_cache_as_missing(tmp_path: Path):
+    (tmp_path / f"{CACHE_A}.json.gz").write_bytes(b"\x1f\x8bnot really gzip")
+    store = JsonCacheStore(tmp_path)
+    with pytest.raises(FileNotFoundError):
+        store.load(CACHE_A)
+    assert store.entries() == []
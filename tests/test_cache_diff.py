@@ -0,0 +1,72 @@
+from app.analytics import build_change_section
+from app.cache_diff import (
+    DiffCache,
+    RevisionStore,
+    count_changes,
+    diff_projections,
+    parse_revision_ref,
+)
+
+CACHE_A = "a" * 64
+
+
+def _row(column, owner="Alice", priority="Medium", summary="task"):
+    return {"summary": summary, "column": column, "status": column, "owner": owner, "priority": priority}
+
+
+def test_diff_projections_emits_structured_changes():
+    before = {
+        "A-1": _row("To Do"),
+        "A-2": _row("In Progress"),
+        "A-3": _row("In Progress", priority="Low"),
+        "A-4": _row("To Do"),
+    }
+    after = {
+        "A-1": _row("In Progress", owner="Bob"),
+        "A-2": _row("Done"),
+        "A-3": _row("In Progress", priority="Highest"),
+        "A-5": _row("To Do"),
+    }
+    changes = diff_projections(before, after)
+    assert [(change["type"], change["key"]) for change in changes] == [
+        ("new", "A-5"),
+        ("resolved", "A-2"),
+        ("column", "A-1"),
+        ("owner", "A-1"),
+        ("priority_escalated", "A-3"),
+        ("removed", "A-4"),
+    ]
+    assert changes[3]["from"] == "Alice" and changes[3]["to"] == "Bob"
+    assert count_changes(changes)["resolved"] == 1
+
+    lines = build_change_section(changes)
+    assert lines[0] == "【同步变化 (6)】"
+    assert "负责人 Alice → Bob" in lines[4]
+    assert build_change_section([]) == []
+
+
+def test_priority_lowering_is_not_an_escalation():
+    assert diff_projections({"A-1": _row("To Do", priority="High")}, {"A-1": _row("To Do", priority="Low")}) == []
+
+
+def test_revision_store_keeps_recent_versions(tmp_path):
+    store = RevisionStore(tmp_path, max_revisions=2)
+    store.record(CACHE_A, "v1", {"A-1": _row("To Do")})
+    store.record(CACHE_A, "v1", {"A-1": _row("To Do")})
+    store.record(CACHE_A, "v2", {"A-1": _row("Done")})
+    store.record(CACHE_A, "v3", {"A-1": _row("Done")})
+
+    assert [row["revision"] for row in store.revisions(CACHE_A)] == [2, 3]
+    assert store.get(CACHE_A, before_latest=True)["version"] == "v2"
+    assert store.get(CACHE_A, revision=1) is None
+
+
+def test_parse_revision_ref_and_memoized_diff():
+    assert parse_revision_ref(CACHE_A) == (CACHE_A, None)
+    assert parse_revision_ref(f"{CACHE_A}@3") == (CACHE_A, 3)
+    assert parse_revision_ref("nope") is None
+    assert parse_revision_ref(f"{CACHE_A}@x") is None
+
+    cache = DiffCache()
+    first = cache.get_or_compute(("a", "b"), {}, {"A-1": _row("To Do")})
+    assert cache.get_or_compute(("a", "b"), {}, {}) is first
@@ -0,0 +1,79 @@
+from pathlib import Path
+
+from app.cache_retention import enforce_retention, plan_eviction
+from app.cache_store import JsonCacheStore
+
+DAY = 86400.0
+NOW = 100 * DAY
+
+
+def _entry(cache_id, preview, custom_jql="", updated_days_ago=1, accessed_days_ago=1, size=100):
+    return {
+        "id": cache_id,
+        "jql_preview": preview,
+        "custom_jql": custom_jql,
+        "updated_at": NOW - updated_days_ago * DAY,
+        "last_accessed_at": NOW - accessed_days_ago * DAY,
+        "size_bytes": size,
+    }
+
+
+def test_plan_eviction_without_limits_keeps_everything():
+    entries = [_entry("a", "p1"), _entry("b", "p2")]
+    assert plan_eviction(entries, {}, now=NOW) == []
+
+
+def test_plan_eviction_by_age_skips_pinned():
+    entries = [
+        _entry("old", "(base) AND (x)", updated_days_ago=40),
+        _entry("pinned", "(base)", updated_days_ago=40),
+        _entry("fresh", "(base) AND (y)", updated_days_ago=2),
+    ]
+    plan = plan_eviction(entries, {"max_age_days": 30}, pinned_previews={"(base)"}, now=NOW)
+    assert [(row["id"], row["reason"]) for row in plan] == [("old", "max_age_days")]
+
+
+def test_plan_eviction_per_jql_keeps_most_recently_accessed():
+    entries = [
+        _entry("v1", "(old filters) AND (x)", custom_jql="x", accessed_days_ago=5),
+        _entry("v2", "(new filters) AND (x)", custom_jql="x", accessed_days_ago=1),
+        _entry("other", "(new filters) AND (y)", custom_jql="y", accessed_days_ago=9),
+    ]
+    plan = plan_eviction(entries, {"max_per_jql": 1}, now=NOW)
+    assert [row["id"] for row in plan] == ["v1"]
+
+
+def test_plan_eviction_by_total_bytes_is_lru():
+    entries = [
+        _entry("recent", "p1", accessed_days_ago=1, size=400),
+        _entry("middle", "p2", accessed_days_ago=3, size=400),
+        _entry("oldest", "p3", accessed_days_ago=7, size=400),
+    ]
+    plan = plan_eviction(entries, {"max_total_bytes": 900}, now=NOW)
+    assert [row["id"] for row in plan] == ["oldest"]
+
+
+def test_enforce_retention_dry_run_and_delete(tmp_path: Path):
+    store = JsonCacheStore(tmp_path)
+    for char in "ab":
+        store.save(char * 64, {"custom_jql": char, "jql_preview": f"({char})", "issue_count": 0, "issues": []})
+    store.record_access("a" * 64)
+
+    plan = enforce_retention(store, {"max_total_bytes": 1}, pinned_previews={"(a)"}, dry_run=True)
+    assert [row["id"] for row in plan] == ["b" * 64]
+    assert store.exists("b" * 64)
+
+    enforce_retention(store, {"max_total_bytes": 1}, pinned_previews={"(a)"})
+    assert not store.exists("b" * 64)
+    assert store.exists("a" * 64)
+
+
+def test_plan_eviction_never_evicts_the_just_synced_cache():
+    entries = [
+        _entry("recent", "p1", accessed_days_ago=1, size=400),
+        _entry("synced", "p2", custom_jql="x", updated_days_ago=40, accessed_days_ago=30, size=400),
+        _entry("other", "p3", custom_jql="x", accessed_days_ago=2, size=400),
+    ]
+    retention = {"max_total_bytes": 500, "max_age_days": 30, "max_per_jql": 1}
+    plan = plan_eviction(entries, retention, now=NOW, pinned_ids={"synced"})
+    assert sorted(row["id"] for row in plan) == ["other", "recent"]
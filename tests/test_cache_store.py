@@ -0,0 +1,139 @@
+from pathlib import Path
+
+from app.cache_store import JsonCacheStore, is_cache_id, open_cache_store
+from app.issue_store import SqliteIssueStore
+
+CACHE_A = "a" * 64
+CACHE_B = "b" * 64
+
+
+def _issue(key, updated, status="In Progress"):
+    return {
+        "key": key,
+        "fields": {"summary": key, "status": {"name": status}, "updated": updated},
+        "changelog": {
+            "histories": [
+                {
+                    "id": "1",
+                    "created": "2026-02-02T08:00:00.000+00:00",
+                    "items": [
+                        {"field": "assignee", "to": "alice", "toString": "Alice"},
+                        {"field": "status", "fromString": "Open", "toString": status},
+                    ],
+                }
+            ]
+        },
+    }
+
+
+def _payload(*issues):
+    return {"custom_jql": "", "jql_preview": "(project = TEST)", "issue_count": len(issues), "issues": list(issues)}
+
+
+def test_is_cache_id():
+    assert is_cache_id(CACHE_A)
+    assert not is_cache_id("abc")
+    assert not is_cache_id(None)
+
+
+def test_sqlite_store_round_trips_issues_and_changelog(tmp_path: Path):
+    store = SqliteIssueStore(tmp_path / "store.sqlite3")
+    payload = _payload(_issue("A-1", "2026-02-03T00:00:00.000+0000"), _issue("A-2", "2026-02-04T00:00:00.000+0000"))
+    store.save(CACHE_A, payload)
+
+    loaded = store.load(CACHE_A)
+    assert [issue["key"] for issue in loaded["issues"]] == ["A-1", "A-2"]
+    assert loaded["issues"][0]["changelog"] == payload["issues"][0]["changelog"]
+    assert loaded["max_updated"] == "2026-02-04T00:00:00.000+0000"
+    assert store.latest_id() == CACHE_A
+    assert store.entries()[0]["issue_count"] == 2
+
+
+def test_sqlite_store_keeps_shared_issue_once(tmp_path: Path):
+    store = SqliteIssueStore(tmp_path / "store.sqlite3")
+    shared = _issue("A-1", "2026-02-03T00:00:00.000+0000")
+    store.save(CACHE_A, _payload(shared), updated_at=1.0)
+    store.save(CACHE_B, _payload(shared, _issue("B-1", "2026-02-03T00:00:00.000+0000")), updated_at=2.0)
+
+    with store._connect() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM issues").fetchone()[0] == 2
+        assert conn.execute("SELECT COUNT(*) FROM changelog_events WHERE issue_key = 'A-1'").fetchone()[0] == 2
+    assert store.latest_id() == CACHE_B
+
+    # B-1 drops out of its query: the orphaned issue row is removed
+    store.save(CACHE_B, _payload(shared))
+    with store._connect() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM issues").fetchone()[0] == 1
+
+
+def test_sqlite_store_rewrites_issue_when_updated_changes(tmp_path: Path):
+    store = SqliteIssueStore(tmp_path / "store.sqlite3")
+    store.save(CACHE_A, _payload(_issue("A-1", "2026-02-03T00:00:00.000+0000")))
+    store.save(CACHE_A, _payload(_issue("A-1", "2026-02-05T00:00:00.000+0000", status="Done")))
+    issue = store.load(CACHE_A)["issues"][0]
+    assert issue["fields"]["status"]["name"] == "Done"
+    assert issue["changelog"]["histories"][0]["items"][1]["toString"] == "Done"
+
+
+def test_open_cache_store_imports_legacy_json_into_sqlite(tmp_path: Path):
+    JsonCacheStore(tmp_path / "jira_query_cache").save(CACHE_A, _payload(_issue("A-1", "2026-02-03T00:00:00.000+0000")))
+
+    assert open_cache_store(None, tmp_path).backend == "json"
+    store = open_cache_store({"backend": "sqlite"}, tmp_path)
+    assert store.backend == "sqlite"
+    assert store.exists(CACHE_A)
+    assert store.load(CACHE_A)["issues"][0]["key"] == "A-1"
+    assert store.source_label(CACHE_A, tmp_path) == f"jira_issue_store.sqlite3#{CACHE_A}"
+
+
+def test_sqlite_store_delete_and_access_tracking(tmp_path: Path):
+    store = SqliteIssueStore(tmp_path / "store.sqlite3")
+    store.save(CACHE_A, _payload(_issue("A-1", "2026-02-03T00:00:00.000+0000")), updated_at=1.0)
+    store.save(CACHE_B, _payload(_issue("B-1", "2026-02-03T00:00:00.000+0000")), updated_at=2.0)
+    store.record_access(CACHE_A)
+
+    entries = {entry["id"]: entry for entry in store.entries()}
+    assert entries[CACHE_A]["last_accessed_at"] > entries[CACHE_B]["last_accessed_at"]
+    assert entries[CACHE_A]["size_bytes"] > 0
+
+    store.delete(CACHE_A)
+    assert not store.exists(CACHE_A)
+    with store._connect() as conn:
+        assert [row[0] for row in conn.execute("SELECT key FROM issues")] == ["B-1"]
+
+
+def test_cache_version_changes_on_save_but_not_on_access(tmp_path: Path):
+    for store in (JsonCacheStore(tmp_path / "json"), SqliteIssueStore(tmp_path / "store.sqlite3")):
+        store.save(CACHE_A, _payload(_issue("A-1", "2026-02-03T00:00:00.000+0000")))
+        first = store.version(CACHE_A)
+        store.record_access(CACHE_A)
+        assert store.version(CACHE_A) == first
+
+        store.save(CACHE_A, _payload(_issue("A-1", "2026-02-04T00:00:00.000+0000"), _issue("A-2", "2026-02-04T00:00:00.000+0000")))
+        assert store.version(CACHE_A) != first
+
+
+def test_sqlite_version_changes_when_another_query_rewrites_a_shared_issue(tmp_path: Path):
+    store = SqliteIssueStore(tmp_path / "store.sqlite3")
+    store.save(CACHE_A, _payload(_issue("A-1", "2026-02-03T00:00:00.000+0000")), updated_at=1.0)
+    store.save(CACHE_B, _payload(_issue("A-1", "2026-02-03T00:00:00.000+0000")), updated_at=2.0)
+    first = store.version(CACHE_A)
+
+    store.save(CACHE_B, _payload(_issue("A-1", "2026-02-05T00:00:00.000+0000", status="Done")), updated_at=3.0)
+    assert store.version(CACHE_A) != first
+    assert store.load(CACHE_A)["issues"][0]["fields"]["status"]["name"] == "Done"
+    assert store.latest_id() == CACHE_B
+
+
+def test_sqlite_record_access_is_throttled(tmp_path: Path):
+    store = SqliteIssueStore(tmp_path / "store.sqlite3", access_interval=3600)
+    store.save(CACHE_A, _payload(_issue("A-1", "2026-02-03T00:00:00.000+0000")), updated_at=1.0)
+    store.record_access(CACHE_A)
+    recorded = store.entries()[0]["last_accessed_at"]
+
+    store.record_access(CACHE_A)
+    assert store.entries()[0]["last_accessed_at"] == recorded
+
+    store.access_interval = 0
+    store.record_access(CACHE_A)
+    assert store.entries()[0]["last_accessed_at"] > recorded
@@ -0,0 +1,66 @@
+import json
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from app import cache_stream
+from app.cache_codec import encode_payload
+from app.cache_stream import iter_issues, read_header
+
+
+def _payload(count):
+    return {
+        "custom_jql": "status = 开发中",
+        "jql_preview": "(project = TEST)",
+        "issue_count": count,
+        "max_updated": 12345,
+        "issues": [
+            {"key": f"A-{index}", "fields": {"summary": f"摘要 {{}} [{index}]", "n": index * 1.5}}
+            for index in range(count)
+        ],
+    }
+
+
+@pytest.mark.parametrize("codec", ["json", "gzip"])
+def test_iter_issues_matches_full_parse_across_chunk_boundaries(tmp_path: Path, monkeypatch, codec):
+    monkeypatch.setattr(cache_stream, "_CHUNK_SIZE", 7)
+    payload = _payload(25)
+    path = tmp_path / "cache"
+    path.write_bytes(encode_payload(payload, codec))
+
+    assert list(iter_issues(path)) == payload["issues"]
+    header = read_header(path)
+    assert header == {key: value for key, value in payload.items() if key != "issues"}
+
+
+def test_iter_issues_handles_pretty_printed_and_empty_arrays(tmp_path: Path):
+    path = tmp_path / "cache.json"
+    path.write_text(json.dumps({"issues": [], "issue_count": 0}, indent=2), encoding="utf-8")
+    assert list(iter_issues(path)) == []
+
+    path.write_text(json.dumps({"issue_count": 1, "issues": [{"key": "X-1"}]}, indent=4), encoding="utf-8")
+    assert list(iter_issues(path)) == [{"key": "X-1"}]
+
+
+def test_iter_issues_rejects_truncated_file(tmp_path: Path):
+    path = tmp_path / "cache.json"
+    path.write_text(json.dumps(_payload(3))[:-20], encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_issues(path))
+
+
+def test_iter_issues_peak_memory_is_bounded_by_single_issue(tmp_path: Path):
+    payload = {"issue_count": 2000, "issues": [{"key": f"A-{i}", "fields": {"description": "x" * 2000}} for i in range(2000)]}
+    path = tmp_path / "cache.json"
+    path.write_text(json.dumps(payload), encoding="utf-8")
+    file_size = path.stat().st_size
+    del payload
+
+    tracemalloc.start()
+    count = sum(1 for _ in iter_issues(path))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert count == 2000
+    assert peak < file_size / 10
@@ -0,0 +1,134 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from app.cfd import build_cfd, build_flow_sweep
+from app.event_index import EventIndex
+from app.normalize import build_status_groups, normalize_issue
+from app.period import PeriodEngine
+
+
+def _issue(key, created, status, transitions):
+    return {
+        "key": key,
+        "fields": {
+            "summary": key,
+            "status": {"name": status},
+            "priority": {"name": "High"},
+            "issuetype": {"name": "Task"},
+            "created": created,
+        },
+        "changelog": {
+            "histories": [
+                {"created": at, "items": [{"field": "status", "fromString": old, "toString": new}]}
+                for at, old, new in transitions
+            ]
+        },
+    }
+
+
+def _sweep(issues):
+    index = EventIndex()
+    for issue in issues:
+        index.add_issue(issue)
+    index.finalize()
+    cards = [normalize_issue(issue, base_url="https://jira.local") for issue in issues]
+    return build_flow_sweep(cards, index, build_status_groups())
+
+
+def _window(start, end):
+    return {"mode": "custom", "label": "x", "start": start, "end": end, "timezone": "UTC"}
+
+
+ISSUES = [
+    _issue(
+        "A-1",
+        "2026-03-01T08:00:00.000+0000",
+        "Done",
+        [
+            ("2026-03-02T08:00:00.000+0000", "Open", "In Progress"),
+            # 同列内的状态变化不产生事件
+            ("2026-03-02T09:00:00.000+0000", "In Progress", "Testing"),
+            ("2026-03-03T08:00:00.000+0000", "Testing", "Done"),
+        ],
+    ),
+    _issue("A-2", "2026-03-02T12:00:00.000+0000", "Open", []),
+    _issue("A-3", "2026-02-20T00:00:00.000+0000", "In Review", [("2026-03-01T01:00:00.000+0000", "Open", "In Review")]),
+]
+
+
+def test_daily_cfd_replays_column_moves_once():
+    sweep = _sweep(ISSUES)
+    assert len(sweep.times) == 6
+
+    engine = PeriodEngine(timezone="UTC")
+    cfd = build_cfd(
+        sweep,
+        _window(datetime(2026, 3, 1, tzinfo=timezone.utc), datetime(2026, 3, 5, tzinfo=timezone.utc)),
+        engine=engine,
+        now=datetime(2026, 3, 10, tzinfo=timezone.utc),
+    )
+    assert cfd["columns"] == ["To Do", "In Progress", "审核中", "Done"]
+    assert [point["at"][:10] for point in cfd["points"]] == ["2026-03-01", "2026-03-02", "2026-03-03", "2026-03-04"]
+    assert [list(point["counts"].values()) for point in cfd["points"]] == [
+        [1, 0, 1, 0],
+        [1, 1, 1, 0],
+        [1, 0, 1, 1],
+        [1, 0, 1, 1],
+    ]
+
+
+def test_hourly_cfd_stops_at_now_and_rejects_oversized_windows():
+    sweep = _sweep(ISSUES)
+    engine = PeriodEngine(timezone="UTC")
+    now = datetime(2026, 3, 2, 10, 30, tzinfo=timezone.utc)
+    cfd = build_cfd(
+        sweep,
+        _window(datetime(2026, 3, 2, 6, tzinfo=timezone.utc), datetime(2026, 3, 2, 18, tzinfo=timezone.utc)),
+        granularity="hour",
+        engine=engine,
+        now=now,
+    )
+    assert len(cfd["points"]) == 5
+    assert cfd["points"][2]["counts"]["In Progress"] == 1
+
+    with pytest.raises(ValueError):
+        build_cfd(sweep, _window(datetime(2025, 11, 1, tzinfo=timezone.utc), now), granularity="hour", engine=engine)
+    with pytest.raises(ValueError):
+        build_cfd(sweep, _window(datetime(2026, 3, 1, tzinfo=timezone.utc), now), granularity="week")
+
+
+def test_sweep_sample_matches_naive_replay():
+    rng = np.random.default_rng(5)
+    statuses = ["Open", "In Progress", "In Review", "Done"]
+    issues = []
+    for number in range(200):
+        created = 1_772_323_200 + int(rng.integers(0, 20 * 86400))
+        moves = []
+        at, status = created, "Open"
+        for _ in range(int(rng.integers(0, 5))):
+            at += int(rng.integers(600, 3 * 86400))
+            new = statuses[int(rng.integers(0, 4))]
+            moves.append((at, status, new))
+            status = new
+        iso = lambda ts: datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+        issues.append(
+            (_issue(f"R-{number}", iso(created), status, [(iso(at), old, new) for at, old, new in moves]), created, moves)
+        )
+    sweep = _sweep([issue for issue, _, _ in issues])
+
+    probes = np.arange(1_772_323_200, 1_772_323_200 + 40 * 86400, 86400 / 3)
+    sampled = sweep.sample(probes)
+    column_of = {"Open": 0, "In Progress": 1, "In Review": 2, "Done": 3}
+    for row, probe in zip(sampled, probes):
+        expected = [0, 0, 0, 0]
+        for _, created, moves in issues:
+            if created >= probe:
+                continue
+            status = "Open"
+            for at, _, new in moves:
+                if at < probe:
+                    status = new
+            expected[column_of[status]] += 1
+        assert row.tolist() == expected
@@ -2,7 +2,7 @@ from pathlib import Path
 
 import pytest
 
-from app.config import load_config, normalize_task_owner_field_id
+from app.config import CachedConfig, config_fingerprint, load_config, normalize_task_owner_field_id
 
 
 def test_load_config_reads_password_and_jql_filters(tmp_path: Path):
@@ -197,3 +197,169 @@ jql_filters:
     )
     cfg = load_config(str(file))
     assert cfg["task_owner_field"] == "customfield_12345"
+
+
+def test_load_config_cache_settings_default_and_validation(tmp_path: Path):
+    file = tmp_path / "jira_auth.yaml"
+    file.write_text("base_url: https://jira.example.com/\nusername: u\npassword: p\n", encoding="utf-8")
+    assert load_config(str(file))["cache_settings"]["backend"] == "json"
+    assert load_config(str(file))["cache_settings"]["layout"] == "single"
+
+    file.write_text(
+        "base_url: https://jira.example.com/\nusername: u\npassword: p\ncache_settings:\n  backend: SQLite\n",
+        encoding="utf-8",
+    )
+    assert load_config(str(file))["cache_settings"]["backend"] == "sqlite"
+
+    file.write_text(
+        "base_url: https://jira.example.com/\nusername: u\npassword: p\ncache_settings:\n  backend: redis\n",
+        encoding="utf-8",
+    )
+    with pytest.raises(ValueError):
+        load_config(str(file))
+
+    file.write_text(
+        "base_url: https://jira.example.com/\nusername: u\npassword: p\ncache_settings:\n  layout: Chunked\n  page_size: 200\n",
+        encoding="utf-8",
+    )
+    settings = load_config(str(file))["cache_settings"]
+    assert (settings["layout"], settings["page_size"], settings["load_workers"]) == ("chunked", 200, None)
+
+    file.write_text(
+        "base_url: https://jira.example.com/\nusername: u\npassword: p\ncache_settings:\n  layout: sharded\n",
+        encoding="utf-8",
+    )
+    with pytest.raises(ValueError):
+        load_config(str(file))
+
+
+def test_load_config_parses_result_cache_limits(tmp_path: Path):
+    file = tmp_path / "jira_auth.yaml"
+    file.write_text("base_url: https://jira.example.com/\nusername: u\npassword: p\n", encoding="utf-8")
+    assert load_config(str(file))["cache_settings"]["results"] == {
+        "max_entries": 128,
+        "max_bytes": 64 * 1024 * 1024,
+        "window_bucket_seconds": 300,
+    }
+
+    file.write_text(
+        "base_url: https://jira.example.com/\nusername: u\npassword: p\n"
+        "cache_settings:\n  results:\n    max_entries: 16\n    window_bucket_seconds: 60\n",
+        encoding="utf-8",
+    )
+    results = load_config(str(file))["cache_settings"]["results"]
+    assert (results["max_entries"], results["window_bucket_seconds"]) == (16, 60)
+
+    file.write_text(
+        "base_url: https://jira.example.com/\nusername: u\npassword: p\ncache_settings:\n  results:\n    max_bytes: lots\n",
+        encoding="utf-8",
+    )
+    with pytest.raises(ValueError):
+        load_config(str(file))
+
+
+def test_load_config_parses_cache_retention(tmp_path: Path):
+    file = tmp_path / "jira_auth.yaml"
+    file.write_text(
+        """
+base_url: https://jira.example.com/
+username: u
+password: p
+cache_settings:
+  retention:
+    max_total_bytes: 500000000
+    max_age_days: 30
+    max_per_jql: 0
+""".strip(),
+        encoding="utf-8",
+    )
+    retention = load_config(str(file))["cache_settings"]["retention"]
+    assert retention == {"max_total_bytes": 500000000, "max_age_days": 30.0, "max_per_jql": None}
+
+    file.write_text(
+        "base_url: https://jira.example.com/\nusername: u\npassword: p\ncache_settings:\n  retention:\n    max_age_days: soon\n",
+        encoding="utf-8",
+    )
+    with pytest.raises(ValueError):
+        load_config(str(file))
+
+
+def test_cached_config_reloads_only_when_file_changes(tmp_path: Path, caplog):
+    file = tmp_path / "jira_auth.yaml"
+    file.write_text("base_url: https://jira.example.com/\nusername: u\npassword: p\n", encoding="utf-8")
+    cached = CachedConfig(str(file))
+
+    first = cached.get()
+    fingerprint = cached.fingerprint
+    assert cached.get() is first
+    assert cached.fingerprint == fingerprint == config_fingerprint(first)
+
+    file.write_text("base_url: https://jira.example.com/\nusername: u\npassword: changed\n", encoding="utf-8")
+    reloaded = cached.get()
+    assert reloaded is not first
+    assert reloaded["password"] == "changed"
+    assert cached.fingerprint != fingerprint
+
+    # 改坏后继续使用上一次成功加载的配置并记录错误
+    file.write_text("base_url: https://jira.example.com/\nusername: u\n", encoding="utf-8")
+    with caplog.at_level("ERROR", logger="app.config"):
+        assert cached.get() is reloaded
+    assert cached.fingerprint == config_fingerprint(reloaded)
+    assert "Missing required config keys" in caplog.text
+    file.write_text("base_url: [unclosed\n", encoding="utf-8")
+    assert cached.get() is reloaded
+    file.write_text("base_url: https://jira.example.com/\nusername: u\npassword: fixed!\n", encoding="utf-8")
+    assert cached.get()["password"] == "fixed!"
+
+    # 从未成功加载过时才抛出
+    broken = tmp_path / "broken.yaml"
+    broken.write_text("base_url: https://jira.example.com/\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        CachedConfig(str(broken)).get()
+    with pytest.raises(FileNotFoundError):
+        CachedConfig(str(tmp_path / "missing.yaml")).get()
+
+
+def test_load_config_parses_period_settings(tmp_path: Path):
+    file = tmp_path / "jira_auth.yaml"
+    file.write_text("base_url: https://jira.example.com/\nusername: u\npassword: p\n", encoding="utf-8")
+    assert load_config(str(file))["period_settings"] == {"timezone": None, "week_start": 0}
+
+    file.write_text(
+        "base_url: https://jira.example.com/\nusername: u\npassword: p\n"
+        "period_settings:\n  timezone: Asia/Shanghai\n  week_start: Sunday\n",
+        encoding="utf-8",
+    )
+    assert load_config(str(file))["period_settings"] == {"timezone": "Asia/Shanghai", "week_start": 6}
+
+    file.write_text(
+        "base_url: https://jira.example.com/\nusername: u\npassword: p\nperiod_settings:\n  timezone: Mars/Olympus\n",
+        encoding="utf-8",
+    )
+    with pytest.raises(ValueError):
+        load_config(str(file))
+
+
+def test_load_config_parses_working_calendar(tmp_path: Path):
+    file = tmp_path / "jira_auth.yaml"
+    file.write_text(
+        "base_url: https://jira.example.com/\nusername: u\npassword: p\n"
+        "working_calendar:\n"
+        "  hours: ['09:00-12:00', '13:30-18:30']\n"
+        "  holidays: [2026-10-01..2026-10-03, 2026-01-01]\n"
+        "  makeup_workdays: [2026-10-10]\n",
+        encoding="utf-8",
+    )
+    assert load_config(str(file))["working_calendar"] == {
+        "workdays": [0, 1, 2, 3, 4],
+        "hours": ["09:00-12:00", "13:30-18:30"],
+        "holidays": ["2026-01-01", "2026-10-01", "2026-10-02", "2026-10-03"],
+        "makeup_workdays": ["2026-10-10"],
+    }
+
+    file.write_text(
+        "base_url: https://jira.example.com/\nusername: u\npassword: p\nworking_calendar:\n  hours: 25:00-26:00\n",
+        encoding="utf-8",
+    )
+    with pytest.raises(ValueError):
+        load_config(str(file))
@@ -0,0 +1,103 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.event_index import EventIndex, EventIndexCache, cards_as_of, parse_as_of
+from app.normalize import normalize_issue
+
+
+def _issue():
+    return {
+        "key": "ABC-7",
+        "fields": {
+            "summary": "Scrub me",
+            "status": {"name": "Done"},
+            "priority": {"name": "High"},
+            "issuetype": {"name": "Task"},
+            "assignee": {"displayName": "Carol", "name": "carol"},
+            "created": "2026-03-01T08:00:00.000+0000",
+        },
+        "changelog": {
+            "histories": [
+                {
+                    "created": "2026-03-02T08:00:00.000+0000",
+                    "items": [
+                        {"field": "assignee", "from": None, "to": "bob", "toString": "Bob"},
+                        {"field": "status", "fromString": "Open", "toString": "In Progress"},
+                    ],
+                },
+                {
+                    "created": "2026-03-04T08:00:00.000+0000",
+                    "items": [{"field": "resolution", "toString": "Fixed"}, {"field": "status", "fromString": "In Progress", "toString": "Done"}],
+                },
+                {
+                    "created": "2026-03-05T08:00:00.000+0000",
+                    "items": [{"field": "assignee", "from": "bob", "to": "carol", "fromString": "Bob", "toString": "Carol"}],
+                },
+            ]
+        },
+    }
+
+
+def _at(day, hour=12):
+    return datetime(2026, 3, day, hour, tzinfo=timezone.utc)
+
+
+def _scrub(as_of):
+    issue = _issue()
+    index = EventIndex()
+    index.add_issue(issue)
+    index.finalize()
+    cards = [normalize_issue(issue, base_url="https://jira.local")]
+    return index, cards_as_of(cards, index, as_of)
+
+
+def test_index_keeps_only_board_fields_in_time_order():
+    index, _ = _scrub(_at(9))
+    assert [(event[2], event[5]) for event in index.events] == [
+        ("assignee", "Bob"),
+        ("status", "In Progress"),
+        ("status", "Done"),
+        ("assignee", "Carol"),
+    ]
+
+
+def test_cards_as_of_reconstructs_column_owner_and_timeline():
+    _, before_work = _scrub(_at(1, 20))
+    assert before_work[0]["column"] == "To Do"
+    assert before_work[0]["status"] == "Open"
+    assert before_work[0]["assignee"] == "Unassigned"
+
+    _, in_progress = _scrub(_at(3))
+    card = in_progress[0]
+    assert card["column"] == "In Progress"
+    assert card["assignee"] == "Bob"
+    assert card["metric_owner"] == "Bob"
+    assert card["timeline"]["resolved_at"] is None
+
+    _, resolved = _scrub(_at(4, 9))
+    assert resolved[0]["column"] == "Done"
+    assert resolved[0]["assignee"] == "Bob"
+    assert resolved[0]["timeline"]["resolved_at"] == "2026-03-04T08:00:00.000+0000"
+
+
+def test_cards_created_after_as_of_are_dropped():
+    _, cards = _scrub(datetime(2026, 2, 28, tzinfo=timezone.utc))
+    assert cards == []
+
+
+def test_parse_as_of_accepts_dates_and_rejects_garbage():
+    assert parse_as_of(None) is None
+    assert parse_as_of("2026-03-06").tzinfo is not None
+    with pytest.raises(ValueError):
+        parse_as_of("last friday")
+
+
+def test_event_index_cache_invalidates_on_version_change():
+    cache = EventIndexCache(max_entries=1)
+    index = EventIndex().finalize()
+    cache.put("a", "v1", index)
+    assert cache.get("a", "v1") is index
+    assert cache.get("a", "v2") is None
+    cache.put("b", "v1", index)
+    assert cache.get("a", "v1") is None
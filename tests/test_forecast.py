@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from app.forecast import build_forecast, daily_throughput_history, simulate_completion_days
+from app.period import PeriodEngine
+from app.throughput import ThroughputCounters
+
+
+NOW = datetime(2026, 3, 11, 4, tzinfo=timezone.utc)
+
+
+def _resolved(key, owner, resolved):
+    return {
+        "key": key,
+        "assignee": owner,
+        "metric_owner": owner,
+        "timeline": {"created_at": "2026-02-01T02:00:00+00:00", "resolved_at": resolved},
+    }
+
+
+def _counters():
+    cards = [_resolved(f"A-{day}", "Alice", f"2026-03-{day:02d}T02:00:00+00:00") for day in range(1, 11)]
+    cards += [_resolved("B-1", "Bob", "2026-03-10T02:00:00+00:00"), _resolved("B-2", "Bob", "2026-03-11T02:00:00+00:00")]
+    return ThroughputCounters.build(cards, PeriodEngine(timezone="Asia/Shanghai"))
+
+
+def test_history_covers_completed_days_before_today():
+    counters = _counters()
+    today = datetime(2026, 3, 11).toordinal()
+
+    # 今天（3 月 11 日）尚未结束，不计入；3 月 10 日 Alice 与 Bob 各解决一个
+    assert daily_throughput_history(counters, today, 3).tolist() == [1, 1, 2]
+    assert daily_throughput_history(counters, today, 3, owners=["Bob"]).tolist() == [0, 0, 1]
+
+
+def test_simulation_is_exact_for_constant_throughput():
+    days = simulate_completion_days(np.array([2]), remaining=7, trials=500, rng=np.random.default_rng(1))
+    assert set(days.tolist()) == {4}
+
+    assert simulate_completion_days(np.array([0, 0]), remaining=3, trials=10).tolist() == [np.inf] * 10
+    assert simulate_completion_days(np.array([1]), remaining=0, trials=3).tolist() == [0, 0, 0]
+
+
+def test_simulation_runs_across_chunks_and_stops_at_horizon():
+    # 大约每 20 天解决一个：10 个问题需要跨多个 64 天的抽样块
+    history = np.array([1] + [0] * 19)
+    days = simulate_completion_days(history, remaining=10, trials=2000, max_days=730, rng=np.random.default_rng(7))
+    assert np.isfinite(days).all()
+    assert 150 < np.median(days) < 250
+
+    capped = simulate_completion_days(history, remaining=10, trials=200, max_days=30, rng=np.random.default_rng(7))
+    assert not np.isfinite(capped).any()
+
+
+def test_forecast_percentiles_and_dates():
+    report = build_forecast(_counters(), remaining=5, owners=["Alice"], history_days=10, now=NOW, seed=3)
+
+    assert report["history"] == {
+        "start": "2026-03-01",
+        "end": "2026-03-10",
+        "days": 10,
+        "resolved": 10,
+        "mean_daily_throughput": 1.0,
+    }
+    # 历史每天恰好解决 1 个：所有试验都在第 5 天完成
+    assert report["forecast"] == [
+        {"percentile": 50, "days": 5, "date": "2026-03-16"},
+        {"percentile": 85, "days": 5, "date": "2026-03-16"},
+        {"percentile": 95, "days": 5, "date": "2026-03-16"},
+    ]
+    assert report["completed_within_horizon"] == 1.0
+
+    stalled = build_forecast(_counters(), remaining=5, owners=["Carol"], now=NOW, seed=3)
+    assert stalled["forecast"][0] == {"percentile": 50, "days": None, "date": None}
+    assert stalled["completed_within_horizon"] == 0.0
+
+    with pytest.raises(ValueError):
+        build_forecast(_counters(), remaining=5, trials=0, now=NOW)
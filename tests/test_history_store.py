@@ -0,0 +1,120 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+
+from app.history_store import TeamHistoryStore, decode_rows, downsample_rows, encode_rows
+from app.period import PeriodEngine, parse_week_start
+
+
+def _card(key, owner, column, created_at=None, resolved_at=None, reopened=None):
+    return {
+        "key": key,
+        "assignee": owner,
+        "metric_owner": owner,
+        "column": column,
+        "timeline": {
+            "created_at": created_at,
+            "resolved_at": resolved_at,
+            "reopened_events": reopened or [],
+        },
+    }
+
+
+TEAMS = [{"id": "algo", "name": "算法组", "owner": "Bob", "members": ["Alice"]}]
+
+
+def test_encode_decode_roundtrip_keeps_only_changes():
+    rows = [
+        ("2026-03-02", "d", {"todo": 5, "done": 2}),
+        ("2026-03-03", "d", {"todo": 4, "done": 3}),
+        ("2026-03-04", "d", {"done": 3}),
+    ]
+    encoded = encode_rows(rows)
+    assert encoded[1] == ["2026-03-03", "d", {"done": 1, "todo": -1}]
+    assert encoded[2] == ["2026-03-04", "d", {"todo": -4}]
+    assert decode_rows(encoded) == rows
+
+
+def test_downsample_collapses_old_days_into_weeks():
+    rows = [
+        ("2026-01-05", "d", {"todo": 3, "created": 1}),
+        ("2026-01-07", "d", {"todo": 2, "created": 2}),
+        ("2026-06-01", "d", {"todo": 1}),
+    ]
+    result = downsample_rows(rows, today=date(2026, 6, 1), daily_retention_days=90)
+    assert result == [
+        ("2026-01-05", "w", {"todo": 2, "created": 3}),
+        ("2026-06-01", "d", {"todo": 1}),
+    ]
+
+
+def test_daily_syncs_across_cutoff_keep_one_row_per_week(tmp_path):
+    store = TeamHistoryStore(tmp_path / "team_issue_history.json")
+    start = datetime(2026, 1, 5, 12, 0, tzinfo=timezone.utc)
+    for offset in range(200):
+        now = start + timedelta(days=offset)
+        cards = [_card(f"A-{offset}", "Alice", "To Do", created_at=(now - timedelta(hours=1)).isoformat())] + [
+            _card(f"B-{index}", "Bob", "Done") for index in range(offset % 3)
+        ]
+        store.record_snapshot("c1", "(project = TEST)", cards, now=now)
+
+    document = json.loads((tmp_path / "team_issue_history.json").read_text(encoding="utf-8"))
+    rows = decode_rows(document["snapshots"]["c1"]["scopes"]["board"])
+    weekly = [day for day, period, _ in rows if period == "w"]
+    assert len(weekly) == len(set(weekly))
+    # 保留期内 90 天 + 之前的每周一行
+    assert len(rows) <= 90 + 1 + (200 - 90) // 7 + 1
+    # 存量取周内最后一天（周日 offset=6：无 Done），流量按周求和（每天新建 1 个）
+    assert rows[0] == ("2026-01-05", "w", {"todo": 1, "total": 1, "created": 7})
+
+
+def test_record_snapshot_tracks_board_team_and_owner_scopes(tmp_path):
+    path = tmp_path / "team_issue_history.json"
+    path.write_text(json.dumps({"updated_at": None, "queries": {"legacy": 1}}), encoding="utf-8")
+    store = TeamHistoryStore(path)
+    tz = timezone.utc
+    day_one = datetime(2026, 3, 2, 18, 0, tzinfo=tz)
+    cards = [
+        _card("A-1", "Alice", "In Progress", created_at="2026-03-02T09:00:00+00:00"),
+        _card("A-2", "Carol", "Done", resolved_at="2026-03-02T10:00:00+00:00"),
+    ]
+    store.record_snapshot("c1", "(project = TEST)", cards, teams=TEAMS, now=day_one)
+
+    # 次日：Alice 的任务完成，同日重复同步只保留最后一次
+    cards[0] = _card("A-1", "Alice", "Done", created_at="2026-03-02T09:00:00+00:00", resolved_at="2026-03-03T08:00:00+00:00")
+    store.record_snapshot("c1", "(project = TEST)", cards, teams=TEAMS, now=day_one + timedelta(days=1))
+    store.record_snapshot("c1", "(project = TEST)", cards, teams=TEAMS, now=day_one + timedelta(days=1, hours=1))
+
+    document = json.loads(path.read_text(encoding="utf-8"))
+    assert document["queries"] == {"legacy": 1}
+    assert store.scopes("c1") == ["board", "owner:Alice", "owner:Carol", "team:algo"]
+
+    trend = store.trend("c1", scope="team:algo", weeks=2, now=day_one + timedelta(days=1))
+    assert trend[0]["snapshot_count"] == 0
+    assert trend[0]["total"] is None
+    assert trend[-1]["week_start"] == "2026-03-02"
+    assert trend[-1]["snapshot_count"] == 2
+    assert trend[-1]["done"] == 1
+    assert trend[-1]["wip"] == 0
+    assert trend[-1]["created"] == 1
+    assert trend[-1]["resolved"] == 1
+
+    board = store.trend("c1", weeks=1, now=day_one + timedelta(days=1))[0]
+    assert board["total"] == 2
+    assert board["resolved"] == 2
+
+
+def test_snapshot_days_and_trend_weeks_follow_period_settings(tmp_path):
+    store = TeamHistoryStore(tmp_path / "team_issue_history.json")
+    period = PeriodEngine(timezone="Asia/Shanghai", week_start=parse_week_start("sunday"))
+    # UTC 周日 20:00 = 上海周一 04:00：快照记在上海的 3 月 2 日，流量从当地零点起算
+    now = datetime(2026, 3, 1, 20, 0, tzinfo=timezone.utc)
+    cards = [_card("A-1", "Alice", "To Do", created_at="2026-03-01T17:00:00+00:00")]
+    store.record_snapshot("c1", "(project = TEST)", cards, now=now, period=period)
+
+    document = json.loads((tmp_path / "team_issue_history.json").read_text(encoding="utf-8"))
+    rows = decode_rows(document["snapshots"]["c1"]["scopes"]["board"])
+    assert rows == [("2026-03-02", "d", {"todo": 1, "total": 1, "created": 1})]
+
+    trend = store.trend("c1", weeks=1, now=now, period=period)
+    assert trend[0]["week_start"] == "2026-03-01"
+    assert trend[0]["created"] == 1
@@ -0,0 +1,111 @@
+import json
+
+from app.ingest_prune import PRUNE_RULES_VERSION, needs_upgrade, prune_issue, upgrade_payload
+from app.normalize import normalize_issue
+
+
+def _user(name):
+    return {
+        "self": f"https://jira.local/rest/api/2/user?username={name.lower()}",
+        "name": name.lower(),
+        "key": name.lower(),
+        "displayName": name,
+        "emailAddress": f"{name.lower()}@example.com",
+        "avatarUrls": {size: f"https://jira.local/avatar/{size}" for size in ("16x16", "24x24", "32x32", "48x48")},
+        "active": True,
+        "timeZone": "Asia/Shanghai",
+    }
+
+
+def _raw_issue():
+    noise = [
+        {
+            "id": str(100 + index),
+            "author": _user("Bot"),
+            "created": f"2026-02-0{index % 9 + 1}T09:00:00.000+0000",
+            "items": [{"field": "description", "fieldtype": "jira", "from": None, "fromString": "x" * 200, "toString": "y" * 200}],
+        }
+        for index in range(20)
+    ]
+    return {
+        "id": "10001",
+        "self": "https://jira.local/rest/api/2/issue/10001",
+        "key": "ABC-1",
+        "fields": {
+            "summary": "Fix bug",
+            "status": {"self": "https://jira.local/status/3", "name": "Done", "iconUrl": "x", "statusCategory": {"key": "done"}},
+            "priority": {"self": "https://jira.local/priority/2", "name": "High", "iconUrl": "x", "id": "2"},
+            "issuetype": {"self": "https://jira.local/type/1", "name": "Bug", "iconUrl": "x", "avatarId": 1},
+            "assignee": _user("Alice"),
+            "created": "2026-02-01T08:00:00.000+0000",
+            "updated": "2026-02-05T08:00:00.000+0000",
+            "resolutiondate": "2026-02-04T08:00:00.000+0000",
+            "description": "example",
+            "customfield_10400": _user("Carol"),
+        },
+        "changelog": {
+            "startAt": 0,
+            "histories": [
+                *noise,
+                {
+                    "id": "1",
+                    "author": _user("Bob"),
+                    "created": "2026-02-02T08:00:00.000+0000",
+                    "items": [
+                        {"field": "assignee", "fieldtype": "jira", "from": None, "to": "alice", "toString": "Alice"},
+                        {"field": "Sprint", "fieldtype": "custom", "toString": "Sprint 11"},
+                    ],
+                },
+                {
+                    "id": "2",
+                    "author": _user("Bob"),
+                    "created": "2026-02-04T08:00:00.000+0000",
+                    "items": [
+                        {"field": "status", "fieldtype": "jira", "from": "3", "fromString": "In Progress", "to": "10001", "toString": "Done"},
+                        {"field": "任务负责人", "fieldtype": "custom", "toString": "Carol"},
+                    ],
+                },
+            ],
+        },
+    }
+
+
+def test_prune_keeps_only_what_the_normalizer_reads():
+    raw = _raw_issue()
+    pruned = prune_issue(raw, task_owner_field="customfield_10400")
+
+    assert [history["id"] for history in pruned["changelog"]["histories"]] == ["1", "2"]
+    assert pruned["changelog"]["histories"][0]["items"] == [{"field": "assignee", "to": "alice", "toString": "Alice"}]
+    assert pruned["fields"]["assignee"] == {"key": "alice", "name": "alice", "displayName": "Alice"}
+    assert "avatarUrls" not in pruned["fields"]["customfield_10400"]
+    assert "self" not in pruned
+
+    for task_owner_field in ("customfield_10400", None):
+        assert normalize_issue(pruned, "https://jira.local", task_owner_field=task_owner_field) == normalize_issue(
+            raw, "https://jira.local", task_owner_field=task_owner_field
+        )
+    assert len(json.dumps(pruned)) * 5 < len(json.dumps(raw))
+
+
+def test_upgrade_payload_is_versioned():
+    legacy = {"jql_preview": "(project = TEST)", "issues": [_raw_issue()]}
+    assert needs_upgrade(legacy)
+
+    upgraded = upgrade_payload(legacy)
+    assert upgraded["prune_version"] == PRUNE_RULES_VERSION
+    assert not needs_upgrade(upgraded)
+    assert upgrade_payload(upgraded) is upgraded
+
+
+def test_prune_keeps_sprint_board_ids():
+    raw = _raw_issue()
+    raw["fields"]["customfield_10020"] = [
+        {"id": 7, "self": "https://jira.local/rest/agile/1.0/sprint/7", "name": "S7", "state": "active",
+         "boardId": 3, "goal": "ship", "startDate": "2026-02-02T00:00:00.000Z", "endDate": "2026-02-16T00:00:00.000Z"},
+        {"id": 6, "name": "S6", "state": "closed", "originBoardId": 4, "completeDate": "2026-02-01T00:00:00.000Z"},
+    ]
+    pruned = prune_issue(raw, sprint_field="customfield_10020")
+
+    normalized = normalize_issue(pruned, "https://jira.local", sprint_field="customfield_10020")
+    assert normalized == normalize_issue(raw, "https://jira.local", sprint_field="customfield_10020")
+    assert [sprint["board_id"] for sprint in normalized["sprints"]] == [3, 4]
@@ -1,4 +1,11 @@
-from app.metrics import build_gantt_rows, compute_member_metrics
+from app.metrics import (
+    build_gantt_rows,
+    collect_member_stats,
+    compute_member_metrics,
+    compute_team_metrics,
+    rollup_flow_metrics,
+)
+from app.teams import TeamDirectory
 
 
 def test_compute_member_metrics_basic():
@@ -167,3 +174,100 @@ def test_compute_member_metrics_no_exclusion_by_default():
     rows = compute_member_metrics(cards)
     assert len(rows) == 1
     assert rows[0]["assignee"] == "李启沆"
+
+
+def test_member_metrics_report_lead_and_cycle_percentiles():
+    cards = [
+        {
+            "assignee": owner,
+            "column": "Done",
+            "priority": "Medium",
+            "timeline": {
+                "created_at": "2026-02-01T00:00:00+00:00",
+                "developer_started_at": "2026-02-01T12:00:00+00:00",
+                "resolved_at": f"2026-02-{day:02d}T00:00:00+00:00",
+            },
+        }
+        for owner, day in [("Alice", 2), ("Alice", 3), ("Alice", 11), ("Bob", 5)]
+    ]
+
+    stats = collect_member_stats(cards)
+    rows = {row["assignee"]: row for row in compute_member_metrics(cards, stats=stats)}
+    assert rows["Alice"]["lead_time_p50_hours"] == 48.0
+    assert rows["Alice"]["cycle_time_p50_hours"] == 36.0
+    assert rows["Alice"]["avg_lead_time_hours"] == 104.0
+    assert rows["Bob"]["lead_time_p95_hours"] == 96.0
+
+    board = rollup_flow_metrics(stats)
+    assert board["issue_count"] == 4
+    assert board["lead_time_p50_hours"] == 72.0
+    assert rollup_flow_metrics(stats, owners=["Bob", "Nobody"])["lead_time_samples"] == 1
+
+
+def _team_card(key, owner, day, column="Done"):
+    return {
+        "key": key,
+        "summary": key,
+        "assignee": owner,
+        "column": column,
+        "priority": "Medium",
+        "status": column,
+        "url": f"http://x/{key}",
+        "timeline": {
+            "created_at": "2026-02-01T00:00:00+00:00",
+            "developer_started_at": "2026-02-01T12:00:00+00:00",
+            "resolved_at": f"2026-02-{day:02d}T00:00:00+00:00" if column == "Done" else None,
+        },
+    }
+
+
+def test_team_metrics_merge_member_stats():
+    cards = [
+        _team_card("A-1", "Alice", 2),
+        _team_card("A-2", "Alice", 11),
+        _team_card("B-1", "Bob", 5),
+        _team_card("C-1", "Carol", 3, column="In Progress"),
+    ]
+    directory = TeamDirectory(
+        [
+            {"id": "algo", "name": "算法组", "owner": "Bob", "members": ["alice"]},
+            {"id": "web", "name": "Web", "members": ["Alice", "Carol"]},
+            {"id": "empty", "members": ["Nobody"]},
+        ]
+    )
+    stats = collect_member_stats(cards)
+    rows = {row["team"]: row for row in compute_team_metrics(stats, directory)}
+
+    assert rows["algo"]["name"] == "算法组"
+    assert rows["algo"]["members"] == ["Alice", "Bob"]
+    assert rows["algo"]["total"] == 3
+    assert rows["algo"]["resolved"] == 3
+    # 合并草图与直接按三张卡计算一致
+    assert rows["algo"]["lead_time_p50_hours"] == rollup_flow_metrics(stats, owners=["Alice", "Bob"])["lead_time_p50_hours"]
+    assert rows["web"]["wip"] == 1
+    assert rows["web"]["resolution_rate"] == 66.67
+    assert rows["empty"]["total"] == 0
+    assert rows["empty"]["lead_time_p50_hours"] is None
+    # 合并不修改缓存中的成员统计
+    assert stats["Alice"].total == 2
+
+
+def test_build_gantt_rows_team_mode():
+    cards = [_team_card("A-1", "Alice", 2), _team_card("D-1", "Dave", 3)]
+    directory = TeamDirectory([{"id": "algo", "name": "算法组", "members": ["Alice"]}, {"id": "web", "members": ["Alice"]}])
+
+    rows = build_gantt_rows(cards, mode="team", directory=directory)
+    assert [(row["lane"], row["key"]) for row in rows] == [("No Team", "D-1"), ("web", "A-1"), ("算法组", "A-1")]
+    assert directory.index_cards(cards) == {"algo": [cards[0]], "web": [cards[0]]}
+
+
+def test_team_metrics_exclude_quality_roles_like_member_rows():
+    cards = [_team_card("A-1", "Alice", 2), _team_card("Q-1", "Quinn", 3), _team_card("Q-2", "Quinn", 4)]
+    directory = TeamDirectory([{"id": "algo", "members": ["Alice", "Quinn"]}])
+    stats = collect_member_stats(cards)
+
+    members = compute_member_metrics(cards, exclude_roles={"quinn"}, stats=stats)
+    team = compute_team_metrics(stats, directory, exclude_roles={"quinn"})[0]
+    assert team["members"] == ["Alice"]
+    assert team["total"] == sum(row["total"] for row in members) == 1
+    assert compute_team_metrics(stats, directory)[0]["total"] == 3
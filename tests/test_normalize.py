@@ -1,6 +1,15 @@
 from datetime import datetime, timezone, timedelta
 
-from app.normalize import build_status_groups, determine_column, extract_timeline, filter_cards, normalize_issue, parse_datetime
+from app.normalize import (
+    build_status_groups,
+    determine_column,
+    extract_timeline,
+    filter_cards,
+    filter_spec,
+    normalize_issue,
+    parse_datetime,
+    parse_sprint_field,
+)
 
 
 def test_parse_datetime_handles_offset_without_colon():
@@ -642,3 +651,41 @@ def test_metric_owner_quality_skips_pm_and_dm_in_fallback():
         },
     )
     assert card["metric_owner"] == "开发Y"
+
+
+def test_sprint_field_arrays_parse_into_sprint_ids():
+    server_value = [
+        "com.atlassian.greenhopper.service.sprint.Sprint@1a2b[id=11,rapidViewId=3,state=CLOSED,name=Sprint 11, 修复,"
+        "startDate=2026-01-05T09:00:00.000+08:00,endDate=2026-01-19T09:00:00.000+08:00,"
+        "completeDate=2026-01-19T18:00:00.000+08:00,sequence=11]",
+        "com.atlassian.greenhopper.service.sprint.Sprint@3c4d[id=12,rapidViewId=3,state=ACTIVE,name=Sprint 12,"
+        "startDate=2026-01-19T09:00:00.000+08:00,endDate=2026-02-02T09:00:00.000+08:00,completeDate=<null>,sequence=12]",
+    ]
+    issue = {
+        "key": "S-1",
+        "fields": {
+            "summary": "sprint",
+            "status": {"name": "Open"},
+            "priority": {"name": "Low"},
+            "issuetype": {"name": "Task"},
+            "created": "2026-01-06T00:00:00.000+0800",
+            "customfield_10020": server_value,
+        },
+    }
+
+    card = normalize_issue(issue, base_url="https://jira.local", sprint_field="customfield_10020")
+    assert card["sprint_ids"] == [11, 12]
+    assert card["sprint"] == "Sprint 12"
+    assert card["sprints"][0]["name"] == "Sprint 11, 修复"
+    assert card["sprints"][0]["board_id"] == 3
+    assert card["sprints"][1]["state"] == "active"
+    assert card["sprints"][1]["complete_date"] is None
+
+    cloud = parse_sprint_field([{"id": 7, "name": "S7", "state": "closed", "boardId": 2, "startDate": "2026-01-01T00:00:00Z"}])
+    assert cloud[0]["id"] == 7 and cloud[0]["board_id"] == 2
+    assert parse_sprint_field({"name": "Sprint 11"})[0]["id"] is None
+
+
+def test_filter_spec_is_canonical_for_cache_keys():
+    assert filter_spec() == ("", "", "", "")
+    assert filter_spec("Alice", None, "Login", "core") == filter_spec("Alice", "", "login", "core")
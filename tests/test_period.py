@@ -0,0 +1,81 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from app.period import BucketEdges, PeriodEngine, parse_week_start, resolve_period_window, to_epochs, trailing_windows
+
+
+def test_calendar_windows_use_team_timezone_and_week_start():
+    engine = PeriodEngine(timezone="Asia/Shanghai", week_start=parse_week_start("sunday"))
+    # 2026-03-01 20:00 UTC 已是上海时间 3 月 2 日（周一）
+    now = datetime(2026, 3, 1, 20, 0, tzinfo=timezone.utc)
+
+    week = resolve_period_window("weekly", None, None, engine=engine)
+    assert week["timezone"] == "Asia/Shanghai"
+    assert engine.window("weekly", now)["start"].isoformat() == "2026-03-01T00:00:00+08:00"
+    assert engine.window("monthly", now)["start"].isoformat() == "2026-03-01T00:00:00+08:00"
+
+    quarters = trailing_windows("quarterly", 3, now=now, engine=engine)
+    assert [row["label"] for row in quarters] == ["2025Q3", "2025Q4", "2026Q1"]
+    assert quarters[-1]["end"].isoformat() == "2026-04-01T00:00:00+08:00"
+
+    months = trailing_windows("monthly", 2, now=now, engine=engine)
+    assert [row["label"] for row in months] == ["2026-02", "2026-03"]
+    assert months[0]["end"] == months[1]["start"]
+
+
+def test_biweekly_edges_are_stable_and_follow_dst():
+    engine = PeriodEngine(timezone="America/New_York")
+    first = engine.window("biweekly", datetime(2026, 3, 3, 12, tzinfo=timezone.utc))
+    second = engine.window("biweekly", datetime(2026, 3, 10, 12, tzinfo=timezone.utc))
+    assert first["start"] == second["start"]
+    assert (first["end"] - first["start"]).days == 14
+
+    # 夏令时 3 月 8 日开始：窗口边界仍是当地零点
+    assert first["start"].utcoffset() != first["end"].utcoffset()
+    assert first["end"].hour == 0
+
+
+def test_bucket_edges_assign_in_one_vectorized_call():
+    engine = PeriodEngine(timezone="UTC")
+    windows = engine.windows("weekly", 3, datetime(2026, 2, 25, tzinfo=timezone.utc))
+    edges = BucketEdges(windows)
+
+    epochs = to_epochs(
+        [
+            "2026-02-09T00:00:00Z",  # 第一个窗口起点
+            "2026-02-22T23:59:59Z",
+            "2026-03-01T23:59:59Z",
+            "2026-03-02T00:00:00Z",  # 最后一个窗口终点（不含）
+            "2026-01-01T00:00:00Z",
+            None,
+        ]
+    )
+    assert edges.assign(epochs).tolist() == [0, 1, 2, -1, -1, -1]
+    assert BucketEdges([]).assign(np.array([1.0])).tolist() == [-1]
+
+    with pytest.raises(ValueError):
+        trailing_windows("daily", 3, engine=engine)
+
+
+def test_boundaries_follow_local_midnights_and_absolute_hours():
+    engine = PeriodEngine(timezone="America/New_York")
+    start = datetime(2026, 3, 7, 17, tzinfo=timezone.utc)
+    days = engine.boundaries(start, datetime(2026, 3, 10, 5, tzinfo=timezone.utc))
+    assert [point.isoformat() for point in days] == [
+        "2026-03-07T00:00:00-05:00",
+        "2026-03-08T00:00:00-05:00",
+        "2026-03-09T00:00:00-04:00",
+        "2026-03-10T00:00:00-04:00",
+        "2026-03-11T00:00:00-04:00",
+    ]
+
+    hours = engine.boundaries(datetime(2026, 3, 8, 6, 30, tzinfo=timezone.utc), datetime(2026, 3, 8, 8, tzinfo=timezone.utc), "hour")
+    assert [point.isoformat() for point in hours] == [
+        "2026-03-08T01:00:00-05:00",
+        "2026-03-08T03:00:00-04:00",
+        "2026-03-08T04:00:00-04:00",
+    ]
+    with pytest.raises(ValueError):
+        engine.boundaries(start, start, "minute")
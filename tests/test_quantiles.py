@@ -0,0 +1,46 @@
+import numpy as np
+
+from app.quantiles import QuantileSketch, merge_sketches
+
+
+def _sketch(values):
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+def test_small_groups_use_exact_percentiles():
+    values = [5.0, 1.0, 9.0, 3.0, 7.0, 40.0]
+    sketch = _sketch(values)
+
+    assert sketch.exact
+    for q in (0.5, 0.85, 0.95):
+        assert sketch.quantile(q) == np.percentile(values, q * 100)
+    assert QuantileSketch().quantile(0.5) is None
+
+
+def test_large_groups_stay_within_rank_error_and_bounded_memory():
+    rng = np.random.default_rng(7)
+    values = rng.lognormal(mean=3.0, sigma=1.0, size=20000)
+    sketch = _sketch(values.tolist())
+
+    assert not sketch.exact
+    assert sum(len(level) for level in sketch._levels) < 1000
+    ordered = np.sort(values)
+    for q in (0.5, 0.85, 0.95):
+        rank = np.searchsorted(ordered, sketch.quantile(q)) / len(values)
+        assert abs(rank - q) < 0.02
+
+
+def test_merged_sketches_match_single_pass():
+    rng = np.random.default_rng(11)
+    parts = [rng.exponential(scale=50.0, size=size).tolist() for size in (300, 4000, 2500)]
+    merged = merge_sketches(_sketch(part) for part in parts)
+    everything = np.sort(np.concatenate(parts))
+
+    assert merged.count == len(everything)
+    for q in (0.5, 0.85, 0.95):
+        rank = np.searchsorted(everything, merged.quantile(q)) / len(everything)
+        assert abs(rank - q) < 0.02
+
@@ -0,0 +1,35 @@
+import numpy as np
+
+from app.result_cache import SummaryCache, estimate_size
+
+
+def test_summary_cache_evicts_by_entries_and_bytes_and_counts_hits():
+    cache = SummaryCache(max_entries=3, max_bytes=1000)
+    cache.put(("a",), {"v": 1}, size=400)
+    cache.put(("b",), {"v": 2}, size=400)
+    assert cache.get(("a",)) == {"v": 1}
+    # 超出字节上限：丢弃最久未使用的 b，而不是刚读过的 a
+    cache.put(("c",), {"v": 3}, size=400)
+    assert cache.get(("b",)) is None
+    assert cache.get(("c",)) == {"v": 3}
+    # 单条超过上限时仍保留刚写入的一条
+    cache.put(("d",), {"v": 4}, size=5000)
+    assert cache.get(("d",)) == {"v": 4}
+
+    assert cache.stats() == {
+        "entries": 1,
+        "bytes": 5000,
+        "max_entries": 3,
+        "max_bytes": 1000,
+        "hits": 3,
+        "misses": 1,
+        "evictions": 3,
+        "hit_rate": 0.75,
+    }
+
+
+def test_estimate_size_counts_arrays_and_scales_sampled_lists():
+    assert estimate_size({"sweep": np.zeros(1000)}) > 8000
+    rows = [{"key": f"K-{index}", "hours": float(index)} for index in range(3200)]
+    full = estimate_size(rows[:32]) * 100
+    assert abs(estimate_size(rows) - full) / full < 0.1
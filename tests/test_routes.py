@@ -1,3 +1,11 @@
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+
+from app.cache_store import JsonCacheStore
+from app.main import create_app
+
+
 def test_cached_queries_route(client):
     response = client.get("/api/cached_queries")
     assert response.status_code == 200
@@ -30,6 +38,7 @@ def test_kanban_route_returns_columns(client):
     assert "manager_summary_cards" in payload
     assert "manager_summary_text" in payload
     assert "period_focus" in payload
+    assert {"lead_time_p85_hours", "cycle_time_p95_hours"} <= set(payload["flow_metrics"])
 
 
 def test_gantt_route_mode_validation(client):
@@ -62,3 +71,402 @@ def test_kanban_supports_custom_window(client):
     assert response.status_code == 200
     payload = response.get_json()
     assert payload["summary_window"]["mode"] == "custom"
+
+
+class ProbingJiraClient:
+    """Fake client that supports the freshness probe and delta sync."""
+
+    def __init__(self, base):
+        self.base = base
+        self.full_calls = 0
+        self.delta_calls = 0
+        self.probe_total = 1
+        self.probe_updated = "2026-02-04T08:00:00.000+00:00"
+
+    def build_search_jql(self, jql=None):
+        return self.base.build_search_jql(jql)
+
+    def probe_freshness(self, jql=None):
+        return {"total": self.probe_total, "max_updated": self.probe_updated}
+
+    def get_issues_by_jql(self, jql=None, updated_since=None):
+        issues = self.base.get_issues_by_jql(jql)
+        for issue in issues:
+            issue["fields"]["updated"] = self.probe_updated
+        if updated_since is None:
+            self.full_calls += 1
+        else:
+            self.delta_calls += 1
+        return issues
+
+
+def test_query_route_skips_sync_when_probe_is_fresh(fake_jira, tmp_path):
+    probing = ProbingJiraClient(fake_jira)
+    client = create_app(jira_client=probing, storage_dir=tmp_path).test_client()
+
+    first = client.post("/api/query?confirmed=true&force=true")
+    assert first.get_json()["sync_status"] == "full"
+
+    second = client.post("/api/query?confirmed=true")
+    assert second.status_code == 200
+    assert second.get_json()["sync_status"] == "skipped: fresh"
+    assert probing.full_calls == 1
+    assert probing.delta_calls == 0
+
+
+def test_fresh_probe_reads_only_the_cache_header_and_writes_nothing(fake_jira, tmp_path, monkeypatch):
+    probing = ProbingJiraClient(fake_jira)
+    client = create_app(jira_client=probing, storage_dir=tmp_path).test_client()
+    client.post("/api/query?confirmed=true&force=true")
+    written = {path: path.stat().st_mtime_ns for path in tmp_path.rglob("*") if path.is_file()}
+
+    def fail_load(self, cache_id):
+        raise AssertionError("full cache loaded on a fresh probe")
+
+    monkeypatch.setattr(JsonCacheStore, "load", fail_load)
+    payload = client.post("/api/query?confirmed=true").get_json()
+    assert payload["sync_status"] == "skipped: fresh"
+    assert payload["issue_count"] == 1
+    assert {path: path.stat().st_mtime_ns for path in tmp_path.rglob("*") if path.is_file()} == written
+
+
+def test_query_route_falls_back_to_delta_sync_when_probe_changed(fake_jira, tmp_path):
+    probing = ProbingJiraClient(fake_jira)
+    client = create_app(jira_client=probing, storage_dir=tmp_path).test_client()
+    client.post("/api/query?confirmed=true&force=true")
+
+    probing.probe_updated = "2026-02-05T08:00:00.000+00:00"
+    response = client.post("/api/query?confirmed=true")
+    payload = response.get_json()
+    assert payload["sync_status"] == "delta"
+    assert payload["issue_count"] == 1
+    assert probing.full_calls == 1
+    assert probing.delta_calls == 1
+
+
+def test_throughput_counters_advance_on_delta_sync(fake_jira, tmp_path):
+    probing = ProbingJiraClient(fake_jira)
+    app = create_app(jira_client=probing, storage_dir=tmp_path)
+    client = app.test_client()
+    client.post("/api/query?confirmed=true&force=true")
+
+    url = "/api/metrics/throughput?bucket=day&start=2026-02-01T00:00:00%2B00:00&end=2026-02-08T00:00:00%2B00:00"
+    first = client.get(url).get_json()
+    assert first["bucket"] == "day"
+    assert len(first["buckets"]) == 7
+    assert sum(first["board"]["arrivals"]) == 1
+    assert first["owners"][0]["owner"] == "Alice"
+    store = app.extensions["throughput_store"]
+    counters = store.get(first["cache_id"], *next(iter(store._entries.values()))[:2])
+
+    probing.probe_updated = "2026-02-05T08:00:00.000+00:00"
+    assert client.post("/api/query?confirmed=true").get_json()["sync_status"] == "delta"
+    second = client.get(url).get_json()
+    assert second["board"] == first["board"]
+    # 增量同步推进了同一份计数，而不是重建
+    assert next(iter(store._entries.values()))[2] is counters
+
+    assert client.get("/api/metrics/throughput?bucket=month").status_code == 400
+
+
+def test_aging_route_and_board_highlight(client):
+    assert client.get("/api/metrics/aging").status_code == 409
+    assert client.post("/api/query?confirmed=true").status_code == 200
+
+    payload = client.get("/api/metrics/aging").get_json()
+    board = client.get("/api/kanban").get_json()
+    wip_keys = {card["key"] for name in ("In Progress", "审核中") for card in board["columns"][name]}
+    assert {row["key"] for row in payload["cards"]} == wip_keys
+    assert payload["summary"]["wip"] == len(wip_keys)
+    assert set(board["aging"]["cards"]) == wip_keys
+    assert board["aging"]["summary"] == payload["summary"]
+
+    assert client.get("/api/metrics/aging?time_basis=business").get_json()["time_basis"] == "business"
+    assert client.get("/api/metrics/aging?team=algo").status_code == 404
+    assert client.get("/api/metrics/aging?time_basis=lunar").status_code == 400
+
+
+def test_forecast_route_scopes_and_caches(client):
+    assert client.get("/api/metrics/forecast").status_code == 409
+    assert client.post("/api/query?confirmed=true").status_code == 200
+
+    board = client.get("/api/metrics/forecast?history_days=365&trials=2000").get_json()
+    kanban = client.get("/api/kanban").get_json()
+    assert board["scope"] == {"kind": "board", "id": None}
+    assert board["remaining"] == sum(len(kanban["columns"][name]) for name in ("To Do", "In Progress", "审核中"))
+    assert [row["percentile"] for row in board["forecast"]] == [50, 85, 95]
+    # 同一（缓存版本, 范围）重复请求结果一致
+    assert client.get("/api/metrics/forecast?history_days=365&trials=2000").get_json() == board
+
+    owner = client.get("/api/metrics/forecast?owner=Nobody&remaining=3").get_json()
+    assert owner["scope"] == {"kind": "owner", "id": "Nobody"}
+    assert owner["remaining"] == 3
+    assert owner["forecast"][0]["date"] is None
+
+    assert client.get("/api/metrics/forecast?team=algo").status_code == 404
+    assert client.get("/api/metrics/forecast?team=algo&owner=Alice").status_code == 400
+    assert client.get("/api/metrics/forecast?trials=many").status_code == 400
+    assert client.get("/api/metrics/forecast?trials=0").status_code == 400
+
+
+def test_history_trend_route_reads_recorded_snapshots(client):
+    client.get("/api/query?confirmed=true")
+
+    response = client.get("/api/history/trend?weeks=4")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert "board" in body["scopes"]
+    assert "owner:Alice" in body["scopes"]
+    assert len(body["weeks"]) == 4
+    assert body["weeks"][-1]["total"] == 1
+    assert body["weeks"][-1]["snapshot_count"] == 1
+    assert client.get("/api/history/trend?weeks=abc").status_code == 400
+
+
+def test_kanban_as_of_reconstructs_past_board(client):
+    client.get("/api/query?confirmed=true")
+
+    current = client.get("/api/kanban").get_json()
+    assert current["as_of"] is None
+    assert [card["key"] for card in current["columns"]["In Progress"]] == ["ABC-1"]
+
+    past = client.get("/api/kanban?as_of=2026-02-05T12:00:00%2B00:00").get_json()
+    assert past["as_of"].startswith("2026-02-05T12:00:00")
+    assert [card["key"] for card in past["columns"]["Done"]] == ["ABC-1"]
+
+    earlier = client.get("/api/kanban?as_of=2026-02-01T12:00:00%2B00:00").get_json()
+    assert [card["key"] for card in earlier["columns"]["To Do"]] == ["ABC-1"]
+
+    before_created = client.get("/api/gantt?as_of=2026-01-01").get_json()
+    assert before_created["rows"] == []
+    assert client.get("/api/kanban?as_of=yesterday").status_code == 400
+
+
+def test_as_of_reuses_event_index_built_during_sync(client, monkeypatch):
+    client.get("/api/query?confirmed=true")
+
+    def fail_iter(self, cache_id):
+        raise AssertionError("as_of should not re-read the cache to build the event index")
+
+    monkeypatch.setattr(JsonCacheStore, "iter_issues", fail_iter)
+    past = client.get("/api/kanban?as_of=2026-02-05T12:00:00%2B00:00").get_json()
+    assert [card["key"] for card in past["columns"]["Done"]] == ["ABC-1"]
+
+
+def test_diff_route_compares_consecutive_syncs(client, fake_jira):
+    client.get("/api/query?confirmed=true")
+    cache_id = hashlib.sha256("(project = TEST)".encode("utf-8")).hexdigest()
+
+    original = fake_jira.get_issues_by_jql
+
+    def escalated(jql=None):
+        issues = original(jql)
+        issues[0]["fields"]["priority"] = {"name": "Highest"}
+        issues[0]["fields"]["status"] = {"name": "Done"}
+        return issues
+
+    fake_jira.get_issues_by_jql = escalated
+    client.get("/api/query?confirmed=true&force=true")
+
+    body = client.get(f"/api/diff?from={cache_id}&to={cache_id}").get_json()
+    assert body["from"]["revision"] == 1
+    assert body["to"]["revision"] == 2
+    assert body["summary"]["resolved"] == 1
+    assert body["summary"]["priority_escalated"] == 1
+    assert body["text"].startswith("【同步变化 (2)】")
+
+    kanban = client.get("/api/kanban?include_changes=true").get_json()
+    assert "【同步变化 (2)】" in kanban["manager_summary_text"]
+    assert client.get(f"/api/diff?from={cache_id}@9&to={cache_id}").status_code == 404
+    assert client.get("/api/diff?from=bogus").status_code == 400
+
+
+def test_query_prunes_payload_before_caching(client, fake_jira, tmp_path):
+    original = fake_jira.get_issues_by_jql
+
+    def noisy(jql=None):
+        issues = original(jql)
+        issues[0]["changelog"]["histories"].append(
+            {"created": "2026-02-05T08:00:00.000+00:00", "items": [{"field": "Sprint", "toString": "Sprint 12"}]}
+        )
+        return issues
+
+    fake_jira.get_issues_by_jql = noisy
+    client.get("/api/query?confirmed=true")
+    cached = json.loads(next((tmp_path / "jira_query_cache").glob("*.json")).read_text(encoding="utf-8"))
+
+    assert cached["prune_version"] >= 1
+    assert "description" in cached["issues"][0]["fields"]
+    histories = cached["issues"][0]["changelog"]["histories"]
+    assert len(histories) == 3
+    assert all(item["field"] in {"status", "assignee"} for history in histories for item in history["items"])
+
+
+def test_kanban_reuses_summary_until_cache_changes(client, monkeypatch):
+    import app.main as main_module
+
+    calls = []
+    original = main_module.build_manager_summary
+    monkeypatch.setattr(main_module, "build_manager_summary", lambda *args, **kwargs: calls.append(1) or original(*args, **kwargs))
+
+    assert client.post("/api/query?confirmed=true").status_code == 200
+    url = "/api/kanban?start=2026-02-01T00:00:00Z&end=2026-02-28T00:00:00Z"
+    first = client.get(url).get_json()
+    second = client.get(url).get_json()
+    assert second["manager_summary_text"] == first["manager_summary_text"]
+    assert len(calls) == 1
+
+    client.get(url + "&assignee=Alice")
+    assert len(calls) == 2
+
+
+def test_rolling_window_results_are_memoized_and_shared_with_export(client, monkeypatch):
+    import app.main as main_module
+
+    calls = []
+    original = main_module.collect_member_stats
+    monkeypatch.setattr(main_module, "collect_member_stats", lambda *args, **kwargs: calls.append(1) or original(*args, **kwargs))
+    clock = {"now": datetime(2026, 2, 10, 10, 2, 17, tzinfo=timezone.utc)}
+    monkeypatch.setattr(main_module.PeriodEngine, "now", lambda self: clock["now"])
+
+    assert client.post("/api/query?confirmed=true").status_code == 200
+    first = client.get("/api/kanban?window=rolling_7d").get_json()
+    clock["now"] += timedelta(seconds=100)
+    second = client.get("/api/kanban?window=rolling_7d&q=").get_json()
+    # 窗口止于真实当前时刻；只有缓存键按时间桶取整，同一桶内总结与指标都命中
+    assert first["summary_window"]["end"] == "2026-02-10T10:02:17+00:00"
+    assert second["summary_window"] == first["summary_window"]
+    assert client.get("/api/export/xlsx").status_code == 200
+    assert len(calls) == 1
+
+    stats = client.get("/api/cache_stats").get_json()["caches"]
+    assert stats["metrics"]["hits"] == 2
+    assert stats["metrics"]["misses"] == 1
+    assert stats["summary"]["hits"] >= 1
+    assert stats["summary"]["bytes"] > 0
+
+    clock["now"] += timedelta(seconds=300)
+    third = client.get("/api/kanban?window=rolling_7d").get_json()
+    assert third["summary_window"]["end"] == "2026-02-10T10:08:57+00:00"
+
+
+def test_calendar_window_rolls_over_without_waiting_for_the_bucket(client, monkeypatch):
+    import app.main as main_module
+
+    # 周界前 1 分钟与后 1 分钟：同一时间桶内也立即切到新的一周
+    week_end = main_module.PeriodEngine.from_settings(None).window("weekly", datetime(2026, 2, 12, tzinfo=timezone.utc))["end"]
+    clock = {"now": week_end - timedelta(minutes=1)}
+    monkeypatch.setattr(main_module.PeriodEngine, "now", lambda self: clock["now"])
+    assert client.post("/api/query?confirmed=true").status_code == 200
+    before = client.get("/api/kanban?window=weekly").get_json()["summary_window"]
+    clock["now"] += timedelta(minutes=2)
+    after = client.get("/api/kanban?window=weekly").get_json()["summary_window"]
+    assert after["start"] == before["end"]
+
+
+def test_summary_trend_route_returns_one_row_per_window(client):
+    assert client.post("/api/query?confirmed=true").status_code == 200
+
+    response = client.get("/api/summary/trend?window=sprint&count=6")
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload["mode"] == "sprint"
+    assert len(payload["windows"]) == 6
+    assert {"label", "start", "end", "assigned_total", "resolved_total", "net_change"} <= set(payload["windows"][0])
+
+    assert client.get("/api/summary/trend?count=0").status_code == 400
+    assert client.get("/api/summary/trend?window=daily").status_code == 400
+
+
+def test_stage_metrics_route_returns_board_owner_and_card_breakdown(client):
+    assert client.get("/api/metrics/stages").status_code == 409
+    assert client.post("/api/query?confirmed=true").status_code == 200
+
+    payload = client.get("/api/metrics/stages").get_json()
+    assert [stage["id"] for stage in payload["stages"]][0] == "intake"
+    assert {"count", "avg_hours", "p50_hours", "p85_hours", "p95_hours"} <= set(payload["board"]["stages"]["intake"])
+    assert payload["owners"]
+    assert "cards" not in payload
+
+    detailed = client.get("/api/metrics/stages?include_cards=true").get_json()
+    assert len(detailed["cards"]) == detailed["board"]["issue_count"]
+
+
+def test_business_time_basis_switches_lead_and_stage_hours(client):
+    assert client.post("/api/query?confirmed=true").status_code == 200
+
+    wall = client.get("/api/kanban").get_json()
+    business = client.get("/api/kanban?time_basis=business").get_json()
+    assert wall["time_basis"] == "wall"
+    assert business["time_basis"] == "business"
+    assert business["flow_metrics"]["lead_time_samples"] == wall["flow_metrics"]["lead_time_samples"]
+    assert business["flow_metrics"]["avg_lead_time_hours"] <= wall["flow_metrics"]["avg_lead_time_hours"]
+
+    stages = client.get("/api/metrics/stages?time_basis=business").get_json()
+    assert stages["time_basis"] == "business"
+    assert client.get("/api/kanban?time_basis=lunar").status_code == 400
+    assert client.get("/api/metrics/stages?time_basis=lunar").status_code == 400
+
+
+def test_team_filter_and_gantt_team_mode(client):
+    assert client.post("/api/query?confirmed=true").status_code == 200
+
+    board = client.get("/api/kanban").get_json()
+    assert board["filters"]["teams"] == []
+    assert board["team_metrics"] == []
+    assert board["team_summary"] == []
+
+    response = client.get("/api/kanban?team=algo")
+    assert response.status_code == 404
+    assert "Unknown team" in response.get_json()["error"]
+    assert client.get("/api/export/csv?team=algo").status_code == 404
+
+    gantt = client.get("/api/gantt?mode=team").get_json()
+    assert {row["lane"] for row in gantt["rows"]} <= {"No Team"}
+    assert client.get("/api/gantt?mode=epic").status_code == 400
+
+
+def test_cfd_route_samples_columns_per_bucket(client):
+    assert client.get("/api/metrics/cfd").status_code == 409
+    assert client.post("/api/query?confirmed=true").status_code == 200
+
+    payload = client.get(
+        "/api/metrics/cfd?start=2026-02-01T00:00:00%2B00:00&end=2026-02-08T00:00:00%2B00:00"
+    ).get_json()
+    assert payload["window"]["mode"] == "custom"
+    assert payload["columns"] == ["To Do", "In Progress", "审核中", "Done"]
+    assert len(payload["points"]) >= 7
+    assert sum(payload["points"][-1]["counts"].values()) == 1
+
+    assert client.get("/api/metrics/cfd?granularity=minute").status_code == 400
+    assert client.get("/api/metrics/cfd?sprint=abc").status_code == 400
+
+
+def test_kanban_sprint_window_resolves_by_id(client, tmp_path):
+    (tmp_path / "sprint_metadata.json").write_text(
+        json.dumps(
+            {
+                "observed": {
+                    "42": {
+                        "id": 42,
+                        "name": "Sprint 42",
+                        "state": "closed",
+                        "start_date": "2026-02-01T00:00:00+00:00",
+                        "end_date": "2026-02-15T00:00:00+00:00",
+                        "complete_date": None,
+                        "board_id": None,
+                    }
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+    assert client.post("/api/query?confirmed=true").status_code == 200
+
+    payload = client.get("/api/kanban?sprint=42").get_json()
+    assert payload["summary_window"]["label"] == "Sprint 42"
+    assert payload["summary_window"]["sprint_id"] == 42
+    assert payload["summary_window"]["end"] == "2026-02-15T00:00:00+00:00"
+
+    assert client.get("/api/kanban?sprint=999").status_code == 404
+    assert client.get("/api/kanban?sprint=abc").status_code == 400
@@ -0,0 +1,63 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.jira_client import JiraClientError
+from app.period import resolve_period_window, trailing_windows
+from app.sprints import SprintStore
+
+
+def _board_sprints():
+    return [
+        {"id": 1, "name": "S1", "state": "closed", "originBoardId": 5, "startDate": "2026-01-05T00:00:00Z",
+         "endDate": "2026-01-19T00:00:00Z", "completeDate": "2026-01-18T12:00:00Z"},
+        {"id": 2, "name": "S2", "state": "active", "originBoardId": 5, "startDate": "2026-01-19T00:00:00Z",
+         "endDate": "2026-02-02T00:00:00Z"},
+        {"id": 3, "name": "S3", "state": "future", "originBoardId": 5},
+    ]
+
+
+def test_board_sprints_refresh_only_after_ttl(tmp_path):
+    calls = []
+
+    def fetch(board_id):
+        calls.append(board_id)
+        if len(calls) > 2:
+            raise JiraClientError("down")
+        return _board_sprints()
+
+    store = SprintStore(tmp_path / "sprint_metadata.json")
+    assert len(store.refresh_board(5, fetch, ttl_seconds=60, now=1000)) == 3
+    store.refresh_board(5, fetch, ttl_seconds=60, now=1030)
+    assert calls == [5]
+    store.refresh_board(5, fetch, ttl_seconds=60, now=1100)
+    assert calls == [5, 5]
+    # TTL 按每次调用传入的值判断
+    store.refresh_board(5, fetch, ttl_seconds=3600, now=1150)
+    assert calls == [5, 5]
+    # 拉取失败时沿用过期数据
+    assert len(store.refresh_board(5, fetch, ttl_seconds=60, now=1200)) == 3
+
+    reloaded = SprintStore(tmp_path / "sprint_metadata.json")
+    assert reloaded.get(2)["name"] == "S2"
+    with pytest.raises(JiraClientError):
+        SprintStore(tmp_path / "other.json").refresh_board(5, fetch, now=0)
+
+
+def test_sprint_windows_resolve_by_id(tmp_path):
+    store = SprintStore(tmp_path / "sprint_metadata.json")
+    store.refresh_board(5, lambda board_id: _board_sprints(), now=0)
+    store.observe([{"id": 2, "name": "stale", "state": "closed"}, {"id": 9, "name": "other board", "state": "closed"}])
+    now = datetime(2026, 1, 25, tzinfo=timezone.utc)
+
+    current = store.current(board_id=5, now=now)
+    assert current["name"] == "S2"
+    window = resolve_period_window("sprint", None, None, sprint=current)
+    assert window["label"] == "S2"
+    assert window["start"] == datetime(2026, 1, 19, tzinfo=timezone.utc)
+    assert window["end"] == datetime(2026, 2, 2, tzinfo=timezone.utc)
+
+    # 已完成的 sprint 以实际完成时间为准；多个 sprint 一次给出连续窗口
+    windows = trailing_windows("sprint", 6, now=now, sprints=store.recent(board_id=5, now=now))
+    assert [row["label"] for row in windows] == ["S1", "S2"]
+    assert windows[0]["end"] == datetime(2026, 1, 18, 12, tzinfo=timezone.utc)
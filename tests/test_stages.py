@@ -0,0 +1,78 @@
+import math
+
+from app.stages import STAGES, compute_stage_metrics, stage_duration_matrix
+from app.teams import TeamDirectory
+
+
+def _card(key, owner, **timeline):
+    return {"key": key, "assignee": owner, "metric_owner": owner, "timeline": timeline}
+
+
+def _column(stage_id):
+    return [stage for stage, _, _ in STAGES].index(stage_id)
+
+
+def test_skipped_milestones_extend_the_previous_stage():
+    card = _card(
+        "K-1",
+        "alice",
+        created_at="2026-03-01T00:00:00+00:00",
+        developer_started_at="2026-03-01T10:00:00+00:00",
+        in_progress_at="2026-03-02T10:00:00+00:00",
+        resolved_at="2026-03-03T10:00:00+00:00",
+    )
+    row = stage_duration_matrix([card])[0]
+
+    # 没有产品 / 开发经理指派：待分配一直算到开发认领
+    assert row[_column("intake")] == 10
+    assert math.isnan(row[_column("product")])
+    assert row[_column("queue")] == 24
+    assert row[_column("development")] == 24
+    # 已解决未关闭：最后一个阶段尚未结束
+    assert math.isnan(row[_column("verification")])
+
+
+def test_out_of_order_milestones_are_treated_as_missing():
+    card = _card(
+        "K-2",
+        "bob",
+        created_at="2026-03-05T00:00:00+00:00",
+        product_assigned_at="2026-03-04T00:00:00+00:00",
+        dev_manager_assigned_at="2026-03-06T00:00:00+00:00",
+    )
+    row = stage_duration_matrix([card])[0]
+
+    assert math.isnan(row[_column("intake")])
+    assert row[_column("product")] == 48
+    assert stage_duration_matrix([]).shape == (0, len(STAGES))
+
+
+def test_stage_metrics_group_by_owner_and_team():
+    cards = [
+        _card("K-1", "alice", created_at="2026-03-01T00:00:00+00:00", in_progress_at="2026-03-01T02:00:00+00:00"),
+        _card("K-2", "alice", created_at="2026-03-01T00:00:00+00:00", in_progress_at="2026-03-01T06:00:00+00:00"),
+        _card("K-3", "bob", created_at="2026-03-01T00:00:00+00:00", in_progress_at="2026-03-01T10:00:00+00:00"),
+    ]
+    directory = TeamDirectory([{"id": "core", "name": "Core", "members": ["Alice"]}, {"id": "web", "members": ["Carol"]}])
+    result = compute_stage_metrics(cards, directory=directory, include_cards=True)
+
+    board = result["board"]["stages"]["intake"]
+    assert board["count"] == 3
+    assert board["avg_hours"] == 6
+    assert board["p50_hours"] == 6
+    assert result["board"]["stages"]["review"]["count"] == 0
+    assert result["board"]["stages"]["review"]["p85_hours"] is None
+
+    owners = {row["owner"]: row for row in result["owners"]}
+    assert owners["alice"]["issue_count"] == 2
+    assert owners["alice"]["stages"]["intake"]["avg_hours"] == 4
+    assert owners["bob"]["stages"]["intake"]["p95_hours"] == 10
+
+    assert result["teams"][0] == {"team": "core", "name": "Core", "issue_count": 2, "stages": owners["alice"]["stages"]}
+    assert directory.group_owners(owners) == {"core": ["alice"], "web": []}
+    assert result["teams"][1]["issue_count"] == 0
+    assert result["cards"][2] == {
+        "key": "K-3",
+        "owner": "bob",
+        "stages": {stage: (10.0 if stage == "intake" else None) for stage, _, _ in STAGES},
+    }
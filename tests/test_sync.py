@@ -0,0 +1,43 @@
+from datetime import datetime, timezone
+
+from app.sync import delta_since, is_fresh, merge_issues, summarize_cached_issues
+
+
+def _issue(key, updated):
+    return {"key": key, "fields": {"updated": updated}}
+
+
+def test_summarize_cached_issues_uses_parsed_max_updated():
+    payload = {
+        "issues": [
+            _issue("A-1", "2026-03-03T10:00:00.000+0800"),
+            _issue("A-2", "2026-03-03T03:00:00.000+00:00"),
+            _issue("A-3", None),
+        ]
+    }
+    state = summarize_cached_issues(payload)
+    assert state["issue_count"] == 3
+    # 03:00Z 晚于 10:00+08:00（= 02:00Z）
+    assert state["max_updated"] == "2026-03-03T03:00:00.000+00:00"
+
+
+def test_is_fresh_compares_total_and_max_updated_across_offsets():
+    cached = {"issue_count": 2, "max_updated": "2026-03-03T10:00:00.000+0800"}
+    assert is_fresh({"total": 2, "max_updated": "2026-03-03T02:00:00.000+00:00"}, cached)
+    assert not is_fresh({"total": 3, "max_updated": "2026-03-03T10:00:00.000+0800"}, cached)
+    assert not is_fresh({"total": 2, "max_updated": "2026-03-03T10:05:00.000+0800"}, cached)
+    assert is_fresh({"total": 0, "max_updated": None}, {"issue_count": 0, "max_updated": None})
+
+
+def test_delta_since_subtracts_overlap():
+    since = delta_since("2026-03-03T10:00:00.000+00:00")
+    assert since == datetime(2026, 3, 2, 10, 0, tzinfo=timezone.utc)
+    assert delta_since(None) is None
+
+
+def test_merge_issues_replaces_by_key_and_appends_new():
+    cached = [_issue("A-1", "old"), _issue("A-2", "old")]
+    changed = [_issue("A-3", "new"), _issue("A-1", "new")]
+    merged = merge_issues(cached, changed)
+    assert [issue["key"] for issue in merged] == ["A-1", "A-2", "A-3"]
+    assert merged[0]["fields"]["updated"] == "new"
@@ -0,0 +1,85 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.period import PeriodEngine
+from app.teams import TeamDirectory
+from app.throughput import ThroughputCounters, ThroughputStore, build_throughput_report
+
+
+def _card(key, owner, created, resolved=None):
+    return {"key": key, "assignee": owner, "metric_owner": owner, "timeline": {"created_at": created, "resolved_at": resolved}}
+
+
+CARDS = [
+    _card("A-1", "Alice", "2026-02-20T10:00:00+00:00", "2026-03-03T10:00:00+00:00"),
+    _card("A-2", "Alice", "2026-03-02T10:00:00+00:00"),
+    _card("B-1", "Bob", "2026-03-04T10:00:00+00:00", "2026-03-10T10:00:00+00:00"),
+    # 上海时间已是 3 月 9 日（周一）
+    _card("B-2", "Bob", "2026-03-08T17:00:00+00:00"),
+]
+
+WINDOW = {
+    "mode": "custom",
+    "label": "x",
+    "start": datetime(2026, 3, 2, tzinfo=timezone.utc),
+    "end": datetime(2026, 3, 15, 16, tzinfo=timezone.utc),
+    "timezone": "Asia/Shanghai",
+}
+
+
+def test_weekly_throughput_and_burnup_per_scope():
+    counters = ThroughputCounters.build(CARDS, PeriodEngine(timezone="Asia/Shanghai"))
+    teams = TeamDirectory([{"id": "core", "name": "核心组", "members": ["Bob"]}])
+    report = build_throughput_report(counters, WINDOW, bucket="week", teams=teams)
+
+    assert report["buckets"] == ["2026-03-02T00:00:00+08:00", "2026-03-09T00:00:00+08:00"]
+    assert report["board"] == {
+        "arrivals": [2, 1],
+        "throughput": [1, 1],
+        "burnup_scope": [3, 4],
+        "burnup_done": [1, 2],
+    }
+    owners = {row["owner"]: row for row in report["owners"]}
+    assert owners["Alice"]["burnup_scope"] == [2, 2]
+    bob = {name: values for name, values in owners["Bob"].items() if name != "owner"}
+    assert report["teams"] == [{"team": "core", "name": "核心组", **bob}]
+
+    daily = build_throughput_report(counters, WINDOW, bucket="day")
+    assert len(daily["buckets"]) == 14
+    assert sum(daily["board"]["arrivals"]) == 3
+    with pytest.raises(ValueError):
+        build_throughput_report(counters, WINDOW, bucket="month")
+
+
+def test_incremental_apply_matches_rebuild():
+    engine = PeriodEngine(timezone="UTC")
+    counters = ThroughputCounters.build(CARDS, engine)
+    changed = [
+        _card("A-2", "Alice", "2026-03-02T10:00:00+00:00", "2026-03-12T00:00:00+00:00"),
+        _card("B-1", "Carol", "2026-03-04T10:00:00+00:00", "2026-03-10T10:00:00+00:00"),
+        _card("C-1", "Carol", "2026-03-11T00:00:00+00:00"),
+    ]
+    assert counters.apply([*changed, CARDS[0]]) == 3
+
+    latest = {card["key"]: card for card in [*CARDS, *changed]}
+    rebuilt = ThroughputCounters.build(latest.values(), engine)
+    assert build_throughput_report(counters, WINDOW, bucket="day") == build_throughput_report(rebuilt, WINDOW, bucket="day")
+    assert counters.owners() == ["Alice", "Bob", "Carol"]
+
+    counters.apply([], removed_keys=["B-2", "missing"])
+    assert counters.owners() == ["Alice", "Carol"]
+
+
+def test_store_advances_only_from_the_recorded_version():
+    store = ThroughputStore()
+    counters = ThroughputCounters.build(CARDS, PeriodEngine(timezone="UTC"))
+    store.put("c1", "v1", "f", counters)
+
+    assert not store.advance("c1", "v0", "v2", "f", [])
+    assert store.get("c1", "v1", "f") is None
+
+    store.put("c1", "v1", "f", counters)
+    assert store.advance("c1", "v1", "v2", "f", [_card("A-2", "Alice", "2026-03-02T10:00:00+00:00", "2026-03-03T00:00:00+00:00")])
+    assert store.get("c1", "v2", "f") is counters
+    assert store.get("c1", "v2", "other") is None
@@ -0,0 +1,69 @@
+from pathlib import Path
+
+from app.cache_store import JsonCacheStore
+from app.main import create_app
+from app.warmup import CacheWarmer, NormalizedCardCache, select_warmup_targets
+
+
+def test_select_warmup_targets_puts_pinned_first():
+    entries = [{"id": "a", "updated_at": 1}, {"id": "b", "updated_at": 3}, {"id": "c", "updated_at": 2}]
+    assert select_warmup_targets(entries, latest=2, pinned_ids={"a", "gone"}) == ["a", "b", "c"]
+    assert select_warmup_targets(entries, latest=1, pinned_ids={"b"}) == ["b"]
+
+
+def test_card_cache_drops_stale_versions_and_evicts_lru():
+    cache = NormalizedCardCache(max_entries=2)
+    cache.put(("a", "v1", "f"), [1])
+    cache.put(("a", "v2", "f"), [2])
+    assert cache.get(("a", "v1", "f")) is None
+    cache.put(("b", "v1", "f"), [3])
+    cache.get(("a", "v2", "f"))
+    cache.put(("c", "v1", "f"), [4])
+    assert cache.cache_ids() == ["a", "c"]
+
+
+def test_cache_warmer_reports_progress_and_errors():
+    loaded = []
+
+    def load(cache_id):
+        if cache_id == "bad":
+            raise FileNotFoundError("Query cache not found")
+        loaded.append(cache_id)
+
+    warmer = CacheWarmer(load, lambda: ["a", "bad", "b"])
+    assert warmer.ready
+    warmer.start()
+    warmer.join(5)
+
+    progress = warmer.progress()
+    assert warmer.ready
+    assert loaded == ["a", "b"]
+    assert (progress["state"], progress["total"], progress["completed"]) == ("done", 3, 3)
+    assert progress["errors"][0].startswith("bad")
+
+
+def test_create_app_warms_latest_caches_in_background(tmp_path: Path):
+    config = tmp_path / "jira_auth.yaml"
+    config.write_text(
+        "base_url: https://jira.example.com\nusername: u\npassword: p\n"
+        "cache_settings:\n  warmup:\n    enabled: true\n    latest: 1\n",
+        encoding="utf-8",
+    )
+    cache_id = "c" * 64
+    JsonCacheStore(tmp_path / "jira_query_cache").save(
+        cache_id,
+        {
+            "custom_jql": "x",
+            "jql_preview": "(x)",
+            "issue_count": 1,
+            "issues": [{"key": "ABC-1", "fields": {"summary": "s", "status": {"name": "Done"}}}],
+        },
+    )
+
+    app = create_app(config_path=str(config), storage_dir=tmp_path)
+    app.extensions["cache_warmer"].join(5)
+
+    body = app.test_client().get("/api/ready").get_json()
+    assert body["ready"] is True
+    assert body["warmup"]["cache_ids"] == [cache_id]
+    assert body["warm_cache_ids"] == [cache_id]
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from app.metrics import collect_member_stats
+from app.period import to_epochs
+from app.working_calendar import WorkingCalendar, parse_time_basis, parse_working_calendar
+
+
+def _calendar(**settings):
+    return WorkingCalendar.from_settings(settings, timezone="Asia/Shanghai")
+
+
+def _hours(calendar, start, end):
+    first, last = calendar.positions(to_epochs([start, end]))
+    return (last - first) / 3600
+
+
+def test_business_hours_skip_nights_weekends_and_lunch():
+    calendar = _calendar(hours=["09:00-12:00", "13:00-18:00"])
+
+    # 周五 17:00 → 下周一 10:00（上海时间）：周五 1 小时 + 周一 1 小时
+    assert _hours(calendar, "2026-03-06T09:00:00+00:00", "2026-03-09T02:00:00+00:00") == 2
+    # 午休不计：11:00 → 14:00 只有 2 小时
+    assert _hours(calendar, "2026-03-09T03:00:00+00:00", "2026-03-09T06:00:00+00:00") == 2
+    # 起止都在非工作时段：周六全天为 0
+    assert _hours(calendar, "2026-03-07T01:00:00+00:00", "2026-03-07T12:00:00+00:00") == 0
+    assert np.isnan(_hours(calendar, None, "2026-03-07T12:00:00+00:00"))
+
+
+def test_holidays_and_makeup_workdays_override_weekdays():
+    calendar = _calendar(holidays=["2026-10-01..2026-10-07"], makeup_workdays=["2026-10-10"])
+
+    # 国庆假期整周不计；10-10（周六）调休上班计 9 小时
+    assert _hours(calendar, "2026-09-30T10:00:00+00:00", "2026-10-08T01:00:00+00:00") == 0
+    assert _hours(calendar, "2026-10-10T00:00:00+00:00", "2026-10-10T12:00:00+00:00") == 9
+
+
+def test_positions_match_scalar_lookup_across_years():
+    calendar = _calendar(holidays=["2024-02-12"])
+    epochs = np.array([1704067200.0, np.nan, 1767225600.0, 1709251200.0])
+    positions = calendar.positions(epochs)
+
+    assert np.isnan(positions[1])
+    # 第一次查询只覆盖附近一年，跨年查询会扩展前缀数组，结果与逐对换算一致
+    assert positions[2] - positions[0] == pytest.approx(
+        _hours(calendar, "2024-01-01T00:00:00+00:00", "2026-01-01T00:00:00+00:00") * 3600
+    )
+    assert positions[3] > positions[0]
+
+
+def test_member_stats_use_business_hours_when_calendar_given():
+    card = {
+        "key": "K-1",
+        "assignee": "alice",
+        "priority": "High",
+        "column": "Done",
+        "timeline": {
+            "created_at": "2026-03-06T09:00:00+00:00",
+            "developer_started_at": "2026-03-09T01:00:00+00:00",
+            "resolved_at": "2026-03-09T02:00:00+00:00",
+        },
+    }
+
+    wall = collect_member_stats([card])["alice"]
+    business = collect_member_stats([card], calendar=_calendar())["alice"]
+
+    assert wall.lead.mean() == 65
+    assert business.lead.mean() == 2
+    assert business.cycle.mean() == 1
+
+
+def test_settings_validation():
+    assert parse_working_calendar(None) == {
+        "workdays": [0, 1, 2, 3, 4],
+        "hours": ["09:00-18:00"],
+        "holidays": [],
+        "makeup_workdays": [],
+    }
+    assert parse_working_calendar({"workdays": ["sunday", "monday"], "hours": "9:30-18:30"})["hours"] == ["09:30-18:30"]
+    assert parse_time_basis(None) == "wall"
+
+    for settings in (
+        {"hours": ["18:00-09:00"]},
+        {"hours": ["09:00-12:00", "11:00-14:00"]},
+        {"workdays": ["someday"]},
+        {"holidays": ["2026-10-07..2026-10-01"]},
+    ):
+        with pytest.raises(ValueError):
+            parse_working_calendar(settings)
+    with pytest.raises(ValueError):
+        parse_time_basis("lunar")